@@ -0,0 +1,57 @@
+"""
+Carga del usuario de la sesión desde la caché.
+
+AuthenticationMiddleware busca en cada petición al usuario de la sesión. Este
+backend guarda una foto compacta del usuario (id, rol, permisos de staff,
+estado y nombre para mostrar) y arma con ella una instancia de CustomUser sin
+consultar la base; cualquier otro campo se carga al usarse, como con only().
+La foto incluye el hash de sesión, así que cambiar la contraseña sigue
+cerrando las demás sesiones. Las señales de accounts la borran cuando el
+usuario se guarda o se elimina.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db import transaction
+
+
+CAMPOS = ('id', 'username', 'first_name', 'last_name', 'role', 'is_staff', 'is_superuser', 'is_active')
+
+
+def _clave(user_id):
+    return f'usuario_sesion:{user_id}'
+
+
+def invalidar_usuario(user_id):
+    """Borra la foto del usuario al confirmar la transacción en curso."""
+    transaction.on_commit(lambda: cache.delete(_clave(user_id)))
+
+
+class UsuarioEnCacheBackend(ModelBackend):
+    """ModelBackend cuyo get_user() lee primero la foto del usuario en la caché."""
+
+    def get_user(self, user_id):
+        if not settings.USER_CACHE_TIMEOUT:
+            return super().get_user(user_id)
+        UserModel = get_user_model()
+        foto = cache.get(_clave(user_id))
+        if foto is None:
+            try:
+                user = UserModel._default_manager.only(*CAMPOS, 'password').get(pk=user_id)
+            except UserModel.DoesNotExist:
+                return None
+            foto = {campo: getattr(user, campo) for campo in CAMPOS}
+            foto['hash_sesion'] = user.get_session_auth_hash()
+            cache.set(_clave(user_id), foto, settings.USER_CACHE_TIMEOUT)
+        else:
+            # from_db espera los valores en el orden de los campos del modelo
+            campos = [campo.attname for campo in UserModel._meta.concrete_fields if campo.attname in foto]
+            user = UserModel.from_db('default', campos, [foto[campo] for campo in campos])
+        # get_session_auth_hash() lo usa sin cargar la contraseña
+        user.hash_sesion = foto['hash_sesion']
+        return user if self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        return await sync_to_async(self.get_user)(user_id)
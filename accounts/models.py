@@ -12,3 +12,9 @@ class CustomUser(AbstractUser):
 
     def __str__(self):
         return f"{self.username} ({self.role})"
+
+    def get_session_auth_hash(self):
+        # Los usuarios que arma accounts.backends desde la caché traen el hash sin la contraseña
+        if 'password' not in self.__dict__ and 'hash_sesion' in self.__dict__:
+            return self.hash_sesion
+        return super().get_session_auth_hash()
@@ -0,0 +1,16 @@
+"""
+Señales de accounts: mantienen al día la foto del usuario en caché (accounts.backends).
+"""
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .backends import invalidar_usuario
+
+
+@receiver([post_save, post_delete], sender=settings.AUTH_USER_MODEL)
+def invalidar_foto_usuario(sender, instance, update_fields=None, **kwargs):
+    """El último inicio de sesión no está en la foto; cualquier otro cambio la invalida."""
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    invalidar_usuario(instance.pk)
@@ -1,3 +1,102 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from .models import CustomUser
+
+
+class PresupuestoConsultasAccountsTest(TestCase):
+    """Login y redirección por rol no deben consultar más que la sesión y el usuario."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuarios = {
+            role: CustomUser.objects.create_user(f'usuario_{role}', password='clave', role=role)
+            for role in ('admin', 'docente', 'estudiante')
+        }
+
+    def setUp(self):
+        cache.clear()
+
+    def test_login_anonimo(self):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(reverse('login'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(consultas), 0)
+
+    def test_dashboard_redirige_con_dos_consultas(self):
+        for role, usuario in self.usuarios.items():
+            with self.subTest(role=role):
+                self.client.force_login(usuario)
+                with CaptureQueriesContext(connection) as consultas:
+                    response = self.client.get(reverse('dashboard'))
+                self.assertEqual(response.status_code, 302)
+                self.assertLessEqual(len(consultas), 2)
+
+
+@override_settings(USER_CACHE_TIMEOUT=300)
+class UsuarioEnCacheTest(TestCase):
+    """La sesión y el usuario se leen de la caché; editar o desactivar al usuario la invalida."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user(
+            'admin', password='clave', role='admin', is_staff=True, is_superuser=True
+        )
+        cls.estudiante = CustomUser.objects.create_user(
+            'estudiante', password='clave', role='estudiante', first_name='Ana'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.estudiante)
+        self.admin_client = Client()
+        self.admin_client.force_login(self.admin)
+
+    def _editar(self, **cambios):
+        datos = {
+            'username': self.estudiante.username, 'email': '', 'first_name': 'Ana', 'last_name': '',
+            'role': 'estudiante', 'is_active': 'on', 'password': '',
+        }
+        datos.update(cambios)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin_client.post(reverse('admin_usuario_editar', args=[self.estudiante.id]), datos)
+
+    def _destino(self):
+        return self.client.get(reverse('dashboard'))
+
+    def test_peticion_sin_consultas_de_autenticacion(self):
+        for engine in ('cached_db', 'signed_cookies'):
+            with self.subTest(engine=engine), override_settings(
+                SESSION_ENGINE=f'django.contrib.sessions.backends.{engine}'
+            ):
+                cache.clear()
+                cliente = Client()
+                cliente.force_login(self.estudiante)
+                cliente.get(reverse('dashboard'))
+                with CaptureQueriesContext(connection) as consultas:
+                    response = cliente.get(reverse('dashboard'))
+                self.assertRedirects(response, reverse('student_dashboard'), fetch_redirect_response=False)
+                self.assertEqual(len(consultas), 0)
+
+    def test_editar_usuario_invalida_la_foto(self):
+        self._destino()
+        self._editar(role='docente')
+        self.assertRedirects(self._destino(), reverse('teacher_dashboard'), fetch_redirect_response=False)
+
+    def test_cambio_de_contrasena_cierra_la_sesion(self):
+        self._destino()
+        self._editar(password='otra-clave-segura')
+        self.assertRedirects(
+            self._destino(), f'{reverse("login")}?next={reverse("dashboard")}', fetch_redirect_response=False
+        )
+
+    def test_usuario_desactivado_pierde_la_sesion(self):
+        self._destino()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin_client.post(reverse('admin_usuario_eliminar', args=[self.estudiante.id]))
+        self.assertRedirects(
+            self._destino(), f'{reverse("login")}?next={reverse("dashboard")}', fetch_redirect_response=False
+        )
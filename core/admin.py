@@ -1,26 +1,24 @@
 from django.contrib import admin
 from django.db.models import Avg, Count
-from .models import Curso, Materia, Matricula, Calificacion, Asistencia, Notificacion
+from .models import Curso, Materia, Matricula, ListaEspera, Calificacion, Asistencia, Notificacion
+from .inscripciones import recalcular_contadores
 
 
 @admin.register(Curso)
 class CursoAdmin(admin.ModelAdmin):
-    list_display = ['nombre', 'año_escolar', 'activo', 'num_estudiantes', 'creado_en']
+    list_display = ['nombre', 'año_escolar', 'activo', 'matriculados', 'cupo', 'creado_en']
     list_filter = ['activo', 'año_escolar']
     search_fields = ['nombre', 'descripcion']
     list_editable = ['activo']
 
-    def num_estudiantes(self, obj):
-        return obj.matriculas.filter(activa=True).count()
-    num_estudiantes.short_description = 'Estudiantes'
-
 
 @admin.register(Materia)
 class MateriaAdmin(admin.ModelAdmin):
-    list_display = ['nombre', 'codigo', 'curso', 'docente', 'creditos', 'activa']
+    list_display = ['nombre', 'codigo', 'curso', 'docente', 'creditos', 'inscritos', 'cupo', 'activa']
     list_filter = ['activa', 'curso', 'docente']
     search_fields = ['nombre', 'codigo', 'descripcion']
     list_editable = ['activa']
+    list_select_related = ['curso', 'docente']
     autocomplete_fields = ['curso', 'docente']
 
 
@@ -30,8 +28,32 @@ class MatriculaAdmin(admin.ModelAdmin):
     list_filter = ['activa', 'curso', 'fecha_matricula']
     search_fields = ['estudiante__username', 'estudiante__first_name', 'estudiante__last_name']
     list_editable = ['activa']
+    list_select_related = ['estudiante', 'curso']
     date_hierarchy = 'fecha_matricula'
 
+    # Las matrículas editadas aquí no pasan por core/inscripciones.py: se recalcula el contador
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        recalcular_contadores(materia_ids=[], curso_ids={obj.curso_id, form.initial.get('curso')} - {None})
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        recalcular_contadores(materia_ids=[], curso_ids=[obj.curso_id])
+
+    def delete_queryset(self, request, queryset):
+        curso_ids = set(queryset.values_list('curso_id', flat=True))
+        super().delete_queryset(request, queryset)
+        recalcular_contadores(materia_ids=[], curso_ids=curso_ids)
+
+
+@admin.register(ListaEspera)
+class ListaEsperaAdmin(admin.ModelAdmin):
+    list_display = ['estudiante', 'materia', 'creada_en']
+    list_filter = ['materia__curso']
+    search_fields = ['estudiante__username', 'materia__nombre', 'materia__codigo']
+    list_select_related = ['estudiante', 'materia__curso']
+    readonly_fields = ['creada_en']
+
 
 @admin.register(Calificacion)
 class CalificacionAdmin(admin.ModelAdmin):
@@ -39,6 +61,7 @@ class CalificacionAdmin(admin.ModelAdmin):
     list_filter = ['periodo', 'materia__curso', 'notificado', 'fecha_registro']
     search_fields = ['estudiante__username', 'estudiante__first_name', 'estudiante__last_name', 'materia__nombre']
     list_editable = ['nota', 'notificado']
+    list_select_related = ['estudiante', 'materia__curso']
     date_hierarchy = 'fecha_registro'
     readonly_fields = ['fecha_registro', 'fecha_modificacion']
 
@@ -51,14 +74,7 @@ class CalificacionAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
         # Crear notificación automática si no está notificado
         if not obj.notificado:
-            Notificacion.objects.create(
-                estudiante=obj.estudiante,
-                tipo='calificacion',
-                titulo=f'Nueva calificación en {obj.materia.nombre}',
-                mensaje=f'Has recibido una calificación de {obj.nota} en {obj.materia.nombre} - {obj.get_periodo_display()}'
-            )
-            obj.notificado = True
-            obj.save()
+            obj.notificar()
 
 
 @admin.register(Asistencia)
@@ -68,6 +84,7 @@ class AsistenciaAdmin(admin.ModelAdmin):
     search_fields = ['estudiante__username', 'estudiante__first_name', 'estudiante__last_name', 'materia__nombre']
     date_hierarchy = 'fecha'
     list_editable = ['estado']
+    list_select_related = ['estudiante', 'materia__curso', 'registrado_por']
 
     def save_model(self, request, obj, form, change):
         if not obj.registrado_por_id:
@@ -81,5 +98,6 @@ class NotificacionAdmin(admin.ModelAdmin):
     list_filter = ['tipo', 'leida', 'creada_en']
     search_fields = ['estudiante__username', 'titulo', 'mensaje']
     list_editable = ['leida']
+    list_select_related = ['estudiante']
     date_hierarchy = 'creada_en'
     readonly_fields = ['creada_en']
@@ -4,10 +4,15 @@ Vistas personalizadas para el panel de administración
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
+from django.db import DEFAULT_DB_ALIAS
 from django.db.models import Avg, Count, Q
 from django.utils import timezone
 from .models import Curso, Materia, Matricula, Calificacion, Asistencia
 from accounts.models import CustomUser
+from .catalog import obtener_catalogo
+from .replica import lectura_replica
+from .streaming import render_lista
+from . import inscripciones
 
 
 def is_admin(user):
@@ -16,6 +21,7 @@ def is_admin(user):
 
 @login_required
 @user_passes_test(is_admin)
+@lectura_replica
 def admin_dashboard(request):
     """Dashboard principal para administradores"""
     # Estadísticas generales
@@ -39,8 +45,8 @@ def admin_dashboard(request):
         role='estudiante'
     ).order_by('-date_joined')[:5]
 
-    # Cursos con más estudiantes
-    cursos_populares = Curso.objects.annotate(
+    # Cursos con más estudiantes; solo se evalúa al renovar su fragmento en caché, así que se lee de la primaria
+    cursos_populares = Curso.objects.using(DEFAULT_DB_ALIAS).annotate(
         num_estudiantes=Count('matriculas', filter=Q(matriculas__activa=True))
     ).order_by('-num_estudiantes')[:5]
 
@@ -85,11 +91,12 @@ def usuarios_lista(request):
 
     context = {
         'usuarios': usuarios,
+        'roles': CustomUser.ROLE_CHOICES,
         'role_filter': role,
         'activo_filter': activo,
         'search_query': search,
     }
-    return render(request, 'admin/usuarios_lista.html', context)
+    return render_lista(request, 'admin/usuarios_lista.html', 'admin/usuarios_filas.html', context, 'usuarios')
 
 
 @login_required
@@ -198,7 +205,7 @@ def usuario_eliminar(request, user_id):
 @user_passes_test(is_admin)
 def cursos_lista(request):
     """Lista de cursos"""
-    cursos = Curso.objects.all().order_by('-creado_en')
+    cursos = obtener_catalogo().cursos
     return render(request, 'admin/cursos_lista.html', {'cursos': cursos})
 
 
@@ -211,12 +218,14 @@ def curso_crear(request):
         descripcion = request.POST.get('descripcion', '')
         año_escolar = request.POST.get('año_escolar')
         activo = request.POST.get('activo') == 'on'
+        cupo = request.POST.get('cupo')
 
         curso = Curso.objects.create(
             nombre=nombre,
             descripcion=descripcion,
             año_escolar=año_escolar,
-            activo=activo
+            activo=activo,
+            cupo=cupo if cupo else None
         )
 
         messages.success(request, f'Curso "{nombre}" creado exitosamente')
@@ -236,6 +245,8 @@ def curso_editar(request, curso_id):
         curso.descripcion = request.POST.get('descripcion', '')
         curso.año_escolar = request.POST.get('año_escolar')
         curso.activo = request.POST.get('activo') == 'on'
+        cupo = request.POST.get('cupo')
+        curso.cupo = cupo if cupo else None
         curso.save()
 
         messages.success(request, f'Curso "{curso.nombre}" actualizado')
@@ -264,7 +275,7 @@ def curso_eliminar(request, curso_id):
 @user_passes_test(is_admin)
 def materias_lista(request):
     """Lista de materias"""
-    materias = Materia.objects.select_related('curso', 'docente').all().order_by('-creado_en')
+    materias = obtener_catalogo().materias
     return render(request, 'admin/materias_lista.html', {'materias': materias})
 
 
@@ -280,6 +291,7 @@ def materia_crear(request):
         docente_id = request.POST.get('docente')
         creditos = request.POST.get('creditos')
         activa = request.POST.get('activa') == 'on'
+        cupo = request.POST.get('cupo')
 
         materia = Materia.objects.create(
             nombre=nombre,
@@ -288,15 +300,18 @@ def materia_crear(request):
             curso_id=curso_id if curso_id else None,
             docente_id=docente_id if docente_id else None,
             creditos=creditos,
-            activa=activa
+            activa=activa,
+            cupo=cupo if cupo else None
         )
 
         messages.success(request, f'Materia "{nombre}" creada exitosamente')
         return redirect('admin_materias_lista')
 
-    cursos = Curso.objects.filter(activo=True)
-    docentes = CustomUser.objects.filter(role='docente', is_active=True)
-    return render(request, 'admin/materia_form.html', {'cursos': cursos, 'docentes': docentes})
+    catalogo = obtener_catalogo()
+    return render(request, 'admin/materia_form.html', {
+        'cursos': catalogo.cursos_activos,
+        'docentes': catalogo.docentes,
+    })
 
 
 @login_required
@@ -314,17 +329,21 @@ def materia_editar(request, materia_id):
         materia.docente_id = docente_id if docente_id else None
         materia.creditos = request.POST.get('creditos')
         materia.activa = request.POST.get('activa') == 'on'
+        cupo = request.POST.get('cupo')
+        materia.cupo = cupo if cupo else None
         materia.save()
 
+        # Si se amplió el cupo, entran los primeros de la lista de espera
+        inscripciones.promover_lista_espera(materia.id)
+
         messages.success(request, f'Materia "{materia.nombre}" actualizada')
         return redirect('admin_materias_lista')
 
-    cursos = Curso.objects.filter(activo=True)
-    docentes = CustomUser.objects.filter(role='docente', is_active=True)
+    catalogo = obtener_catalogo()
     return render(request, 'admin/materia_form.html', {
         'materia': materia,
-        'cursos': cursos,
-        'docentes': docentes,
+        'cursos': catalogo.cursos_activos,
+        'docentes': catalogo.docentes,
         'edit_mode': True
     })
 
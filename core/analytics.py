@@ -0,0 +1,237 @@
+"""
+Analítica de asistencia calculada en la base de datos.
+
+Las rachas de ausencias se obtienen con funciones de ventana (técnica
+"gaps-and-islands" sobre Asistencia.fecha) en una sola consulta, de modo que
+el costo no depende de iterar registros en Python. La misma consulta agrupa
+los conteos por semana (y opcionalmente por mes): la base devuelve una fila
+por estudiante, materia y semana con registros.
+"""
+from datetime import date, datetime
+
+from django.db import connection
+
+from .models import Asistencia, Materia
+
+
+# Porcentaje de ausencias a partir del cual se considera ausentismo crónico
+UMBRAL_AUSENTISMO_CRONICO = 10.0
+
+_SQL_RESUMEN = """
+WITH marcadas AS (
+    SELECT
+        estudiante_id,
+        materia_id,
+        fecha,
+        estado,
+        {mes} AS mes,
+        {semana} AS semana,
+        ROW_NUMBER() OVER (PARTITION BY estudiante_id, materia_id ORDER BY fecha)
+        - ROW_NUMBER() OVER (PARTITION BY estudiante_id, materia_id, estado ORDER BY fecha) AS isla,
+        ROW_NUMBER() OVER (PARTITION BY estudiante_id, materia_id ORDER BY fecha DESC) AS desde_final
+    FROM {tabla}
+    WHERE {filtro}
+),
+islas AS (
+    SELECT
+        estudiante_id,
+        materia_id,
+        COUNT(*) AS largo,
+        MIN(desde_final) AS desde_final
+    FROM marcadas
+    WHERE estado = 'ausente'
+    GROUP BY estudiante_id, materia_id, isla
+),
+rachas AS (
+    SELECT
+        estudiante_id,
+        materia_id,
+        MAX(largo) AS racha_maxima,
+        MAX(CASE WHEN desde_final = 1 THEN largo ELSE 0 END) AS racha_actual
+    FROM islas
+    GROUP BY estudiante_id, materia_id
+),
+totales AS (
+    SELECT
+        estudiante_id,
+        materia_id,
+        mes,
+        semana,
+        COUNT(*) AS total,
+        SUM(CASE WHEN estado = 'presente' THEN 1 ELSE 0 END) AS presentes,
+        SUM(CASE WHEN estado = 'ausente' THEN 1 ELSE 0 END) AS ausentes,
+        SUM(CASE WHEN estado = 'tardanza' THEN 1 ELSE 0 END) AS tardanzas,
+        SUM(CASE WHEN estado = 'excusado' THEN 1 ELSE 0 END) AS excusados,
+        MIN(fecha) AS primera_fecha,
+        MAX(fecha) AS ultima_fecha,
+        MIN(CASE WHEN estado = 'ausente' THEN fecha END) AS primera_ausencia
+    FROM marcadas
+    GROUP BY estudiante_id, materia_id, mes, semana
+)
+SELECT
+    t.estudiante_id,
+    t.materia_id,
+    m.nombre,
+    t.mes,
+    t.semana,
+    t.total,
+    t.presentes,
+    t.ausentes,
+    t.tardanzas,
+    t.excusados,
+    t.primera_fecha,
+    t.ultima_fecha,
+    t.primera_ausencia,
+    COALESCE(r.racha_maxima, 0),
+    COALESCE(r.racha_actual, 0)
+FROM totales t
+INNER JOIN {tabla_materia} m ON m.id = t.materia_id
+LEFT JOIN rachas r
+    ON r.estudiante_id = t.estudiante_id AND r.materia_id = t.materia_id
+"""
+
+ESTADOS = ('presentes', 'ausentes', 'tardanzas', 'excusados')
+
+
+def _como_fecha(valor):
+    """SQLite devuelve las fechas de consultas crudas como texto ISO."""
+    if valor is None:
+        return None
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    return date.fromisoformat(str(valor)[:10])
+
+
+def _consultar(estudiante_id, materia_ids, por_mes):
+    """Ejecuta la consulta de resumen; devuelve None si no hay materias que consultar."""
+    condiciones = []
+    params = []
+    if estudiante_id is not None:
+        condiciones.append('estudiante_id = %s')
+        params.append(estudiante_id)
+    if materia_ids is not None:
+        materia_ids = list(materia_ids)
+        if not materia_ids:
+            return None
+        condiciones.append('materia_id IN (%s)' % ', '.join(['%s'] * len(materia_ids)))
+        params.extend(materia_ids)
+
+    mes_sql, mes_params = 'NULL', ()
+    if por_mes:
+        mes_sql, mes_params = connection.ops.date_trunc_sql('month', 'fecha', ())
+    # Semanas de lunes a domingo, identificadas por su lunes
+    semana_sql, semana_params = connection.ops.date_trunc_sql('week', 'fecha', ())
+
+    sql = _SQL_RESUMEN.format(
+        mes=mes_sql,
+        semana=semana_sql,
+        tabla=connection.ops.quote_name(Asistencia._meta.db_table),
+        tabla_materia=connection.ops.quote_name(Materia._meta.db_table),
+        filtro=' AND '.join(condiciones) or '1 = 1',
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*mes_params, *semana_params, *params])
+        return cursor.fetchall()
+
+
+def _acumular(destino, fila):
+    """Suma los conteos de una fila de la consulta a un acumulado."""
+    for estado in ESTADOS:
+        destino[estado] += fila[estado]
+    destino['total'] += fila['total']
+
+
+def _completar(datos):
+    """Agrega los indicadores derivados de los conteos."""
+    porcentaje_ausencia = (datos['ausentes'] / datos['total'] * 100) if datos['total'] > 0 else 0
+    porcentaje_asistencia = (datos['presentes'] / datos['total'] * 100) if datos['total'] > 0 else 0
+    datos['porcentaje_ausencia'] = round(porcentaje_ausencia, 1)
+    datos['porcentaje_asistencia'] = round(porcentaje_asistencia, 1)
+    datos['cronico'] = porcentaje_ausencia >= UMBRAL_AUSENTISMO_CRONICO
+    return datos
+
+
+def _resumir(filas):
+    """Agrupa las filas (una por estudiante, materia, semana y mes) en resúmenes."""
+    resumen = {}
+    meses = {}
+    for (est_id, mat_id, materia_nombre, mes, semana, total, presentes, ausentes, tardanzas, excusados,
+         primera_fecha, ultima_fecha, primera_ausencia, racha_maxima, racha_actual) in filas:
+        fila = {
+            'total': total,
+            'presentes': presentes,
+            'ausentes': ausentes,
+            'tardanzas': tardanzas,
+            'excusados': excusados,
+        }
+        primera_fecha = _como_fecha(primera_fecha)
+        ultima_fecha = _como_fecha(ultima_fecha)
+        primera_ausencia = _como_fecha(primera_ausencia)
+
+        datos = resumen.get((est_id, mat_id))
+        if datos is None:
+            datos = resumen[(est_id, mat_id)] = dict.fromkeys(('total',) + ESTADOS, 0)
+            datos.update({
+                'materia_nombre': materia_nombre,
+                'primera_fecha': primera_fecha,
+                'ultima_fecha': ultima_fecha,
+                'primera_ausencia': primera_ausencia,
+                'racha_actual': racha_actual,
+                'racha_maxima': racha_maxima,
+                'semanas': {},
+            })
+        else:
+            datos['primera_fecha'] = min(datos['primera_fecha'], primera_fecha)
+            datos['ultima_fecha'] = max(datos['ultima_fecha'], ultima_fecha)
+            if primera_ausencia and (datos['primera_ausencia'] is None or primera_ausencia < datos['primera_ausencia']):
+                datos['primera_ausencia'] = primera_ausencia
+        _acumular(datos, fila)
+        # Con desglose mensual, una semana que cruza dos meses llega en dos filas
+        _acumular(datos['semanas'].setdefault(_como_fecha(semana), dict.fromkeys(('total',) + ESTADOS, 0)), fila)
+
+        if mes is not None:
+            mes = _como_fecha(mes)
+            _acumular(meses.setdefault(mes, dict.fromkeys(('total',) + ESTADOS, 0)), fila)
+
+    for datos in resumen.values():
+        semanas = (datos.pop('ultima_fecha') - datos.pop('primera_fecha')).days // 7 + 1
+        datos['ausencias_por_semana'] = round(datos['ausentes'] / semanas, 2)
+        datos['semanas'] = [
+            _completar(dict(conteos, semana=semana)) for semana, conteos in sorted(datos['semanas'].items())
+        ]
+        _completar(datos)
+
+    por_mes = [_completar(dict(conteos, mes=mes)) for mes, conteos in sorted(meses.items())]
+    return resumen, por_mes
+
+
+def resumen_asistencia(estudiante_id=None, materia_ids=None):
+    """
+    Resumen de asistencia por (estudiante, materia) en una sola consulta.
+
+    Devuelve un diccionario {(estudiante_id, materia_id): {...}} con el
+    nombre de la materia, los conteos por estado, la racha de ausencias consecutivas actual y máxima,
+    la fecha de la primera ausencia, las ausencias por semana, si el
+    estudiante supera el umbral de ausentismo crónico y 'semanas': la serie
+    semanal (lista ordenada con la clave 'semana', el lunes de la semana, los
+    conteos y el porcentaje de ausencia de esa semana).
+    """
+    filas = _consultar(estudiante_id, materia_ids, por_mes=False)
+    if filas is None:
+        return {}
+    return _resumir(filas)[0]
+
+
+def resumen_asistencia_por_mes(estudiante_id=None, materia_ids=None):
+    """
+    Igual que resumen_asistencia, agrupando además por mes en la misma consulta.
+
+    Devuelve (resumen, por_mes), donde por_mes es una lista ordenada de
+    conteos por estado con la clave 'mes' (primer día del mes).
+    """
+    filas = _consultar(estudiante_id, materia_ids, por_mes=True)
+    if filas is None:
+        return {}, []
+    return _resumir(filas)
@@ -0,0 +1,729 @@
+"""
+API JSON de lectura y escritura en /api/v1/ para los clientes que sincronizan
+datos (la app móvil y el sistema de información del distrito).
+
+    GET    /api/v1/<recurso>/        lista por páginas
+    POST   /api/v1/<recurso>/        crea
+    GET    /api/v1/<recurso>/<id>/   detalle
+    PATCH  /api/v1/<recurso>/<id>/   modifica los campos enviados
+    DELETE /api/v1/<recurso>/<id>/   elimina
+    POST   /api/v1/<recurso>/lote/   crea o actualiza muchas filas (calificaciones y asistencias)
+
+Se autentica con la sesión de Django, como las páginas: el cliente inicia
+sesión en /accounts/login/ y envía la cabecera X-CSRFToken en las escrituras.
+Cada rol ve y modifica lo mismo que en sus vistas.
+
+Las listas se ordenan por fecha de modificación e id y se paginan con un
+cursor (la última fila de la página) en lugar de OFFSET: cada página es una
+búsqueda por índice y las filas nuevas no desplazan las páginas ya leídas.
+Con since= el cliente pide solo lo modificado desde su última sincronización
+y con fields= limita los campos de la respuesta y de la consulta (only()).
+El ETag de una lista sale de un aggregate (cantidad y última modificación de
+las filas visibles), así que un If-None-Match vigente responde 304 sin leer
+las filas. Las filas eliminadas no aparecen en since=.
+
+La carga por lotes recibe un array JSON o NDJSON (un objeto por línea) y lo
+procesa en bloques de API_BATCH_CHUNK_SIZE: por bloque, una consulta valida
+(y bloquea) las materias, otras validan los estudiantes (para el docente, que
+cursen la materia) y un solo INSERT ... ON CONFLICT DO UPDATE sobre la clave
+única del modelo guarda todas las filas, en una transacción. Como
+bulk_create no envía señales, las notificaciones y la invalidación de la
+caché se hacen aquí. La respuesta trae el resultado de cada registro.
+"""
+import base64
+import hashlib
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+from django.db.models import Count, Max, Q
+from django.forms import modelform_factory
+from django.forms.models import model_to_dict
+from django.http import Http404, HttpResponse, JsonResponse
+from django.urls import path
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_http_methods, require_POST
+
+from accounts.models import CustomUser
+from . import cache as versiones
+from . import inscripciones
+from .models import Curso, Materia, Matricula, InscripcionMateria, Calificacion, Asistencia, Notificacion
+
+
+class ErrorApi(Exception):
+    """Error que la API devuelve como {"error": mensaje, ...} con el estado indicado."""
+
+    def __init__(self, estado, mensaje, **extra):
+        super().__init__(mensaje)
+        self.estado = estado
+        self.cuerpo = {'error': mensaje, **extra}
+
+
+def _rol(user):
+    if user.is_superuser or user.is_staff:
+        return 'admin'
+    return user.role if user.role in ('docente', 'estudiante') else None
+
+
+def _entero(datos, campo):
+    valor = datos.get(campo)
+    if isinstance(valor, bool) or not isinstance(valor, (int, str)) or not str(valor).isdigit():
+        raise ErrorApi(400, 'Datos inválidos', errores={campo: ['Debe ser un id numérico.']})
+    return int(valor)
+
+
+class Recurso:
+    """
+    Un modelo expuesto en la API: los campos de la respuesta (las claves
+    foráneas, como id), las filas que ve cada rol y las escrituras permitidas.
+    Crear y modificar validan con un ModelForm de campos_creacion o
+    campos_edicion; un recurso sin ellos no admite esa operación.
+    """
+
+    modelo = None
+    campos = ()
+    modificacion = 'actualizado_en'
+    campos_creacion = ()
+    campos_edicion = ()
+    eliminable = False
+    roles_escritura = ()
+
+    def visibles(self, request):
+        """Filas que el usuario puede ver (y, si su rol escribe, modificar o eliminar)."""
+        return self.modelo.objects.all()
+
+    def serializar(self, instancia, campos=None):
+        return {
+            campo: getattr(instancia, self.modelo._meta.get_field(campo).attname)
+            for campo in campos or self.campos
+        }
+
+    # ---------------------------------------------------------------- escritura
+
+    def permitir(self, request, operacion):
+        permitida = {
+            'crear': self.campos_creacion, 'modificar': self.campos_edicion, 'eliminar': self.eliminable,
+        }[operacion]
+        if not permitida:
+            raise ErrorApi(405, f'El recurso no admite {operacion}')
+        if _rol(request.user) not in self.roles_escritura:
+            raise ErrorApi(403, 'No tienes permiso para modificar este recurso')
+
+    def limitar(self, request, form):
+        """Restringe las opciones del formulario (p. ej. a las materias del docente)."""
+
+    def validar(self, request, campos, datos, instancia=None):
+        desconocidos = sorted(set(datos) - set(campos))
+        if desconocidos:
+            raise ErrorApi(400, 'Campos no modificables', campos=desconocidos)
+        if instancia is not None:
+            datos = {**model_to_dict(instancia, fields=campos), **datos}
+        form = modelform_factory(self.modelo, fields=campos)(data=datos, instance=instancia)
+        self.limitar(request, form)
+        if not form.is_valid():
+            raise ErrorApi(400, 'Datos inválidos', errores={
+                campo: [str(mensaje) for mensaje in mensajes] for campo, mensajes in form.errors.items()
+            })
+        return form
+
+    def crear(self, request, datos):
+        """Devuelve la instancia creada y el estado HTTP."""
+        form = self.validar(request, self.campos_creacion, datos)
+        return self.guardar(request, form, creada=True), 201
+
+    def modificar(self, request, instancia, datos):
+        return self.guardar(request, self.validar(request, self.campos_edicion, datos, instancia), creada=False)
+
+    def guardar(self, request, form, creada):
+        return form.save()
+
+    def eliminar(self, request, instancia):
+        instancia.delete()
+
+
+class CursoRecurso(Recurso):
+    modelo = Curso
+    campos = ('id', 'nombre', 'descripcion', 'año_escolar', 'activo', 'cupo', 'matriculados',
+              'creado_en', 'actualizado_en')
+    campos_creacion = campos_edicion = ('nombre', 'descripcion', 'año_escolar', 'activo', 'cupo')
+    eliminable = True
+    roles_escritura = ('admin',)
+
+
+class MateriaRecurso(Recurso):
+    modelo = Materia
+    campos = ('id', 'nombre', 'codigo', 'descripcion', 'curso', 'docente', 'creditos', 'activa', 'cupo',
+              'inscritos', 'creado_en', 'actualizado_en')
+    campos_creacion = campos_edicion = (
+        'nombre', 'codigo', 'descripcion', 'curso', 'docente', 'creditos', 'activa', 'cupo'
+    )
+    eliminable = True
+    roles_escritura = ('admin',)
+
+
+class MatriculaRecurso(Recurso):
+    """Se crea como en la vista del estudiante: con cupo y sin duplicados (core/inscripciones.py)."""
+
+    modelo = Matricula
+    campos = ('id', 'estudiante', 'curso', 'fecha_matricula', 'activa', 'actualizado_en')
+    campos_creacion = ('estudiante', 'curso')
+    roles_escritura = ('admin', 'estudiante')
+
+    def visibles(self, request):
+        rol = _rol(request.user)
+        if rol == 'admin':
+            return Matricula.objects.all()
+        if rol == 'docente':
+            return Matricula.objects.filter(curso_id__in=request.docente.curso_ids)
+        return Matricula.objects.filter(estudiante_id=request.user.pk)
+
+    def crear(self, request, datos):
+        curso_id = _entero(datos, 'curso')
+        if _rol(request.user) == 'admin':
+            estudiante = CustomUser.objects.filter(pk=_entero(datos, 'estudiante'), role='estudiante').first()
+            if estudiante is None:
+                raise Http404('Estudiante no encontrado')
+        else:
+            if datos.get('estudiante', request.user.pk) != request.user.pk:
+                raise ErrorApi(403, 'Solo puedes matricularte a ti mismo')
+            estudiante = request.user
+        resultado = inscripciones.matricular_curso(estudiante, curso_id)
+        if resultado == inscripciones.SIN_CUPO:
+            raise ErrorApi(409, 'El curso no tiene cupos disponibles', resultado=resultado)
+        matricula = Matricula.objects.get(estudiante=estudiante, curso_id=curso_id)
+        return matricula, 201 if resultado == inscripciones.MATRICULADO else 200
+
+
+class InscripcionRecurso(Recurso):
+    """
+    Como en las vistas: el estudiante se inscribe a sí mismo (con lista de
+    espera si la materia está llena) y el docente inscribe y desinscribe en
+    sus materias.
+    """
+
+    modelo = InscripcionMateria
+    campos = ('id', 'estudiante', 'materia', 'fecha_inscripcion', 'actualizado_en')
+    campos_creacion = ('estudiante', 'materia')
+    eliminable = True
+    roles_escritura = ('docente', 'estudiante')
+
+    def visibles(self, request):
+        rol = _rol(request.user)
+        if rol == 'admin':
+            return InscripcionMateria.objects.all()
+        if rol == 'docente':
+            return InscripcionMateria.objects.filter(materia_id__in=request.docente.materia_ids)
+        return InscripcionMateria.objects.filter(estudiante_id=request.user.pk)
+
+    def crear(self, request, datos):
+        if _rol(request.user) == 'docente':
+            materia_id = request.docente.materia(_entero(datos, 'materia')).id
+            estudiante = CustomUser.objects.filter(pk=_entero(datos, 'estudiante'), role='estudiante').first()
+            if estudiante is None:
+                raise Http404('Estudiante no encontrado')
+            resultado = inscripciones.inscribir_materia(estudiante, materia_id, lista_espera=False)
+        else:
+            materia_id = _entero(datos, 'materia')
+            if datos.get('estudiante', request.user.pk) != request.user.pk:
+                raise ErrorApi(403, 'Solo puedes inscribirte a ti mismo')
+            estudiante = request.user
+            resultado = inscripciones.inscribir_materia(estudiante, materia_id)
+        if resultado == inscripciones.SIN_CUPO:
+            raise ErrorApi(409, 'La materia no tiene cupos disponibles', resultado=resultado)
+        if resultado in (inscripciones.EN_ESPERA, inscripciones.YA_EN_ESPERA):
+            return None, 202
+        inscripcion = InscripcionMateria.objects.get(estudiante=estudiante, materia_id=materia_id)
+        return inscripcion, 201 if resultado == inscripciones.INSCRITO else 200
+
+    def eliminar(self, request, instancia):
+        if _rol(request.user) != 'docente':
+            raise ErrorApi(403, 'Solo el docente de la materia puede desinscribir')
+        inscripciones.desinscribir_materia(instancia)
+
+
+NO_CURSA = 'El estudiante no cursa esta materia.'
+
+
+def _cursan(pares, cursos):
+    """
+    De los pares (estudiante_id, materia_id), los del estudiante inscrito en la
+    materia o con matrícula activa en su curso (cursos: materia_id -> curso_id),
+    los mismos estudiantes que ofrecen los formularios del docente.
+    """
+    estudiantes = {estudiante_id for estudiante_id, _ in pares}
+    inscritos = set(InscripcionMateria.objects.filter(
+        estudiante_id__in=estudiantes, estudiante__role='estudiante', materia_id__in=cursos
+    ).values_list('estudiante_id', 'materia_id'))
+    matriculados = set(Matricula.objects.filter(
+        estudiante_id__in=estudiantes, estudiante__role='estudiante', curso_id__in=set(cursos.values()), activa=True
+    ).values_list('estudiante_id', 'curso_id'))
+    return {
+        (estudiante_id, materia_id) for estudiante_id, materia_id in pares
+        if (estudiante_id, materia_id) in inscritos or (estudiante_id, cursos[materia_id]) in matriculados
+    }
+
+
+class _RegistroDocente(Recurso):
+    """
+    Calificaciones y asistencias: todas para el admin, las de sus materias para
+    el docente. La carga por lotes la usan el docente (en sus materias) y el
+    admin, como en el admin de Django.
+    """
+
+    eliminable = True
+    roles_escritura = ('docente',)
+    roles_lote = ('admin', 'docente')
+    # Carga por lotes: la clave única del modelo y los campos que actualiza si la fila existe
+    clave = ()
+    campos_lote = ()
+
+    def visibles(self, request):
+        rol = _rol(request.user)
+        if rol == 'admin':
+            return self.modelo.objects.all()
+        if rol == 'docente':
+            return self.modelo.objects.filter(materia_id__in=request.docente.materia_ids)
+        return self.modelo.objects.filter(estudiante_id=request.user.pk)
+
+    def limitar(self, request, form):
+        if 'materia' in form.fields:
+            form.fields['materia'].queryset = Materia.objects.filter(pk__in=request.docente.materia_ids)
+
+    def validar(self, request, campos, datos, instancia=None):
+        form = super().validar(request, campos, datos, instancia)
+        if instancia is None and _rol(request.user) == 'docente':
+            estudiante, materia = form.cleaned_data['estudiante'], form.cleaned_data['materia']
+            if not _cursan({(estudiante.pk, materia.pk)}, {materia.pk: materia.curso_id}):
+                raise ErrorApi(400, 'Datos inválidos', errores={'estudiante': [NO_CURSA]})
+        return form
+
+    def preparar_lote(self, request, instancia, creada):
+        """Completa una fila del lote antes de guardarla."""
+
+    def guardar_lote(self, request, creadas):
+        """Se llama con las filas nuevas de un bloque, ya guardadas."""
+
+
+class CalificacionRecurso(_RegistroDocente):
+    modelo = Calificacion
+    campos = ('id', 'estudiante', 'materia', 'periodo', 'nota', 'observaciones', 'notificado',
+              'fecha_registro', 'fecha_modificacion')
+    modificacion = 'fecha_modificacion'
+    campos_creacion = ('estudiante', 'materia', 'periodo', 'nota', 'observaciones')
+    campos_edicion = ('nota', 'observaciones')
+    clave = ('estudiante', 'materia', 'periodo')
+    campos_lote = ('nota', 'observaciones')
+
+    def guardar(self, request, form, creada):
+        calificacion = form.save()
+        if creada:
+            calificacion.notificar()
+        return calificacion
+
+    def preparar_lote(self, request, instancia, creada):
+        instancia.notificado = creada
+
+    def guardar_lote(self, request, creadas):
+        Notificacion.objects.bulk_create([calificacion.notificacion() for calificacion in creadas])
+
+
+class AsistenciaRecurso(_RegistroDocente):
+    modelo = Asistencia
+    campos = ('id', 'estudiante', 'materia', 'fecha', 'estado', 'observaciones', 'registrado_por',
+              'creado_en', 'actualizado_en')
+    campos_creacion = ('estudiante', 'materia', 'fecha', 'estado', 'observaciones')
+    campos_edicion = ('estado', 'observaciones')
+    clave = ('estudiante', 'materia', 'fecha')
+    campos_lote = ('estado', 'observaciones')
+
+    def guardar(self, request, form, creada):
+        if creada:
+            form.instance.registrado_por = request.user
+        return form.save()
+
+    def preparar_lote(self, request, instancia, creada):
+        # Solo se guarda en las filas nuevas: no está en los campos que actualiza el lote
+        instancia.registrado_por_id = request.user.pk
+
+
+class NotificacionRecurso(Recurso):
+    """El estudiante lee sus notificaciones y las marca como leídas."""
+
+    modelo = Notificacion
+    campos = ('id', 'estudiante', 'tipo', 'titulo', 'mensaje', 'leida', 'creada_en', 'actualizado_en')
+    campos_edicion = ('leida',)
+    roles_escritura = ('estudiante',)
+
+    def visibles(self, request):
+        rol = _rol(request.user)
+        if rol == 'admin':
+            return Notificacion.objects.all()
+        if rol == 'estudiante':
+            return Notificacion.objects.filter(estudiante_id=request.user.pk)
+        return Notificacion.objects.none()
+
+
+RECURSOS = {
+    'cursos': CursoRecurso(),
+    'materias': MateriaRecurso(),
+    'matriculas': MatriculaRecurso(),
+    'inscripciones': InscripcionRecurso(),
+    'calificaciones': CalificacionRecurso(),
+    'asistencias': AsistenciaRecurso(),
+    'notificaciones': NotificacionRecurso(),
+}
+
+
+# ==================== PARÁMETROS DE LAS LISTAS ====================
+
+def _campos(request, recurso):
+    """Campos pedidos con fields= (siempre con el id y la fecha de modificación, que usa el cursor)."""
+    pedidos = request.GET.get('fields')
+    if not pedidos:
+        return recurso.campos
+    campos = [campo.strip() for campo in pedidos.split(',') if campo.strip()]
+    desconocidos = sorted(set(campos) - set(recurso.campos))
+    if desconocidos:
+        raise ErrorApi(400, 'Campos desconocidos en fields', campos=desconocidos)
+    return tuple(dict.fromkeys(['id', *campos, recurso.modificacion]))
+
+
+def _fecha(valor, parametro):
+    try:
+        fecha = parse_datetime(valor)
+    except ValueError:
+        fecha = None
+    if fecha is None:
+        raise ErrorApi(400, f'{parametro} debe ser una fecha y hora ISO 8601')
+    return fecha if timezone.is_aware(fecha) else timezone.make_aware(fecha)
+
+
+def _codificar_cursor(fecha, pk):
+    return base64.urlsafe_b64encode(json.dumps([fecha.isoformat(), pk]).encode()).decode().rstrip('=')
+
+
+def _decodificar_cursor(cursor):
+    try:
+        fecha, pk = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        return _fecha(fecha, 'cursor'), int(pk)
+    except (ValueError, TypeError, ErrorApi):
+        raise ErrorApi(400, 'Cursor inválido')
+
+
+def _limite(request):
+    valor = request.GET.get('limit', settings.API_PAGE_SIZE)
+    try:
+        limite = int(valor)
+    except (TypeError, ValueError):
+        limite = 0
+    if not 1 <= limite <= settings.API_MAX_PAGE_SIZE:
+        raise ErrorApi(400, f'limit debe estar entre 1 y {settings.API_MAX_PAGE_SIZE}')
+    return limite
+
+
+def _etag(*partes):
+    return quote_etag(hashlib.md5('|'.join(map(str, partes)).encode(), usedforsecurity=False).hexdigest())
+
+
+# ==================== CARGA POR LOTES ====================
+
+def _leer_lote(request):
+    """
+    Registros del cuerpo: un array JSON o, con Content-Type
+    application/x-ndjson, un objeto por línea (las líneas vacías no cuentan).
+    El NDJSON se lee línea a línea, sin cargar el cuerpo entero; una línea que
+    no es JSON queda como un registro con error.
+    """
+    maximo = settings.API_BATCH_MAX_RECORDS
+    if request.content_type == 'application/x-ndjson':
+        registros = []
+        for linea in request:
+            if not linea.strip():
+                continue
+            if len(registros) == maximo:
+                raise ErrorApi(413, f'El lote admite como máximo {maximo} registros')
+            try:
+                registros.append(json.loads(linea))
+            except ValueError:
+                registros.append(None)
+        return registros
+    try:
+        registros = json.loads(request.body or b'[]')
+    except ValueError:
+        raise ErrorApi(400, 'El cuerpo no es JSON válido')
+    if not isinstance(registros, list):
+        raise ErrorApi(400, 'El cuerpo debe ser un array JSON o NDJSON')
+    if len(registros) > maximo:
+        raise ErrorApi(413, f'El lote admite como máximo {maximo} registros')
+    return registros
+
+
+def _limpiar(recurso, registro):
+    """
+    Valida un registro con los campos del modelo (sin consultas: las claves
+    foráneas se comprueban después, por bloque). Devuelve (valores, errores).
+    """
+    if not isinstance(registro, dict):
+        return None, {'__all__': ['Debe ser un objeto JSON.']}
+    nombres = (*recurso.clave, *recurso.campos_lote)
+    errores = {campo: ['Campo desconocido.'] for campo in sorted(set(registro) - set(nombres))}
+    valores = {}
+    for nombre in nombres:
+        campo = recurso.modelo._meta.get_field(nombre)
+        try:
+            if campo.is_relation:
+                valores[campo.attname] = _entero(registro, nombre)
+            elif nombre in registro:
+                valor = registro[nombre]
+                # Como en los formularios: 4.2 es Decimal('4.2'), no el binario exacto del float
+                valores[nombre] = campo.clean(str(valor) if isinstance(valor, float) else valor, None)
+            elif campo.has_default() or campo.blank:
+                valores[nombre] = campo.get_default()
+            else:
+                errores[nombre] = ['Este campo es obligatorio.']
+        except ErrorApi as error:
+            errores.update(error.cuerpo['errores'])
+        except ValidationError as error:
+            errores[nombre] = error.messages
+    return valores, errores
+
+
+def _guardar_bloque(request, recurso, bloque):
+    """
+    Guarda un bloque de registros válidos [(indice, valores), ...] con un
+    upsert y devuelve sus resultados. Se llama dentro de una transacción.
+    """
+    modelo = recurso.modelo
+    atributos = [modelo._meta.get_field(campo).attname for campo in recurso.clave]
+
+    docente = _rol(request.user) == 'docente'
+    materias = Materia.objects.filter(pk__in={valores['materia_id'] for _, valores in bloque})
+    if docente:
+        materias = materias.filter(docente_id=request.user.pk, activa=True)
+    # El bloqueo (en orden, para no cruzarse) serializa los lotes concurrentes de las mismas materias:
+    # así las claves existentes leídas abajo siguen valiendo al guardar y una fila nueva no se
+    # informa como creada (ni se notifica) dos veces
+    materias = {
+        materia.pk: materia
+        for materia in materias.select_for_update().order_by('pk').only('id', 'nombre', 'docente_id', 'curso_id')
+    }
+    pares = {(valores['estudiante_id'], valores['materia_id']) for _, valores in bloque}
+    if docente:
+        # El docente solo registra notas y asistencias de quienes cursan la materia
+        validos = _cursan(
+            {par for par in pares if par[1] in materias},
+            {materia.pk: materia.curso_id for materia in materias.values()},
+        )
+    else:
+        estudiantes = set(CustomUser.objects.filter(
+            pk__in={estudiante_id for estudiante_id, _ in pares}, role='estudiante'
+        ).values_list('pk', flat=True))
+        validos = {par for par in pares if par[0] in estudiantes}
+    # Las claves que ya existen (un superconjunto por columna, filtrado aquí) distinguen creadas de actualizadas
+    existentes = set(modelo.objects.filter(**{
+        f'{atributo}__in': {valores[atributo] for _, valores in bloque} for atributo in atributos
+    }).values_list(*atributos))
+
+    resultados, guardar = [], []
+    for indice, valores in bloque:
+        errores = {}
+        if valores['materia_id'] not in materias:
+            errores['materia'] = ['Materia no encontrada.']
+        elif (valores['estudiante_id'], valores['materia_id']) not in validos:
+            errores['estudiante'] = [NO_CURSA if docente else 'Estudiante no encontrado.']
+        if errores:
+            resultados.append({'indice': indice, 'estado': 'error', 'errores': errores})
+            continue
+        instancia = modelo(**valores)
+        instancia.materia = materias[valores['materia_id']]
+        creada = tuple(valores[atributo] for atributo in atributos) not in existentes
+        recurso.preparar_lote(request, instancia, creada)
+        guardar.append((indice, instancia, creada))
+
+    if guardar:
+        modelo.objects.bulk_create(
+            [instancia for _, instancia, _ in guardar],
+            update_conflicts=True,
+            unique_fields=recurso.clave,
+            update_fields=[*recurso.campos_lote, recurso.modificacion],
+        )
+        recurso.guardar_lote(request, [instancia for _, instancia, creada in guardar if creada])
+        # bulk_create no envía post_save: se invalidan aquí los estudiantes y docentes afectados
+        versiones.invalidar(versiones.USUARIO, *{
+            ident for _, instancia, _ in guardar for ident in (instancia.estudiante_id, instancia.materia.docente_id)
+        })
+    for indice, instancia, creada in guardar:
+        resultados.append({'indice': indice, 'estado': 'creado' if creada else 'actualizado', 'id': instancia.pk})
+    return resultados
+
+
+# ==================== VISTAS ====================
+
+def _vista_api(vista):
+    """Exige sesión, resuelve el recurso y devuelve los errores como JSON."""
+    @wraps(vista)
+    def envuelta(request, recurso, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': 'Autenticación requerida'}, status=401)
+        try:
+            return vista(request, RECURSOS[recurso], *args, **kwargs)
+        except ErrorApi as error:
+            return JsonResponse(error.cuerpo, status=error.estado)
+        except Http404 as error:
+            return JsonResponse({'error': str(error) or 'No encontrado'}, status=404)
+    return envuelta
+
+
+def _cuerpo(request):
+    try:
+        datos = json.loads(request.body or b'{}')
+    except ValueError:
+        raise ErrorApi(400, 'El cuerpo no es JSON válido')
+    if not isinstance(datos, dict):
+        raise ErrorApi(400, 'El cuerpo debe ser un objeto JSON')
+    return datos
+
+
+def _respuesta(recurso, instancia, status=200):
+    response = JsonResponse(recurso.serializar(instancia), status=status)
+    response['ETag'] = _etag(instancia.pk, getattr(instancia, recurso.modificacion))
+    return response
+
+
+@require_http_methods(['GET', 'HEAD', 'POST'])
+@_vista_api
+def lista(request, recurso):
+    if request.method == 'POST':
+        recurso.permitir(request, 'crear')
+        with transaction.atomic():
+            instancia, status = recurso.crear(request, _cuerpo(request))
+        if instancia is None:
+            return JsonResponse({'resultado': inscripciones.EN_ESPERA}, status=status)
+        return _respuesta(recurso, instancia, status)
+
+    campos = _campos(request, recurso)
+    limite = _limite(request)
+    filas = recurso.visibles(request)
+    if request.GET.get('since'):
+        filas = filas.filter(**{f'{recurso.modificacion}__gte': _fecha(request.GET['since'], 'since')})
+
+    # El ETag depende de las filas visibles y de los parámetros: si coincide no se leen las filas
+    resumen = filas.aggregate(total=Count('pk'), ultima=Max(recurso.modificacion))
+    etag = _etag(request.user.pk, request.GET.urlencode(), resumen['total'], resumen['ultima'])
+    no_modificada = get_conditional_response(request, etag=etag)
+    if no_modificada is not None:
+        return no_modificada
+
+    if request.GET.get('cursor'):
+        fecha, pk = _decodificar_cursor(request.GET['cursor'])
+        filas = filas.filter(
+            Q(**{f'{recurso.modificacion}__gt': fecha}) | Q(**{recurso.modificacion: fecha, 'pk__gt': pk})
+        )
+    pagina = list(filas.order_by(recurso.modificacion, 'pk').only(*campos)[:limite + 1])
+    siguiente = None
+    if len(pagina) > limite:
+        pagina = pagina[:limite]
+        parametros = request.GET.copy()
+        parametros['cursor'] = _codificar_cursor(getattr(pagina[-1], recurso.modificacion), pagina[-1].pk)
+        siguiente = request.build_absolute_uri(f'{request.path}?{parametros.urlencode()}')
+
+    response = JsonResponse({
+        'resultados': [recurso.serializar(instancia, campos) for instancia in pagina],
+        'siguiente': siguiente,
+    })
+    response['ETag'] = etag
+    return response
+
+
+@require_http_methods(['GET', 'HEAD', 'PATCH', 'DELETE'])
+@_vista_api
+def detalle(request, recurso, pk):
+    lectura = request.method in ('GET', 'HEAD')
+    campos = _campos(request, recurso) if lectura else recurso.campos
+    filas = recurso.visibles(request).filter(pk=pk)
+    instancia = (filas.only(*campos) if lectura else filas).first()
+    if instancia is None:
+        raise Http404('No encontrado')
+
+    # If-None-Match en lecturas (304) e If-Match en escrituras (412 si la fila cambió)
+    etag = _etag(instancia.pk, getattr(instancia, recurso.modificacion))
+    condicional = get_conditional_response(request, etag=etag)
+    if condicional is not None:
+        return condicional
+
+    if request.method == 'DELETE':
+        recurso.permitir(request, 'eliminar')
+        with transaction.atomic():
+            recurso.eliminar(request, instancia)
+        return HttpResponse(status=204)
+    if request.method == 'PATCH':
+        recurso.permitir(request, 'modificar')
+        with transaction.atomic():
+            instancia = recurso.modificar(request, instancia, _cuerpo(request))
+        return _respuesta(recurso, instancia)
+
+    response = JsonResponse(recurso.serializar(instancia, campos))
+    response['ETag'] = etag
+    return response
+
+
+@require_POST
+@_vista_api
+def lote(request, recurso):
+    if _rol(request.user) not in recurso.roles_lote:
+        raise ErrorApi(403, 'No tienes permiso para modificar este recurso')
+    registros = _leer_lote(request)
+
+    resultados = [None] * len(registros)
+    validos = {}  # Clave única -> (indice, valores): si se repite, gana el último registro
+    for indice, registro in enumerate(registros):
+        valores, errores = _limpiar(recurso, registro)
+        if errores:
+            resultados[indice] = {'indice': indice, 'estado': 'error', 'errores': errores}
+            continue
+        clave = tuple(valores[recurso.modelo._meta.get_field(campo).attname] for campo in recurso.clave)
+        if clave in validos:
+            anterior = validos[clave][0]
+            resultados[anterior] = {'indice': anterior, 'estado': 'omitido', 'reemplazado_por': indice}
+        validos[clave] = (indice, valores)
+
+    pendientes = list(validos.values())
+    tamano = settings.API_BATCH_CHUNK_SIZE
+    for inicio in range(0, len(pendientes), tamano):
+        bloque = pendientes[inicio:inicio + tamano]
+        try:
+            with transaction.atomic():
+                guardados = _guardar_bloque(request, recurso, bloque)
+        except DatabaseError:
+            # Los bloques ya confirmados se conservan: el cliente reenvía solo los registros con error
+            guardados = [
+                {'indice': indice, 'estado': 'error', 'errores': {'__all__': ['No se pudo guardar el bloque.']}}
+                for indice, _ in bloque
+            ]
+        for resultado in guardados:
+            resultados[resultado['indice']] = resultado
+
+    totales = {estado: 0 for estado in ('creado', 'actualizado', 'omitido', 'error')}
+    for resultado in resultados:
+        totales[resultado['estado']] += 1
+    return JsonResponse({
+        'creados': totales['creado'], 'actualizados': totales['actualizado'],
+        'omitidos': totales['omitido'], 'errores': totales['error'],
+        'resultados': resultados,
+    })
+
+
+urlpatterns = [
+    url
+    for nombre, recurso in RECURSOS.items()
+    for url in (
+        path(f'{nombre}/', lista, {'recurso': nombre}, name=f'api_{nombre}'),
+        path(f'{nombre}/<int:pk>/', detalle, {'recurso': nombre}, name=f'api_{nombre}_detalle'),
+        *([path(f'{nombre}/lote/', lote, {'recurso': nombre}, name=f'api_{nombre}_lote')]
+          if isinstance(recurso, _RegistroDocente) else []),
+    )
+]
@@ -0,0 +1,59 @@
+"""
+Utilidades para las vistas async de solo lectura.
+
+El ORM async de Django ejecuta cada consulta en el hilo síncrono de la
+petición, una detrás de otra. Con ASYNC_PARALLEL_QUERIES (solo bajo ASGI y
+con DB_POOL, ver settings) en_paralelo() lanza consultas independientes a la
+vez, cada una en un hilo del executor con una conexión del pool, y espera
+todas; esos hilos reanudan las mediciones de la petición para que
+Server-Timing, Prometheus y el registro de consultas lentas las vean. Dentro
+de una transacción (pruebas, ATOMIC_REQUESTS) otra conexión no vería los
+datos sin confirmar, así que ahí se ejecutan en secuencia en el hilo de la
+petición.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+from .middleware import medicion_en_curso, reanudar_medicion
+
+
+async def usuario(request):
+    """
+    Carga el usuario con request.auser() y lo deja en request.user, para que
+    las plantillas y el contexto no vuelvan a cargarlo de forma síncrona.
+    """
+    request.user = await request.auser()
+    return request.user
+
+
+def _medicion_de_la_peticion():
+    """Mediciones de la petición para los hilos del executor; None dentro de una transacción."""
+    if connection.in_atomic_block:
+        return None
+    return medicion_en_curso()
+
+
+def _con_conexion_propia(funcion, medicion):
+    def ejecutar():
+        try:
+            with reanudar_medicion(medicion):
+                return funcion()
+        finally:
+            # Respeta CONN_MAX_AGE: con el pool (o sin conexiones persistentes) la devuelve
+            close_old_connections()
+    return ejecutar
+
+
+async def en_paralelo(*funciones):
+    """Ejecuta funciones síncronas de consulta al mismo tiempo y devuelve sus resultados en orden."""
+    medicion = None
+    if settings.ASYNC_PARALLEL_QUERIES and len(funciones) > 1:
+        medicion = await sync_to_async(_medicion_de_la_peticion)()
+    if medicion is None:
+        return await sync_to_async(lambda: [funcion() for funcion in funciones])()
+    return await asyncio.gather(*(
+        sync_to_async(_con_conexion_propia(funcion, medicion), thread_sensitive=False)() for funcion in funciones
+    ))
@@ -0,0 +1,81 @@
+"""
+Utilidades de caché con invalidación por versión.
+
+Cada ámbito (un usuario, el catálogo de cursos y materias, ...) tiene un sello
+de versión guardado en la caché. Las claves de datos incluyen ese sello, así
+que invalidar consiste en cambiar el sello: las entradas viejas dejan de
+leerse y expiran solas.
+"""
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .replica import en_primaria
+
+
+USUARIO = 'usuario'
+DOCENTE = 'docente'
+CATALOGO = 'catalogo'
+MATRICULAS = 'matriculas'
+
+
+def _clave_version(ambito, ident):
+    return f'version:{ambito}:{ident}'
+
+
+def obtener_versiones(*ambitos):
+    """
+    Devuelve los sellos de versión de varios ámbitos en una sola lectura.
+
+    Cada ámbito es una tupla (nombre, identificador). Si un sello no existe
+    (primera lectura o expulsado de la caché) se crea uno nuevo.
+    """
+    claves = [_clave_version(ambito, ident) for ambito, ident in ambitos]
+    versiones = cache.get_many(claves)
+    faltantes = {clave: time.time_ns() for clave in claves if clave not in versiones}
+    if faltantes:
+        cache.set_many(faltantes, None)
+        versiones.update(faltantes)
+    return [versiones[clave] for clave in claves]
+
+
+def invalidar(ambito, *idents):
+    """
+    Cambia el sello de versión de los identificadores dados.
+
+    Se aplica al confirmar la transacción en curso, para que otro proceso no
+    recargue datos aún sin confirmar bajo el sello nuevo. Sin identificadores no
+    hace nada: los ámbitos globales (CATALOGO, MATRICULAS) usan ''.
+    """
+    claves = [_clave_version(ambito, ident) for ident in idents if ident is not None]
+    if claves:
+        transaction.on_commit(lambda: cache.set_many(dict.fromkeys(claves, time.time_ns()), None))
+
+
+async def acontexto_dashboard(user, construir):
+    """
+    Devuelve el contexto del dashboard de un usuario desde la caché.
+
+    La clave depende de la versión del usuario y del catálogo (y del mes en
+    curso, porque los dashboards muestran la asistencia del mes). Si no hay
+    entrada vigente se espera construir() (una corrutina) y se guarda el
+    resultado. Se construye con la primaria, aunque la vista lea de la
+    réplica: el contexto queda guardado bajo el sello nuevo.
+    """
+    clave, contexto = await sync_to_async(_leer_dashboard)(user)
+    if contexto is None:
+        with en_primaria():
+            contexto = await construir()
+        await cache.aset(clave, contexto, settings.DASHBOARD_CACHE_TIMEOUT)
+    return contexto
+
+
+def _leer_dashboard(user):
+    version_usuario, version_catalogo = obtener_versiones((USUARIO, user.id), (CATALOGO, ''))
+    mes = timezone.now().strftime('%Y%m')
+    clave = f'dashboard:{user.id}:{version_usuario}:{version_catalogo}:{mes}'
+    return clave, cache.get(clave)
@@ -0,0 +1,199 @@
+"""
+Generador de carga asíncrono para simular los días pico (inicio de
+inscripciones y cierre de notas).
+
+Cada usuario virtual es un httpx.AsyncClient con sus cookies de sesión
+y su token CSRF; los recorridos por rol se cronometran paso a paso. Lo
+ejecuta el comando prueba_carga.
+"""
+import asyncio
+import random
+import time
+from urllib.parse import urlsplit
+
+import httpx
+
+
+class ClienteHTTP(httpx.AsyncClient):
+    """Un navegador por usuario virtual: keep-alive, frasco de cookies y token CSRF en los POST."""
+
+    def __init__(self, base_url, timeout=30):
+        super().__init__(base_url=base_url, timeout=timeout, limits=httpx.Limits(max_connections=1))
+
+    @property
+    def csrf(self):
+        return self.cookies.get('csrftoken', '')
+
+    async def enviar_formulario(self, ruta, datos):
+        """POST de formulario con el token CSRF tomado de la cookie."""
+        return await self.post(ruta, data={**datos, 'csrfmiddlewaretoken': self.csrf}, headers={
+            'X-CSRFToken': self.csrf,
+            'Referer': str(self.base_url.join(ruta)),
+        })
+
+
+class Estadisticas:
+    """Latencias y errores por paso del recorrido."""
+
+    def __init__(self):
+        self.pasos = {}
+        self.inicio = time.perf_counter()
+        self.fin = None
+
+    def registrar(self, paso, duracion, error=None):
+        datos = self.pasos.setdefault(paso, {'latencias': [], 'errores': {}})
+        datos['latencias'].append(duracion)
+        if error:
+            datos['errores'][error] = datos['errores'].get(error, 0) + 1
+
+    def resumen(self):
+        duracion = (self.fin or time.perf_counter()) - self.inicio
+        resultado = {}
+        for paso, datos in self.pasos.items():
+            latencias = sorted(datos['latencias'])
+            errores = sum(datos['errores'].values())
+
+            def percentil(p):
+                return round(latencias[min(len(latencias) - 1, int(p / 100 * len(latencias)))] * 1000, 1)
+
+            resultado[paso] = {
+                'peticiones': len(latencias),
+                'errores': errores,
+                'tasa_error': round(errores / len(latencias), 4),
+                'rps': round(len(latencias) / duracion, 2),
+                'p50_ms': percentil(50),
+                'p95_ms': percentil(95),
+                'p99_ms': percentil(99),
+                'max_ms': round(latencias[-1] * 1000, 1),
+                'detalle_errores': datos['errores'],
+            }
+        return {'duracion_s': round(duracion, 1), 'pasos': resultado}
+
+
+class Recorrido:
+    """Un usuario virtual: ejecuta pasos HTTP cronometrados con el estado esperado."""
+
+    def __init__(self, cliente, estadisticas, pausa=0):
+        self.cliente = cliente
+        self.estadisticas = estadisticas
+        self.pausa = pausa
+
+    async def paso(self, nombre, metodo, ruta, datos=None, esperado=(200,)):
+        inicio = time.perf_counter()
+        error = None
+        respuesta = None
+        try:
+            if metodo == 'POST':
+                respuesta = await self.cliente.enviar_formulario(ruta, datos or {})
+            else:
+                respuesta = await self.cliente.get(ruta)
+            if respuesta.status_code not in esperado:
+                error = f'HTTP {respuesta.status_code}'
+        except httpx.HTTPError as excepcion:
+            error = type(excepcion).__name__
+        self.estadisticas.registrar(nombre, time.perf_counter() - inicio, error)
+        if self.pausa:
+            await asyncio.sleep(self.pausa)
+        return None if error else respuesta
+
+    async def login(self, rutas, username, clave):
+        self.cliente.cookies.clear()
+        if await self.paso('login_form', 'GET', rutas['login']) is None:
+            return False
+        respuesta = await self.paso(
+            'login', 'POST', rutas['login'], {'username': username, 'password': clave}, esperado=(302,)
+        )
+        if respuesta is None:
+            return False
+        destino = await self.paso('dashboard_redirect', 'GET', rutas['dashboard'], esperado=(302,))
+        if destino is None:
+            return False
+        return await self.paso('dashboard', 'GET', urlsplit(destino.headers['location']).path) is not None
+
+
+async def recorrido_estudiante(recorrido, datos, rng):
+    """Día de inscripciones: ver ofertas, inscribirse en una materia, matricularse y exportar."""
+    rutas = datos['rutas']
+    username = rng.choice(datos['estudiantes'])
+    if not await recorrido.login(rutas, username, datos['clave']):
+        return
+    await recorrido.paso('listar_materias', 'GET', rutas['listar_materias'])
+    materia = rng.choice(datos['materias'])
+    await recorrido.paso(
+        'inscribir_materia', 'POST', rutas['inscribir_materia'].format(materia), esperado=(302,)
+    )
+    await recorrido.paso('listar_cursos', 'GET', rutas['listar_cursos'])
+    curso = rng.choice(datos['cursos'])
+    await recorrido.paso(
+        'matricular_curso', 'POST', rutas['matricular_curso'].format(curso), esperado=(302,)
+    )
+    await recorrido.paso('exportar_calificaciones', 'GET', rutas['exportar'])
+
+
+async def recorrido_docente(recorrido, datos, rng):
+    """Cierre de notas: abrir el formulario, registrar una nota final y generar el reporte."""
+    rutas = datos['rutas']
+    username, materias = rng.choice(datos['docentes'])
+    if not await recorrido.login(rutas, username, datos['clave']):
+        return
+    materia, estudiantes = rng.choice(materias)
+    await recorrido.paso('calificacion_form', 'GET', rutas['calificacion_crear'])
+    await recorrido.paso('calificacion_crear', 'POST', rutas['calificacion_crear'], {
+        'estudiante': rng.choice(estudiantes),
+        'materia': materia,
+        'periodo': 'final',
+        'nota': f'{rng.uniform(1, 5):.1f}',
+    }, esperado=(302,))
+    await recorrido.paso('generar_reporte', 'GET', f'{rutas["generar_reporte"]}?materia={materia}')
+
+
+async def consultas_estudiante(recorrido, datos, rng):
+    """Consulta de notas: las vistas de solo lectura del estudiante (async bajo ASGI)."""
+    rutas = datos['rutas']
+    if not await recorrido.login(rutas, rng.choice(datos['estudiantes']), datos['clave']):
+        return
+    await recorrido.paso('mis_calificaciones', 'GET', rutas['mis_calificaciones'])
+    await recorrido.paso('mis_asistencias', 'GET', rutas['mis_asistencias'])
+    await recorrido.paso('mis_notificaciones', 'GET', rutas['mis_notificaciones'])
+
+
+async def consultas_docente(recorrido, datos, rng):
+    """Revisión de resultados: estadísticas y dashboard del docente."""
+    rutas = datos['rutas']
+    username, _ = rng.choice(datos['docentes'])
+    if not await recorrido.login(rutas, username, datos['clave']):
+        return
+    await recorrido.paso('estadisticas', 'GET', rutas['estadisticas'])
+
+
+ESCENARIOS = {
+    'inscripciones': [(recorrido_estudiante, 1)],
+    'calificaciones': [(recorrido_docente, 1)],
+    'mixto': [(recorrido_estudiante, 9), (recorrido_docente, 1)],
+    'consultas': [(consultas_estudiante, 9), (consultas_docente, 1)],
+}
+
+
+async def _usuario_virtual(numero, base_url, escenario, datos, estadisticas, fin, pausa, semilla):
+    rng = random.Random(semilla * 100003 + numero)
+    recorridos, pesos = zip(*ESCENARIOS[escenario])
+    async with ClienteHTTP(base_url) as cliente:
+        recorrido = Recorrido(cliente, estadisticas, pausa)
+        while time.perf_counter() < fin:
+            await rng.choices(recorridos, pesos)[0](recorrido, datos, rng)
+
+
+async def ejecutar(base_url, escenario, datos, usuarios, duracion, pausa=0, semilla=1, rampa=0):
+    """Lanza usuarios virtuales concurrentes durante duracion segundos y devuelve el resumen por paso."""
+    estadisticas = Estadisticas()
+    fin = time.perf_counter() + duracion
+    tareas = []
+    for numero in range(usuarios):
+        tareas.append(asyncio.create_task(
+            _usuario_virtual(numero, base_url, escenario, datos, estadisticas, fin, pausa, semilla)
+        ))
+        if rampa:
+            await asyncio.sleep(rampa / usuarios)
+    await asyncio.gather(*tareas)
+    estadisticas.fin = time.perf_counter()
+    return estadisticas.resumen()
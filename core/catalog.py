@@ -0,0 +1,91 @@
+"""
+Catálogo en memoria de cursos, materias y docentes.
+
+El catálogo cambia poco y lo consultan muchas vistas (listas de inscripción,
+formularios y listas del panel admin). Cada proceso guarda una copia como
+tuplas compactas y la recarga cuando cambia el sello de versión compartido
+del catálogo, que las señales actualizan al guardar un Curso, una Materia o
+un usuario.
+"""
+import threading
+from collections import namedtuple
+
+from django.contrib.auth import get_user_model
+
+from . import cache as versiones
+from .models import Curso, Materia
+from .replica import en_primaria
+
+
+CursoCatalogo = namedtuple('CursoCatalogo', 'id nombre descripcion año_escolar activo')
+MateriaCatalogo = namedtuple(
+    'MateriaCatalogo',
+    'id nombre codigo creditos activa curso_id curso_nombre docente_id docente_nombre'
+)
+DocenteCatalogo = namedtuple('DocenteCatalogo', 'id nombre')
+
+
+class Catalogo(namedtuple('Catalogo', 'cursos materias docentes')):
+    """Cursos y materias (todos, del más reciente al más antiguo) y docentes activos."""
+
+    __slots__ = ()
+
+    @property
+    def cursos_activos(self):
+        return sorted((curso for curso in self.cursos if curso.activo), key=lambda curso: curso.nombre)
+
+    @property
+    def materias_activas(self):
+        return sorted(
+            (materia for materia in self.materias if materia.activa),
+            key=lambda materia: (materia.curso_nombre, materia.nombre)
+        )
+
+
+_catalogo = (None, None)
+_lock = threading.Lock()
+
+
+def _nombre_usuario(first_name, last_name, username):
+    return f'{first_name} {last_name}'.strip() or username
+
+
+def _cargar():
+    cursos = tuple(
+        CursoCatalogo(*fila) for fila in Curso.objects.order_by('-creado_en').values_list(
+            'id', 'nombre', 'descripcion', 'año_escolar', 'activo'
+        )
+    )
+    materias = tuple(
+        MateriaCatalogo(
+            id, nombre, codigo, creditos, activa, curso_id, curso_nombre, docente_id,
+            _nombre_usuario(first_name, last_name, username) if docente_id else ''
+        )
+        for (id, nombre, codigo, creditos, activa, curso_id, curso_nombre, docente_id,
+             first_name, last_name, username) in Materia.objects.order_by('-creado_en').values_list(
+            'id', 'nombre', 'codigo', 'creditos', 'activa', 'curso_id', 'curso__nombre', 'docente_id',
+            'docente__first_name', 'docente__last_name', 'docente__username'
+        )
+    )
+    docentes = tuple(
+        DocenteCatalogo(id, _nombre_usuario(first_name, last_name, username))
+        for id, first_name, last_name, username in get_user_model().objects.filter(
+            role='docente', is_active=True
+        ).order_by('username').values_list('id', 'first_name', 'last_name', 'username')
+    )
+    return Catalogo(cursos, materias, docentes)
+
+
+def obtener_catalogo():
+    """Devuelve el catálogo del proceso, recargándolo si cambió la versión compartida."""
+    global _catalogo
+    version, = versiones.obtener_versiones((versiones.CATALOGO, ''))
+    version_local, catalogo = _catalogo
+    if version_local != version:
+        with _lock:
+            version_local, catalogo = _catalogo
+            if version_local != version:
+                with en_primaria():
+                    catalogo = _cargar()
+                _catalogo = (version, catalogo)
+    return catalogo
@@ -0,0 +1,42 @@
+"""
+Context processors del proyecto.
+"""
+from django.conf import settings
+from django.utils.functional import cached_property
+
+from . import cache as versiones
+
+
+class Fragmentos:
+    """
+    Datos para las claves de {% cache %}: la duración, el rol del menú y los
+    sellos de versión de los datos que muestra cada fragmento. Los sellos se
+    leen de la caché solo si la plantilla los usa; al cambiar los datos cambia
+    el sello y con él la clave, así que el fragmento viejo deja de leerse.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.timeout = settings.FRAGMENT_CACHE_TIMEOUT
+
+    @cached_property
+    def rol(self):
+        if self.user.is_superuser or self.user.is_staff:
+            return 'admin'
+        return self.user.role
+
+    @cached_property
+    def version_catalogo(self):
+        return versiones.obtener_versiones((versiones.CATALOGO, ''))[0]
+
+    @cached_property
+    def version_matriculas(self):
+        return versiones.obtener_versiones((versiones.MATRICULAS, ''))[0]
+
+    @cached_property
+    def version_docente(self):
+        return versiones.obtener_versiones((versiones.DOCENTE, self.user.id))[0]
+
+
+def fragmentos(request):
+    return {'fragmentos': Fragmentos(request.user)}
@@ -0,0 +1,154 @@
+"""
+Inscripción a materias y matrícula en cursos con cupo.
+
+Los contadores Materia.inscritos y Curso.matriculados solo se modifican con
+UPDATE condicionales sobre F(): la reserva del cupo y el incremento son una
+sola sentencia, así que cientos de inscripciones simultáneas nunca superan
+el cupo aunque no haya bloqueos explícitos. La fila de inscripción se crea
+en la misma transacción; si falla (doble envío concurrente) el rollback
+devuelve el cupo reservado. Como update() no pasa por save(), cada UPDATE
+de un contador también renueva actualizado_en (lo usa since= en la API).
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Now
+from django.http import Http404
+
+from .models import Curso, Materia, Matricula, InscripcionMateria, ListaEspera, Notificacion
+
+
+INSCRITO = 'inscrito'
+YA_INSCRITO = 'ya_inscrito'
+EN_ESPERA = 'en_espera'
+YA_EN_ESPERA = 'ya_en_espera'
+SIN_CUPO = 'sin_cupo'
+MATRICULADO = 'matriculado'
+YA_MATRICULADO = 'ya_matriculado'
+
+
+class _SinCupo(Exception):
+    pass
+
+
+def _reservar(modelo, contador, **filtros):
+    """Ocupa un cupo si queda alguno (o no hay límite). Devuelve False si no se pudo."""
+    return modelo.objects.filter(
+        Q(cupo__isnull=True) | Q(**{f'{contador}__lt': F('cupo')}), **filtros
+    ).update(**{contador: F(contador) + 1}, actualizado_en=Now()) == 1
+
+
+def _liberar(modelo, contador, pk):
+    modelo.objects.filter(pk=pk, **{f'{contador}__gt': 0}).update(**{contador: F(contador) - 1}, actualizado_en=Now())
+
+
+def inscribir_materia(estudiante, materia_id, lista_espera=True, solo_activas=True):
+    """
+    Inscribe al estudiante si hay cupo; si la materia está llena lo agrega a la lista
+    de espera (o devuelve SIN_CUPO si lista_espera es False). Repetir la petición no
+    cambia nada: devuelve YA_INSCRITO o YA_EN_ESPERA. El docente inscribe también en
+    sus materias inactivas (solo_activas=False); el estudiante solo en las activas.
+    """
+    filtros = {'activa': True} if solo_activas else {}
+    # El doble clic habitual llega después de que la primera petición terminó
+    if InscripcionMateria.objects.filter(estudiante=estudiante, materia_id=materia_id).exists():
+        return YA_INSCRITO
+    try:
+        with transaction.atomic():
+            if not _reservar(Materia, 'inscritos', pk=materia_id, **filtros):
+                raise _SinCupo
+            InscripcionMateria.objects.create(estudiante=estudiante, materia_id=materia_id)
+            ListaEspera.objects.filter(estudiante=estudiante, materia_id=materia_id).delete()
+    except IntegrityError:
+        # Dos envíos simultáneos: el otro ya inscribió y el rollback devolvió este cupo
+        return YA_INSCRITO
+    except _SinCupo:
+        if not Materia.objects.filter(pk=materia_id, **filtros).exists():
+            raise Http404('Materia no disponible')
+        if not lista_espera:
+            return SIN_CUPO
+        try:
+            with transaction.atomic():
+                ListaEspera.objects.create(estudiante=estudiante, materia_id=materia_id)
+        except IntegrityError:
+            return YA_EN_ESPERA
+        return EN_ESPERA
+    return INSCRITO
+
+
+def desinscribir_materia(inscripcion):
+    """Elimina la inscripción, libera su cupo y lo asigna al primero de la lista de espera."""
+    with transaction.atomic():
+        borradas, _ = InscripcionMateria.objects.filter(pk=inscripcion.pk).delete()
+        if borradas:
+            _liberar(Materia, 'inscritos', inscripcion.materia_id)
+    if borradas:
+        promover_lista_espera(inscripcion.materia_id)
+    return bool(borradas)
+
+
+def promover_lista_espera(materia_id):
+    """Inscribe a los primeros de la lista de espera mientras haya cupo. Devuelve cuántos entraron."""
+    promovidos = 0
+    while True:
+        with transaction.atomic():
+            siguiente = (
+                # of=('self',): bloquear también la materia unida haría que skip_locked saltara
+                # la entrada mientras el UPDATE del cupo tiene esa fila
+                ListaEspera.objects.select_for_update(skip_locked=True, of=('self',))
+                .select_related('materia').filter(materia_id=materia_id).order_by('creada_en', 'id').first()
+            )
+            if siguiente is None or not _reservar(Materia, 'inscritos', pk=materia_id, activa=True):
+                return promovidos
+            try:
+                with transaction.atomic():
+                    InscripcionMateria.objects.create(estudiante_id=siguiente.estudiante_id, materia_id=materia_id)
+            except IntegrityError:
+                # Ya estaba inscrito por otra vía: se descarta su lugar en la lista
+                _liberar(Materia, 'inscritos', materia_id)
+                siguiente.delete()
+                continue
+            siguiente.delete()
+            Notificacion.objects.create(
+                estudiante_id=siguiente.estudiante_id,
+                tipo='general',
+                titulo=f'Cupo asignado en {siguiente.materia.nombre}',
+                mensaje=f'Se liberó un cupo y quedaste inscrito en {siguiente.materia.nombre}.'
+            )
+            promovidos += 1
+
+
+def matricular_curso(estudiante, curso_id):
+    """Matricula al estudiante si el curso tiene cupo. Idempotente ante envíos repetidos."""
+    if Matricula.objects.filter(estudiante=estudiante, curso_id=curso_id).exists():
+        return YA_MATRICULADO
+    try:
+        with transaction.atomic():
+            if not _reservar(Curso, 'matriculados', pk=curso_id, activo=True):
+                raise _SinCupo
+            Matricula.objects.create(estudiante=estudiante, curso_id=curso_id, activa=True)
+    except IntegrityError:
+        return YA_MATRICULADO
+    except _SinCupo:
+        if not Curso.objects.filter(pk=curso_id, activo=True).exists():
+            raise Http404('Curso no disponible')
+        return SIN_CUPO
+    return MATRICULADO
+
+
+def _conteo(modelo, campo, **filtros):
+    return Coalesce(Subquery(
+        modelo.objects.filter(**{campo: OuterRef('pk')}, **filtros)
+        .order_by().values(campo).annotate(n=Count('pk')).values('n'),
+        output_field=IntegerField(),
+    ), Value(0))
+
+
+def recalcular_contadores(materia_ids=None, curso_ids=None):
+    """
+    Recalcula los contadores desde las filas reales. Lo usan los caminos que no pasan
+    por este módulo (admin de Django, seed_escuela).
+    """
+    materias = Materia.objects.all() if materia_ids is None else Materia.objects.filter(pk__in=materia_ids)
+    cursos = Curso.objects.all() if curso_ids is None else Curso.objects.filter(pk__in=curso_ids)
+    materias.update(inscritos=_conteo(InscripcionMateria, 'materia'), actualizado_en=Now())
+    cursos.update(matriculados=_conteo(Matricula, 'curso', activa=True), actualizado_en=Now())
@@ -0,0 +1,53 @@
+"""
+Entorno Jinja2 para las plantillas de tablas grandes (jinja2/).
+
+Se activa con JINJA2_TEMPLATES=True. Django busca cada plantilla primero en
+jinja2/ y, si no existe una versión Jinja2, usa la de templates/. Las
+plantillas se compilan a bytecode una vez y el bytecode se guarda en disco,
+así que los workers nuevos no vuelven a compilarlas.
+
+Para que ambas versiones produzcan el mismo HTML, cada valor impreso pasa
+por la zona horaria y el formato local como en las plantillas de Django, y
+el filtro date es el de Django.
+"""
+import os
+
+from django.conf import settings
+from django.template.backends import jinja2 as backend_jinja2
+from django.template.defaultfilters import date as _date
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils.formats import localize
+from django.utils.timezone import template_localtime
+from jinja2 import Environment, FileSystemBytecodeCache
+
+from .plantillas import MotorCronometrado
+
+
+def _mostrar(valor):
+    return localize(template_localtime(valor))
+
+
+def fecha(valor, formato=None):
+    """Filtro date de Django sobre la hora local, como en {{ valor|date:"..." }}."""
+    return _date(template_localtime(valor), formato)
+
+
+def url(nombre, *args):
+    return reverse(nombre, args=args)
+
+
+def entorno(**opciones):
+    # Sin directorio configurado, Jinja2 usa uno propio dentro del directorio temporal
+    directorio = settings.JINJA2_BYTECODE_DIR or None
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    opciones.setdefault('bytecode_cache', FileSystemBytecodeCache(directorio))
+    env = Environment(finalize=_mostrar, trim_blocks=True, lstrip_blocks=True, **opciones)
+    env.globals.update(static=static, url=url)
+    env.filters['date'] = fecha
+    return env
+
+
+class Jinja2(MotorCronometrado, backend_jinja2.Jinja2):
+    """El motor Jinja2 de Django con el tiempo de render en las métricas de la petición."""
@@ -0,0 +1,108 @@
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Lo que hace un worker al arrancar y al atender su primera petición: configurar
+# Django e importar todas las vistas al resolver las URLs
+_SCRIPT = '''
+import json, sys, time
+inicio = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+from django.urls import get_resolver
+resolver = get_resolver()
+resolver.resolve('/')
+resolver.reverse_dict
+fin = time.perf_counter()
+print(json.dumps({
+    'setup_ms': (setup - inicio) * 1000,
+    'urls_ms': (fin - setup) * 1000,
+    'total_ms': (fin - inicio) * 1000,
+    'modulos': sorted(sys.modules),
+}))
+'''
+
+_RE_IMPORTTIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def medir_arranque(importtime=False):
+    """
+    Arranca Django en un proceso nuevo (sin módulos ya importados) y devuelve los
+    tiempos de setup y de resolución de URLs, los módulos cargados y, con
+    importtime, el costo propio en microsegundos de cada módulo.
+    """
+    comando = [sys.executable]
+    if importtime:
+        comando += ['-X', 'importtime']
+    comando += ['-c', _SCRIPT]
+    entorno = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'estudify.settings')}
+    proceso = subprocess.run(
+        comando, cwd=settings.BASE_DIR, env=entorno, capture_output=True, text=True, check=False
+    )
+    if proceso.returncode:
+        raise CommandError(f'El arranque falló:\n{proceso.stderr[-2000:]}')
+    resultado = json.loads(proceso.stdout.strip().splitlines()[-1])
+    if importtime:
+        resultado['importtime_us'] = {
+            match.group(4): int(match.group(1))
+            for match in map(_RE_IMPORTTIME.match, proceso.stderr.splitlines()) if match
+        }
+    return resultado
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide el arranque de un worker (django.setup() y resolución de URLs) en procesos nuevos '
+        'y lista los paquetes que más tardan en importarse (python -X importtime)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticiones', type=int, default=5)
+        parser.add_argument('--top', type=int, default=15, help='Paquetes a listar por tiempo de importación')
+        parser.add_argument('--presupuesto-ms', type=float, help='Falla si la mediana del total lo supera')
+        parser.add_argument('--salida', default=os.path.join(settings.BASE_DIR, 'benchmarks', 'arranque.json'))
+
+    def handle(self, *args, **options):
+        mediciones = [medir_arranque() for _ in range(options['repeticiones'])]
+        detalle = medir_arranque(importtime=True)
+
+        # Costo propio agrupado por paquete de primer nivel
+        paquetes = {}
+        for modulo, microsegundos in detalle['importtime_us'].items():
+            raiz = modulo.split('.')[0]
+            paquetes[raiz] = paquetes.get(raiz, 0) + microsegundos
+        top = sorted(paquetes.items(), key=lambda item: item[1], reverse=True)[:options['top']]
+
+        resultado = {
+            clave: round(statistics.median(m[clave] for m in mediciones), 1)
+            for clave in ('setup_ms', 'urls_ms', 'total_ms')
+        }
+        resultado['repeticiones'] = options['repeticiones']
+        resultado['modulos_cargados'] = len(detalle['modulos'])
+        resultado['importacion_por_paquete_ms'] = {raiz: round(us / 1000, 1) for raiz, us in top}
+
+        self.stdout.write(
+            f'django.setup(): {resultado["setup_ms"]} ms, URLs: {resultado["urls_ms"]} ms, '
+            f'total: {resultado["total_ms"]} ms (mediana de {options["repeticiones"]}), '
+            f'{resultado["modulos_cargados"]} módulos'
+        )
+        for raiz, ms in resultado['importacion_por_paquete_ms'].items():
+            self.stdout.write(f'  {raiz:30} {ms:>8.1f} ms')
+
+        os.makedirs(os.path.dirname(os.path.abspath(options['salida'])), exist_ok=True)
+        with open(options['salida'], 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+        self.stdout.write(self.style.SUCCESS(f'Resultados guardados en {options["salida"]}'))
+
+        if options['presupuesto_ms'] is not None and resultado['total_ms'] > options['presupuesto_ms']:
+            raise CommandError(
+                f'El arranque tarda {resultado["total_ms"]} ms, más que el presupuesto de {options["presupuesto_ms"]} ms'
+            )
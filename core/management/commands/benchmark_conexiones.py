@@ -0,0 +1,140 @@
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+class _Monitor(threading.Thread):
+    """Cuenta las conexiones abiertas en el servidor (pg_stat_activity) desde una conexión propia, fuera del pool."""
+
+    def __init__(self, intervalo):
+        super().__init__(daemon=True)
+        self.intervalo = intervalo
+        self.muestras = []
+        self.detener = threading.Event()
+
+    def run(self):
+        # Conexión directa del driver: no ocupa lugar en el pool ni se cuenta como del pool
+        parametros = connection.get_connection_params()
+        parametros.pop('cursor_factory', None)
+        conexion = connection.Database.connect(**parametros)
+        conexion.autocommit = True
+        try:
+            cursor = conexion.cursor()
+            while not self.detener.is_set():
+                cursor.execute(
+                    'SELECT count(*) FROM pg_stat_activity WHERE datname = current_database() AND pid <> pg_backend_pid()'
+                )
+                self.muestras.append(cursor.fetchone()[0])
+                self.detener.wait(self.intervalo)
+        finally:
+            conexion.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide la latencia para obtener una conexión y las conexiones abiertas en PostgreSQL '
+        'simulando peticiones concurrentes con el modo de conexión actual (DB_POOL)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hilos', type=int, default=16, help='Peticiones concurrentes (hilos de gunicorn)')
+        parser.add_argument('--peticiones', type=int, default=200, help='Peticiones por hilo')
+        parser.add_argument('--consultas', type=int, default=3, help='Consultas por petición')
+        parser.add_argument('--trabajo-ms', type=float, default=5, help='Tiempo de aplicación por petición')
+        parser.add_argument('--salida', default=os.path.join(settings.BASE_DIR, 'benchmarks', 'conexiones.json'))
+
+    def handle(self, *args, **options):
+        pool = 'pool' in connection.settings_dict.get('OPTIONS', {})
+        conn_max_age = connection.settings_dict['CONN_MAX_AGE']
+        if pool:
+            modo = 'pool'
+        elif conn_max_age:
+            modo = f'persistente (CONN_MAX_AGE={conn_max_age})'
+        else:
+            modo = 'conexión por petición'
+        self.stdout.write(f'Motor: {connection.vendor}, modo: {modo}, hilos: {options["hilos"]}')
+
+        monitor = _Monitor(0.05) if connection.vendor == 'postgresql' else None
+        if monitor:
+            monitor.start()
+
+        adquisiciones = []
+        totales = []
+        errores = []
+        lock = threading.Lock()
+
+        def trabajador():
+            propias, duraciones = [], []
+            try:
+                for _ in range(options['peticiones']):
+                    # Mismo ciclo que request_started / request_finished
+                    close_old_connections()
+                    inicio = time.perf_counter()
+                    connection.ensure_connection()
+                    propias.append(time.perf_counter() - inicio)
+                    with connection.cursor() as cursor:
+                        for _ in range(options['consultas']):
+                            cursor.execute('SELECT 1')
+                            cursor.fetchone()
+                    time.sleep(options['trabajo_ms'] / 1000)
+                    close_old_connections()
+                    duraciones.append(time.perf_counter() - inicio)
+            except Exception as error:
+                with lock:
+                    errores.append(f'{type(error).__name__}: {error}')
+            finally:
+                connection.close()
+                with lock:
+                    adquisiciones.extend(propias)
+                    totales.extend(duraciones)
+
+        inicio = time.perf_counter()
+        hilos = [threading.Thread(target=trabajador) for _ in range(options['hilos'])]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        duracion = time.perf_counter() - inicio
+
+        if monitor:
+            monitor.detener.set()
+            monitor.join()
+
+        resultado = {
+            'motor': connection.vendor,
+            'modo': modo,
+            'parametros': {clave: options[clave] for clave in ('hilos', 'peticiones', 'consultas', 'trabajo_ms')},
+            'peticiones': len(totales),
+            'errores': len(errores),
+            'rps': round(len(totales) / duracion, 1),
+            'adquirir_ms': {
+                f'p{p}': round(_percentil(adquisiciones, p) * 1000, 3) for p in (50, 95, 99)
+            } if adquisiciones else None,
+            'peticion_ms': {
+                f'p{p}': round(_percentil(totales, p) * 1000, 3) for p in (50, 95, 99)
+            } if totales else None,
+            'conexiones_servidor': {
+                'max': max(monitor.muestras),
+                'promedio': round(sum(monitor.muestras) / len(monitor.muestras), 1),
+            } if monitor and monitor.muestras else None,
+        }
+        if pool and connection.pool is not None:
+            resultado['pool'] = connection.pool.get_stats()
+
+        for error in sorted(set(errores))[:5]:
+            self.stdout.write(self.style.ERROR(error))
+        self.stdout.write(json.dumps(resultado, indent=2, ensure_ascii=False))
+        os.makedirs(os.path.dirname(os.path.abspath(options['salida'])), exist_ok=True)
+        with open(options['salida'], 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+        self.stdout.write(self.style.SUCCESS(f'Resultados guardados en {options["salida"]}'))
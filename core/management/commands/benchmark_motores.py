@@ -0,0 +1,159 @@
+import json
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.template import engines
+from django.template.backends.jinja2 import Jinja2
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from core.models import Asistencia, Calificacion, Curso, Materia
+
+
+ESTADOS = ('presente', 'ausente', 'tardanza', 'excusado')
+
+
+def _personas(n, role):
+    return [
+        CustomUser(id=i + 1, username=f'{role}{i}', first_name=f'Nombre {i}', last_name=f'Apellido {i}',
+                   email=f'{role}{i}@estudify.com', role=role, is_active=i % 7 != 0)
+        for i in range(n)
+    ]
+
+
+def _materias(n):
+    cursos = [Curso(id=i + 1, nombre=f'{10 + i}°', año_escolar='2025-2026') for i in range(3)]
+    return [Materia(id=i + 1, nombre=f'Materia {i}', codigo=f'MAT{i}', curso=cursos[i % 3]) for i in range(n)]
+
+
+def _calificaciones(filas):
+    estudiantes, materias = _personas(100, 'estudiante'), _materias(10)
+    registro = timezone.now()
+    return [
+        Calificacion(
+            id=i + 1, estudiante=estudiantes[i % 100], materia=materias[i % 10], periodo=str(i % 4 + 1),
+            nota=Decimal(10 + i % 41) / 10, observaciones='' if i % 3 else 'Buen trabajo',
+            fecha_registro=registro - timedelta(hours=i),
+        )
+        for i in range(filas)
+    ]
+
+
+def _asistencias(filas):
+    estudiantes, materias = _personas(100, 'estudiante'), _materias(10)
+    inicio = date(2025, 2, 3)
+    return [
+        Asistencia(
+            id=i + 1, estudiante=estudiantes[i % 100], materia=materias[i % 10],
+            fecha=inicio + timedelta(days=i % 200), estado=ESTADOS[i % 4], observaciones='' if i % 5 else 'Cita médica',
+        )
+        for i in range(filas)
+    ]
+
+
+def _por_materia(calificaciones):
+    grupos = {}
+    for cal in calificaciones:
+        grupos.setdefault(cal.materia.id, {'materia': cal.materia, 'calificaciones': [], 'promedio': 3.5})
+        grupos[cal.materia.id]['calificaciones'].append(cal)
+    return grupos
+
+
+def _historial_asistencias(filas):
+    pagina = Paginator(_asistencias(filas), filas).page(1)
+    return {
+        'asistencias': pagina, 'page_obj': pagina, 'resumen_materias': [], 'resumen_meses': [],
+        'total': filas, 'presentes': filas // 4, 'ausentes': filas // 4, 'porcentaje_asistencia': 25.0,
+    }
+
+
+# Plantilla, rol del usuario que la ve y contexto con N filas (objetos sin guardar, sin consultas)
+PLANTILLAS = {
+    'teacher/calificaciones_lista.html': ('docente', lambda filas: {'calificaciones': _calificaciones(filas)}),
+    'teacher/asistencias_lista.html': ('docente', lambda filas: {'asistencias': _asistencias(filas)}),
+    'admin/usuarios_lista.html': ('admin', lambda filas: {'usuarios': _personas(filas, 'estudiante')}),
+    'student/calificaciones.html': (
+        'estudiante', lambda filas: {'calificaciones_por_materia': _por_materia(_calificaciones(filas))}
+    ),
+    'student/asistencias.html': ('estudiante', lambda filas: _historial_asistencias(filas)),
+}
+
+
+def _motor_jinja2(directorio_bytecode):
+    """Motor Jinja2 con la configuración de settings.TEMPLATES_JINJA2 y un directorio de bytecode propio."""
+    with override_settings(JINJA2_BYTECODE_DIR=directorio_bytecode):
+        params = {clave: valor for clave, valor in settings.TEMPLATES_JINJA2.items() if clave != 'BACKEND'}
+        return Jinja2({**params, 'NAME': 'jinja2'})
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara el render de las plantillas de tablas grandes con el motor de Django y con Jinja2 '
+        'a distintos tamaños (objetos sin guardar, sin consultas)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, nargs='+', default=[1000, 10000])
+        parser.add_argument('--iteraciones', type=int, default=5)
+        parser.add_argument('--plantillas', nargs='+', choices=list(PLANTILLAS), default=list(PLANTILLAS))
+        parser.add_argument('--salida', default=os.path.join(settings.BASE_DIR, 'benchmarks', 'motores.json'),
+                            help='Archivo JSON de resultados')
+
+    def handle(self, *args, **options):
+        django_motor = engines['django']
+        factory = RequestFactory()
+        resultados = {}
+        with tempfile.TemporaryDirectory() as directorio:
+            for nombre in options['plantillas']:
+                rol, construir = PLANTILLAS[nombre]
+                request = factory.get('/')
+                request.user = CustomUser(id=1, username=rol, role=rol, is_staff=rol == 'admin')
+
+                # Compilación en un proceso nuevo: sin bytecode y con el bytecode ya en disco
+                inicio = time.perf_counter()
+                _motor_jinja2(directorio).get_template(nombre)
+                compilar_ms = (time.perf_counter() - inicio) * 1000
+                inicio = time.perf_counter()
+                _motor_jinja2(directorio).get_template(nombre)
+                bytecode_ms = (time.perf_counter() - inicio) * 1000
+
+                plantillas = {
+                    'django': django_motor.get_template(nombre),
+                    'jinja2': _motor_jinja2(directorio).get_template(nombre),
+                }
+                resultados[nombre] = {
+                    'compilar_jinja2_ms': round(compilar_ms, 2),
+                    'cargar_bytecode_jinja2_ms': round(bytecode_ms, 2),
+                }
+                for filas in options['filas']:
+                    contexto = construir(filas)
+                    medidas = {}
+                    for motor, plantilla in plantillas.items():
+                        tiempos = []
+                        for _ in range(options['iteraciones']):
+                            inicio = time.perf_counter()
+                            plantilla.render(contexto, request)
+                            tiempos.append((time.perf_counter() - inicio) * 1000)
+                        medidas[f'{motor}_ms'] = round(statistics.median(tiempos), 1)
+                    medidas['aceleracion'] = round(medidas['django_ms'] / medidas['jinja2_ms'], 1)
+                    resultados[nombre][filas] = medidas
+                    self.stdout.write(
+                        f'{nombre:35} {filas:>6} filas  django={medidas["django_ms"]:8.1f}ms '
+                        f'jinja2={medidas["jinja2_ms"]:8.1f}ms  x{medidas["aceleracion"]}'
+                    )
+                self.stdout.write(
+                    f'{"":35} compilación jinja2={compilar_ms:.1f}ms, desde bytecode={bytecode_ms:.1f}ms'
+                )
+
+        os.makedirs(os.path.dirname(os.path.abspath(options['salida'])), exist_ok=True)
+        with open(options['salida'], 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        self.stdout.write(self.style.SUCCESS(f'Resultados guardados en {options["salida"]}'))
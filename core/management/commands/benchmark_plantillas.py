@@ -0,0 +1,122 @@
+import json
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.template import engines
+from django.template.backends.django import Template as DjangoTemplate
+from django.test import Client, override_settings
+
+from core import urls as core_urls
+from .benchmark_vistas import Command as BenchmarkVistas
+
+
+# Listas grandes de templates/teacher y templates/admin, y el dashboard con cursos_populares
+VISTAS = (
+    'teacher_calificaciones_lista',
+    'teacher_asistencias_lista',
+    'teacher_estudiantes_materia',
+    'admin_usuarios_lista',
+    'admin_cursos_lista',
+    'admin_materias_lista',
+    'admin_dashboard',
+)
+
+SIN_CACHE = {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+
+
+@contextmanager
+def _capturar_render():
+    """Registra la plantilla, el contexto y la petición de cada render de primer nivel."""
+    capturas = []
+    render = DjangoTemplate.render
+
+    def registrar(self, context=None, request=None):
+        capturas.append((self, context, request))
+        return render(self, context, request)
+
+    DjangoTemplate.render = registrar
+    try:
+        yield capturas
+    finally:
+        DjangoTemplate.render = render
+
+
+class Command(BenchmarkVistas):
+    help = (
+        'Mide el render de las plantillas de las listas grandes de docente y administrador: '
+        'carga (loader), render sin fragmentos en caché y con fragmentos en caché'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iteraciones', type=int, default=20, help='Renders medidos por plantilla y modo')
+        parser.add_argument('--vistas', nargs='+', default=list(VISTAS), help='Nombres de URL cuyas plantillas medir')
+        parser.add_argument('--salida', default=os.path.join(settings.BASE_DIR, 'benchmarks', 'plantillas.json'),
+                            help='Archivo JSON de resultados')
+
+    def handle(self, *args, **options):
+        escenario = self._escenario()
+        patrones = {patron.name: patron for patron in core_urls.urlpatterns}
+        motor = engines['django'].engine
+        resultados = {}
+        for nombre in options['vistas']:
+            if nombre not in patrones:
+                raise CommandError(f'No existe la URL {nombre}')
+            url = self._url(patrones[nombre], escenario)
+            if url is None:
+                self.stdout.write(self.style.WARNING(f'{nombre}: sin datos para construir la URL, se omite'))
+                continue
+
+            # El contexto real de la vista: se pide la página y se captura su render
+            client = Client()
+            client.force_login(self._usuario(nombre, escenario))
+            with _capturar_render() as capturas:
+                response = client.get(url)
+            if response.status_code != 200 or not capturas:
+                self.stdout.write(self.style.WARNING(f'{nombre}: respondió {response.status_code}, se omite'))
+                continue
+            plantilla, contexto, request = capturas[0]
+            contexto = dict(contexto or {})
+
+            def medir(funcion):
+                tiempos = []
+                for _ in range(options['iteraciones']):
+                    inicio = time.perf_counter()
+                    funcion()
+                    tiempos.append((time.perf_counter() - inicio) * 1000)
+                return round(statistics.median(tiempos), 3)
+
+            # {% cache %} usa la caché "template_fragments" si existe: una DummyCache los desactiva
+            with override_settings(CACHES={**settings.CACHES, 'template_fragments': SIN_CACHE}):
+                sin_fragmentos = medir(lambda: plantilla.render(contexto, request))
+            plantilla.render(contexto, request)  # Deja los fragmentos en caché
+            resultados[nombre] = {
+                'plantilla': plantilla.template.name,
+                'carga_ms': medir(lambda: motor.get_template(plantilla.template.name)),
+                'render_sin_fragmentos_ms': sin_fragmentos,
+                'render_con_fragmentos_ms': medir(lambda: plantilla.render(contexto, request)),
+                'bytes': len(response.content),
+            }
+            r = resultados[nombre]
+            self.stdout.write(
+                f'{nombre:30} {r["plantilla"]:32} carga={r["carga_ms"]:7.3f}ms '
+                f'sin fragmentos={r["render_sin_fragmentos_ms"]:8.2f}ms '
+                f'con fragmentos={r["render_con_fragmentos_ms"]:8.2f}ms'
+            )
+
+        informe = {
+            'metadatos': {
+                **self._metadatos({**options, 'cache_frio': False}),
+                'loaders': [loader.__class__.__module__ + '.' + loader.__class__.__name__
+                            for loader in motor.template_loaders],
+                'fragment_cache_timeout': settings.FRAGMENT_CACHE_TIMEOUT,
+            },
+            'plantillas': resultados,
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(options['salida'])), exist_ok=True)
+        with open(options['salida'], 'w', encoding='utf-8') as f:
+            json.dump(informe, f, indent=2, ensure_ascii=False)
+        self.stdout.write(self.style.SUCCESS(f'Resultados guardados en {options["salida"]}'))
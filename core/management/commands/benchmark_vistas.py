@@ -0,0 +1,301 @@
+import gzip
+import json
+import os
+import platform
+import re
+import subprocess
+import time
+import tracemalloc
+from contextlib import ExitStack
+from datetime import datetime
+
+import django
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from core import urls as core_urls
+from core.models import Curso, Materia, Matricula, InscripcionMateria, Calificacion, Asistencia, Notificacion
+from core.streaming import CABECERA_PARCIAL
+
+
+# Métricas comparadas en --comparar y si un aumento es una regresión
+METRICAS = (
+    'p50_ms', 'p95_ms', 'primer_byte_p50_ms', 'consultas', 'memoria_kb', 'bytes_gzip', 'bytes_estaticos_gzip'
+)
+
+_RE_ESTATICOS = re.compile(r'(?:href|src)="([^"?#]+)')
+
+
+def _percentil(valores, p):
+    """Percentil por rango más cercano."""
+    ordenados = sorted(valores)
+    indice = max(0, min(len(ordenados) - 1, round(p / 100 * len(ordenados) + 0.5) - 1))
+    return ordenados[indice]
+
+
+class _ContadorConsultas:
+    def __init__(self):
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.total += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = 'Mide latencia (p50/p95), consultas y memoria de cada vista de core/urls.py sobre la base actual'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iteraciones', type=int, default=30, help='Peticiones medidas por vista')
+        parser.add_argument('--calentamiento', type=int, default=3, help='Peticiones descartadas por vista')
+        parser.add_argument('--vistas', nargs='+', help='Nombres de URL a medir (por defecto todas)')
+        parser.add_argument('--cache-frio', action='store_true', help='Vacía la caché antes de cada petición')
+        parser.add_argument('--parcial', action='store_true',
+                            help='Pide solo las filas de las listas, como los filtros (cabecera X-Parcial)')
+        parser.add_argument('--salida', default=os.path.join(settings.BASE_DIR, 'benchmarks', 'vistas.json'),
+                            help='Archivo JSON de resultados')
+        parser.add_argument('--comparar', nargs=2, metavar=('BASE', 'NUEVO'),
+                            help='Compara dos archivos de resultados en lugar de medir')
+        parser.add_argument('--tolerancia', type=float, default=0.15,
+                            help='Aumento relativo de latencia o memoria que se considera regresión')
+
+    def handle(self, *args, **options):
+        if options['comparar']:
+            return self._comparar(*options['comparar'], options['tolerancia'])
+
+        escenario = self._escenario()
+        patrones = [p for p in core_urls.urlpatterns if not options['vistas'] or p.name in options['vistas']]
+        resultados = {}
+        for patron in patrones:
+            url = self._url(patron, escenario)
+            if url is None:
+                self.stdout.write(self.style.WARNING(f'{patron.name}: sin datos para construir la URL, se omite'))
+                continue
+            resultados[patron.name] = self._medir(url, self._usuario(patron.name, escenario), options)
+            r = resultados[patron.name]
+            self.stdout.write(
+                f'{patron.name:35} p50={r["p50_ms"]:7.1f}ms p95={r["p95_ms"]:7.1f}ms '
+                f'primer byte={r["primer_byte_p50_ms"]:7.1f}ms '
+                f'consultas={r["consultas"]:3} memoria={r["memoria_kb"]:8.1f}KB  {r["rps"]:6.1f} req/s '
+                f'html={r["bytes_gzip"] / 1024:5.1f}KB gzip'
+            )
+
+        informe = {'metadatos': self._metadatos(options), 'vistas': resultados}
+        os.makedirs(os.path.dirname(os.path.abspath(options['salida'])), exist_ok=True)
+        with open(options['salida'], 'w', encoding='utf-8') as f:
+            json.dump(informe, f, indent=2, ensure_ascii=False)
+        self.stdout.write(self.style.SUCCESS(f'Resultados guardados en {options["salida"]}'))
+
+    # ---------------------------------------------------------------- escenario
+
+    def _escenario(self):
+        """Usuarios e ids representativos: el docente con más materias y un estudiante de su materia más grande."""
+        admin = CustomUser.objects.filter(is_superuser=True).first() or CustomUser.objects.filter(role='admin').first()
+        if admin is None:
+            raise CommandError('No hay administrador; crea uno con manage.py createsuperuser')
+        docente = (
+            CustomUser.objects.filter(role='docente')
+            .annotate(n=Count('materias_impartidas')).order_by('-n', 'id').first()
+        )
+        materia = (
+            Materia.objects.filter(docente=docente)
+            .annotate(n=Count('inscripciones_estudiantes')).order_by('-n', 'id').first()
+        )
+        if materia is None:
+            raise CommandError('No hay materias con docente; genera datos con manage.py seed_escuela')
+        inscripciones = InscripcionMateria.objects.filter(materia=materia).order_by('id')
+        # Preferentemente un estudiante con notificaciones, para poder medir student_marcar_leida
+        inscripcion = (
+            inscripciones.filter(estudiante__notificaciones__isnull=False).first() or inscripciones.first()
+        )
+        estudiante = inscripcion.estudiante if inscripcion else None
+
+        def primero(queryset):
+            return queryset.order_by('id').values_list('id', flat=True).first()
+
+        return {
+            'usuarios': {'admin': admin, 'docente': docente, 'estudiante': estudiante},
+            'kwargs': {
+                'user_id': estudiante.id if estudiante else None,
+                'curso_id': materia.curso_id,
+                'materia_id': materia.id,
+                'calificacion_id': primero(Calificacion.objects.filter(materia=materia)),
+                'asistencia_id': primero(Asistencia.objects.filter(materia=materia)),
+                'inscripcion_id': inscripcion.id if inscripcion else None,
+                'notificacion_id': primero(Notificacion.objects.filter(estudiante=estudiante)),
+            },
+            'query_strings': {
+                'teacher_generar_reporte': f'?materia={materia.id}',
+                'teacher_estudiantes_materia': f'?materia={materia.id}',
+            },
+        }
+
+    def _usuario(self, nombre, escenario):
+        usuarios = escenario['usuarios']
+        if nombre.startswith('admin_'):
+            return usuarios['admin']
+        if nombre.startswith('teacher_'):
+            return usuarios['docente']
+        if nombre.startswith(('student_', 'estudiante_')):
+            return usuarios['estudiante']
+        return None
+
+    def _url(self, patron, escenario):
+        kwargs = {clave: escenario['kwargs'][clave] for clave in patron.pattern.converters}
+        if None in kwargs.values():
+            return None
+        return reverse(patron.name, kwargs=kwargs) + escenario['query_strings'].get(patron.name, '')
+
+    # ---------------------------------------------------------------- medición
+
+    def _medir(self, url, usuario, options):
+        client = Client(headers={CABECERA_PARCIAL: 'filas'} if options['parcial'] else None)
+        if usuario is not None:
+            client.force_login(usuario)
+
+        def pedir(conservar=True):
+            """Devuelve la respuesta, su contenido y los segundos hasta el primer byte."""
+            if options['cache_frio']:
+                cache.clear()
+            inicio = time.perf_counter()
+            response = client.get(url)
+            if not response.streaming:
+                return response, response.content, time.perf_counter() - inicio
+            # En streaming el primer byte sale con el primer bloque; el resto se lee aquí
+            bloques = iter(response.streaming_content)
+            primero = next(bloques, b'')
+            primer_byte = time.perf_counter() - inicio
+            if conservar:
+                return response, primero + b''.join(bloques), primer_byte
+            for _ in bloques:
+                pass
+            return response, primero, primer_byte
+
+        for _ in range(options['calentamiento']):
+            pedir()
+
+        tiempos = []
+        primeros_bytes = []
+        contador = _ContadorConsultas()
+        with ExitStack() as stack:
+            for conexion in connections.all():
+                stack.enter_context(conexion.execute_wrapper(contador))
+            for _ in range(options['iteraciones']):
+                inicio = time.perf_counter()
+                response, html, primer_byte = pedir()
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+                primeros_bytes.append(primer_byte * 1000)
+
+        # La memoria se mide en una petición aparte: tracemalloc distorsiona la latencia.
+        # En streaming los bloques se descartan al leerlos, como hace el servidor al enviarlos
+        tracemalloc.start()
+        try:
+            base = tracemalloc.get_traced_memory()[0]
+            pedir(conservar=False)
+            pico = tracemalloc.get_traced_memory()[1] - base
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'url': url,
+            'status': response.status_code,
+            'iteraciones': len(tiempos),
+            'p50_ms': round(_percentil(tiempos, 50), 2),
+            'p95_ms': round(_percentil(tiempos, 95), 2),
+            'primer_byte_p50_ms': round(_percentil(primeros_bytes, 50), 2),
+            'max_ms': round(max(tiempos), 2),
+            'rps': round(len(tiempos) / (sum(tiempos) / 1000), 1),
+            'consultas': round(contador.total / len(tiempos), 1),
+            'memoria_kb': round(pico / 1024, 1),
+            # Lo que descarga el navegador: el HTML en cada visita y los estáticos la primera vez
+            'bytes': len(html),
+            'bytes_gzip': len(gzip.compress(html)),
+            'bytes_estaticos_gzip': sum(len(gzip.compress(contenido)) for contenido in self._estaticos(html)),
+        }
+
+    def _estaticos(self, html):
+        """Contenido de los archivos de STATIC_URL que enlaza la página (CSS, JS, imágenes)."""
+        contenidos = []
+        for url in dict.fromkeys(_RE_ESTATICOS.findall(html.decode('utf-8', 'replace'))):
+            if not url.startswith(settings.STATIC_URL):
+                continue
+            nombre = url[len(settings.STATIC_URL):]
+            # Con el manifiesto el nombre lleva el hash y está en STATIC_ROOT (collectstatic)
+            ruta = staticfiles_storage.path(nombre)
+            if not os.path.exists(ruta):
+                ruta = finders.find(nombre)
+            if ruta:
+                with open(ruta, 'rb') as f:
+                    contenidos.append(f.read())
+        return contenidos
+
+    def _metadatos(self, options):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'commit': commit,
+            'motor': connections['default'].vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'iteraciones': options['iteraciones'],
+            'cache_frio': options['cache_frio'],
+            'parcial': options.get('parcial', False),
+            'filas': {
+                modelo._meta.db_table: modelo.objects.count()
+                for modelo in (CustomUser, Curso, Materia, Matricula, InscripcionMateria,
+                               Calificacion, Asistencia, Notificacion)
+            },
+        }
+
+    # ---------------------------------------------------------------- comparación
+
+    def _comparar(self, ruta_base, ruta_nuevo, tolerancia):
+        informes = []
+        for ruta in (ruta_base, ruta_nuevo):
+            try:
+                with open(ruta, encoding='utf-8') as f:
+                    informes.append(json.load(f))
+            except (OSError, ValueError) as error:
+                raise CommandError(f'No se pudo leer {ruta}: {error}')
+        base, nuevo = (informe['vistas'] for informe in informes)
+
+        regresiones = []
+        for nombre in sorted(base.keys() & nuevo.keys()):
+            for metrica in METRICAS:
+                if metrica not in base[nombre] or metrica not in nuevo[nombre]:
+                    continue  # Informe de una versión anterior del comando
+                antes, despues = base[nombre][metrica], nuevo[nombre][metrica]
+                # Cualquier consulta de más es regresión; en tiempos, memoria y bytes se tolera el ruido
+                if metrica == 'consultas':
+                    empeora = despues > antes
+                else:
+                    empeora = despues > antes * (1 + tolerancia)
+                cambio = f'{(despues - antes) / antes * 100:+.0f}%' if antes else 'n/a'
+                linea = f'{nombre:35} {metrica:11} {antes:>10} -> {despues:<10} {cambio}'
+                if empeora:
+                    regresiones.append(linea)
+                    self.stdout.write(self.style.ERROR(linea))
+                elif despues < antes:
+                    self.stdout.write(self.style.SUCCESS(linea))
+
+        sueltas = sorted(base.keys() ^ nuevo.keys())
+        if sueltas:
+            self.stdout.write(self.style.WARNING(f'Solo en uno de los informes: {", ".join(sueltas)}'))
+
+        if regresiones:
+            raise CommandError(f'{len(regresiones)} regresiones (tolerancia {tolerancia:.0%})')
+        self.stdout.write(self.style.SUCCESS('Sin regresiones'))
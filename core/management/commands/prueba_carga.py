@@ -0,0 +1,148 @@
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from core.carga import ESCENARIOS, ejecutar
+from core.models import Curso, Materia, InscripcionMateria
+
+
+class Command(BaseCommand):
+    help = 'Simula picos de inscripción y de cierre de notas con usuarios virtuales concurrentes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--escenario', choices=sorted(ESCENARIOS), default='mixto')
+        parser.add_argument('--url', default='http://127.0.0.1:8001', help='Servidor a probar')
+        parser.add_argument('--iniciar', action='store_true', help='Levanta gunicorn localmente en el puerto de --url')
+        parser.add_argument('--workers', type=int, default=4, help='Workers de gunicorn con --iniciar')
+        parser.add_argument(
+            '--asgi', action='store_true', help='Con --iniciar usa workers de uvicorn (estudify.asgi) en lugar de WSGI'
+        )
+        parser.add_argument('--usuarios', type=int, default=50, help='Usuarios virtuales concurrentes')
+        parser.add_argument('--duracion', type=float, default=30, help='Segundos de prueba')
+        parser.add_argument('--rampa', type=float, default=5, help='Segundos para llegar a todos los usuarios')
+        parser.add_argument('--pausa', type=float, default=0, help='Segundos de espera entre pasos')
+        parser.add_argument('--prefijo', default='seed', help='Prefijo de los usuarios de seed_escuela')
+        parser.add_argument('--clave', default='estudify123', help='Contraseña de los usuarios de prueba')
+        parser.add_argument('--semilla', type=int, default=1)
+        parser.add_argument('--salida', default=os.path.join(settings.BASE_DIR, 'benchmarks', 'carga.json'))
+
+    def handle(self, *args, **options):
+        datos = self._datos(options)
+        servidor = self._iniciar_gunicorn(options) if options['iniciar'] else None
+        try:
+            self.stdout.write(
+                f'Escenario {options["escenario"]}: {options["usuarios"]} usuarios durante {options["duracion"]:.0f}s '
+                f'contra {options["url"]}'
+            )
+            resumen = asyncio.run(ejecutar(
+                options['url'], options['escenario'], datos, options['usuarios'], options['duracion'],
+                pausa=options['pausa'], semilla=options['semilla'], rampa=options['rampa'],
+            ))
+        finally:
+            if servidor is not None:
+                servidor.terminate()
+                servidor.wait(timeout=30)
+
+        self._imprimir(resumen)
+        resumen['parametros'] = {
+            clave: options[clave] for clave in ('escenario', 'url', 'asgi', 'workers', 'usuarios', 'duracion', 'pausa')
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(options['salida'])), exist_ok=True)
+        with open(options['salida'], 'w', encoding='utf-8') as f:
+            json.dump(resumen, f, indent=2, ensure_ascii=False)
+        self.stdout.write(self.style.SUCCESS(f'Resultados guardados en {options["salida"]}'))
+
+    def _datos(self, options):
+        """Usuarios y ids que usan los recorridos (los genera seed_escuela)."""
+        prefijo = options['prefijo']
+        estudiantes = list(
+            CustomUser.objects.filter(username__startswith=f'{prefijo}_', role='estudiante', is_active=True)
+            .order_by('id').values_list('username', flat=True)[:5000]
+        )
+        docentes = {}
+        materias = Materia.objects.filter(
+            activa=True, docente__username__startswith=f'{prefijo}_'
+        ).values_list('id', 'docente__username')
+        for materia_id, username in materias:
+            docentes.setdefault(username, []).append(materia_id)
+        inscritos = {}
+        for materia_id, estudiante_id in InscripcionMateria.objects.filter(
+            materia_id__in=[m for ids in docentes.values() for m in ids]
+        ).values_list('materia_id', 'estudiante_id').iterator():
+            inscritos.setdefault(materia_id, []).append(estudiante_id)
+
+        if not estudiantes or not inscritos:
+            raise CommandError(f'No hay datos con el prefijo "{prefijo}"; genera datos con manage.py seed_escuela')
+
+        def ruta(nombre, **kwargs):
+            return reverse(nombre, kwargs=kwargs)
+
+        return {
+            'clave': options['clave'],
+            'estudiantes': estudiantes,
+            'docentes': [
+                (username, [(m, inscritos[m]) for m in ids if m in inscritos])
+                for username, ids in sorted(docentes.items()) if any(m in inscritos for m in ids)
+            ],
+            'materias': list(Materia.objects.filter(activa=True).values_list('id', flat=True)),
+            'cursos': list(Curso.objects.filter(activo=True).values_list('id', flat=True)),
+            'rutas': {
+                'login': ruta('login'),
+                'dashboard': ruta('dashboard'),
+                'listar_materias': ruta('student_listar_materias'),
+                'inscribir_materia': ruta('estudiante_inscribir_materia', materia_id=0).replace('/0/', '/{}/'),
+                'listar_cursos': ruta('student_listar_cursos'),
+                'matricular_curso': ruta('student_matricular_curso', curso_id=0).replace('/0/', '/{}/'),
+                'exportar': ruta('student_exportar'),
+                'calificacion_crear': ruta('teacher_calificacion_crear'),
+                'generar_reporte': ruta('teacher_generar_reporte'),
+                'mis_calificaciones': ruta('student_calificaciones'),
+                'mis_asistencias': ruta('student_asistencias'),
+                'mis_notificaciones': ruta('student_notificaciones'),
+                'estadisticas': ruta('teacher_estadisticas'),
+            },
+        }
+
+    def _iniciar_gunicorn(self, options):
+        partes = urlsplit(options['url'])
+        comando = [
+            sys.executable, '-m', 'gunicorn',
+            'estudify.asgi:application' if options['asgi'] else 'estudify.wsgi:application',
+            '--bind', f'{partes.hostname}:{partes.port}', '--workers', str(options['workers']),
+        ]
+        if options['asgi']:
+            comando += ['--worker-class', 'uvicorn_worker.UvicornWorker']
+        servidor = subprocess.Popen(comando, cwd=settings.BASE_DIR)
+        limite = time.monotonic() + 30
+        while time.monotonic() < limite:
+            if servidor.poll() is not None:
+                raise CommandError('gunicorn terminó al iniciar')
+            try:
+                socket.create_connection((partes.hostname, partes.port), timeout=1).close()
+                return servidor
+            except OSError:
+                time.sleep(0.2)
+        servidor.terminate()
+        raise CommandError('gunicorn no respondió en 30 segundos')
+
+    def _imprimir(self, resumen):
+        self.stdout.write(f'\n{"paso":24} {"peticiones":>10} {"req/s":>8} {"p50":>8} {"p95":>8} {"p99":>8} {"errores":>8}')
+        for paso, r in resumen['pasos'].items():
+            linea = (
+                f'{paso:24} {r["peticiones"]:>10} {r["rps"]:>8.1f} {r["p50_ms"]:>6.0f}ms {r["p95_ms"]:>6.0f}ms '
+                f'{r["p99_ms"]:>6.0f}ms {r["tasa_error"]:>8.1%}'
+            )
+            self.stdout.write(self.style.ERROR(linea) if r['errores'] else linea)
+            for error, cantidad in r['detalle_errores'].items():
+                self.stdout.write(f'    {error}: {cantidad}')
+        self.stdout.write(f'Duración: {resumen["duracion_s"]}s')
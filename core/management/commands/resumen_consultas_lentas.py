@@ -0,0 +1,64 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.querylog import normalizar_sql
+
+
+class Command(BaseCommand):
+    help = 'Resume el registro de consultas lentas agrupando por huella de consulta'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--archivo', default=settings.SLOW_QUERY_LOG_FILE,
+                            help='Archivo JSONL de consultas lentas (se leen también sus rotaciones)')
+        parser.add_argument('--top', type=int, default=10, help='Cantidad de huellas a mostrar')
+        parser.add_argument('--orden', choices=['total', 'max', 'cantidad'], default='total',
+                            help='Criterio de orden: tiempo total, tiempo máximo o cantidad')
+        parser.add_argument('--plan', action='store_true', help='Muestra el plan de la ejecución más lenta')
+
+    def _archivos(self, archivo):
+        rotaciones = [f'{archivo}.{n}' for n in range(1, 100) if os.path.exists(f'{archivo}.{n}')]
+        return [ruta for ruta in [*reversed(rotaciones), archivo] if os.path.exists(ruta)]
+
+    def handle(self, *args, **options):
+        archivos = self._archivos(options['archivo'])
+        if not archivos:
+            raise CommandError(f'No existe el archivo {options["archivo"]}')
+
+        grupos = {}
+        for ruta in archivos:
+            with open(ruta, encoding='utf-8') as f:
+                for linea in f:
+                    try:
+                        registro = json.loads(linea)
+                    except ValueError:
+                        continue
+                    grupo = grupos.setdefault(registro['huella'], {
+                        'cantidad': 0, 'total': 0.0, 'max': 0.0, 'vistas': set(), 'peor': registro,
+                    })
+                    grupo['cantidad'] += 1
+                    grupo['total'] += registro['duracion_ms']
+                    if registro['duracion_ms'] >= grupo['max']:
+                        grupo['max'] = registro['duracion_ms']
+                        grupo['peor'] = registro
+                    if registro.get('vista'):
+                        grupo['vistas'].add(registro['vista'])
+
+        ordenados = sorted(grupos.items(), key=lambda item: item[1][options['orden']], reverse=True)
+        self.stdout.write(f'{len(grupos)} huellas en {len(archivos)} archivo(s)\n')
+        for huella, grupo in ordenados[:options['top']]:
+            peor = grupo['peor']
+            self.stdout.write(self.style.WARNING(
+                f'{huella}  cantidad={grupo["cantidad"]}  total={grupo["total"]:.1f}ms  '
+                f'max={grupo["max"]:.1f}ms  prom={grupo["total"] / grupo["cantidad"]:.1f}ms'
+            ))
+            self.stdout.write(f'  vistas: {", ".join(sorted(grupo["vistas"])) or "-"}')
+            self.stdout.write(f'  origen: {peor.get("origen") or "-"}')
+            self.stdout.write(f'  sql: {normalizar_sql(peor["sql"])[:300]}')
+            if options['plan'] and peor.get('plan'):
+                self.stdout.write('  plan:')
+                for linea in peor['plan'].splitlines():
+                    self.stdout.write(f'    {linea}')
+            self.stdout.write('')
@@ -0,0 +1,280 @@
+import csv
+import io
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from core.cache import CATALOGO, MATRICULAS, invalidar
+from core.inscripciones import recalcular_contadores
+from core.models import Curso, Materia, Matricula, InscripcionMateria, Calificacion, Asistencia, Notificacion
+
+
+NOMBRES = [
+    'Sofía', 'Mateo', 'Valentina', 'Santiago', 'Isabella', 'Sebastián', 'Camila', 'Nicolás', 'Mariana',
+    'Samuel', 'Lucía', 'Alejandro', 'Gabriela', 'Daniel', 'Daniela', 'Tomás', 'Sara', 'Martín',
+    'Valeria', 'Emiliano', 'Paula', 'Juan', 'Antonia', 'Diego', 'Laura', 'Andrés', 'Manuela', 'David',
+]
+APELLIDOS = [
+    'García', 'Rodríguez', 'Martínez', 'López', 'González', 'Hernández', 'Pérez', 'Sánchez', 'Ramírez',
+    'Torres', 'Flores', 'Rivera', 'Gómez', 'Díaz', 'Cruz', 'Morales', 'Reyes', 'Gutiérrez', 'Ortiz',
+    'Castro', 'Vargas', 'Rojas', 'Jiménez', 'Moreno', 'Romero', 'Herrera', 'Medina', 'Aguilar',
+]
+ASIGNATURAS = [
+    'Matemáticas', 'Lengua Castellana', 'Inglés', 'Biología', 'Química', 'Física', 'Historia',
+    'Geografía', 'Filosofía', 'Educación Física', 'Artes', 'Música', 'Tecnología', 'Ética',
+    'Economía', 'Programación', 'Estadística', 'Literatura', 'Francés', 'Ciencias Políticas',
+]
+NOTIFICACIONES = [
+    ('calificacion', 'Nueva calificación registrada', 'Se registró una nueva calificación en una de tus materias.'),
+    ('asistencia', 'Registro de asistencia', 'Se registró una inasistencia en una de tus materias.'),
+    ('general', 'Aviso institucional', 'Revisa el calendario académico del próximo periodo.'),
+]
+
+
+class Command(BaseCommand):
+    help = 'Genera un colegio sintético de gran tamaño (determinista a partir de --semilla)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--semilla', type=int, default=2025, help='Semilla del generador aleatorio')
+        parser.add_argument('--estudiantes', type=int, default=2000)
+        parser.add_argument('--docentes', type=int, default=60)
+        parser.add_argument('--cursos', type=int, default=12)
+        parser.add_argument('--materias', type=int, default=120,
+                            help='Se reparten entre los cursos; cada estudiante se inscribe en las de su curso')
+        parser.add_argument('--dias', type=int, default=20, help='Clases con asistencia por materia')
+        parser.add_argument('--periodos', type=int, default=4, choices=range(1, 5),
+                            help='Periodos calificados por inscripción')
+        parser.add_argument('--notificaciones', type=int, default=5, help='Notificaciones promedio por estudiante')
+        parser.add_argument('--desde', type=date.fromisoformat, default=date(2025, 2, 3),
+                            help='Primer día de clases (AAAA-MM-DD)')
+        parser.add_argument('--prefijo', default='seed', help='Prefijo de usuarios y códigos de materia')
+        parser.add_argument('--clave', default='estudify123', help='Contraseña de todos los usuarios generados')
+        parser.add_argument('--lote', type=int, default=5000, help='Filas por lote de inserción')
+
+    def handle(self, *args, **options):
+        prefijo = options['prefijo']
+        if CustomUser.objects.filter(username__startswith=f'{prefijo}_').exists():
+            raise CommandError(
+                f'Ya existen usuarios con el prefijo "{prefijo}_"; usa otro --prefijo o vacía la base (manage.py flush)'
+            )
+        if options['materias'] < options['cursos']:
+            raise CommandError('--materias debe ser mayor o igual que --cursos')
+
+        self.rng = random.Random(options['semilla'])
+        self.lote = options['lote']
+        self.ahora = timezone.now()
+        self.copy = connection.vendor == 'postgresql'
+        inicio = time.perf_counter()
+
+        docentes, estudiantes = self._usuarios(options)
+        cursos = self._cursos(options)
+        materias = self._materias(options, cursos, docentes)
+        grupos = self._matriculas(options, estudiantes, cursos, materias)
+        self._inscripciones(options, grupos)
+        self._calificaciones(options, grupos)
+        self._asistencias(options, grupos)
+        self._notificaciones(options, estudiantes)
+
+        # bulk_create y COPY no disparan señales ni pasan por core/inscripciones.py: los contadores
+        # se insertan en 0 y se calculan aquí
+        recalcular_contadores(materia_ids=[m[0] for m in materias], curso_ids=cursos)
+        # El catálogo es un ámbito global: su identificador es ''
+        invalidar(CATALOGO, '')
+        invalidar(MATRICULAS, '')
+        self.stdout.write(self.style.SUCCESS(f'Colegio sintético generado en {time.perf_counter() - inicio:.1f}s'))
+
+    # ---------------------------------------------------------------- inserción
+
+    def _insertar(self, modelo, campos, filas):
+        """Inserta las filas (tuplas en el orden de campos) por lotes: COPY en PostgreSQL, bulk_create en otros motores."""
+        inicio = time.perf_counter()
+        total = 0
+        filas = iter(filas)
+        while True:
+            lote = list(islice(filas, self.lote))
+            if not lote:
+                break
+            if self.copy:
+                self._copiar(modelo, campos, lote)
+            else:
+                modelo.objects.bulk_create([modelo(**dict(zip(campos, fila))) for fila in lote])
+            total += len(lote)
+        self.stdout.write(f'{modelo._meta.verbose_name_plural}: {total} filas en {time.perf_counter() - inicio:.1f}s')
+        return total
+
+    def _copiar(self, modelo, campos, lote):
+        columnas = ', '.join(connection.ops.quote_name(modelo._meta.get_field(campo).column) for campo in campos)
+        sql = f'COPY {connection.ops.quote_name(modelo._meta.db_table)} ({columnas}) FROM STDIN WITH (FORMAT csv)'
+        # Las cadenas van entre comillas (la vacía es '') y None queda sin comillas (NULL)
+        buffer = io.StringIO()
+        csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC).writerows(lote)
+        buffer.seek(0)
+        with connection.cursor() as cursor:
+            with cursor.cursor.copy(sql) as copia:
+                copia.write(buffer.getvalue())
+
+    # ---------------------------------------------------------------- tablas
+
+    def _nombre(self):
+        return self.rng.choice(NOMBRES), f'{self.rng.choice(APELLIDOS)} {self.rng.choice(APELLIDOS)}'
+
+    def _usuarios(self, options):
+        prefijo = options['prefijo']
+        # Un único hash para todos: hashear cada contraseña tomaría horas
+        clave = make_password(options['clave'])
+        campos = ['username', 'password', 'first_name', 'last_name', 'email', 'role',
+                  'is_superuser', 'is_staff', 'is_active', 'date_joined', 'last_login']
+
+        def filas():
+            for role, cantidad in (('docente', options['docentes']), ('estudiante', options['estudiantes'])):
+                for n in range(cantidad):
+                    username = f'{prefijo}_{role}{n:06d}'
+                    nombre, apellidos = self._nombre()
+                    yield (username, clave, nombre, apellidos, f'{username}@estudify.test', role,
+                           False, False, True, self.ahora, None)
+
+        self._insertar(CustomUser, campos, filas())
+        ids = dict(CustomUser.objects.filter(username__startswith=f'{prefijo}_').values_list('username', 'id'))
+        docentes = [ids[f'{prefijo}_docente{n:06d}'] for n in range(options['docentes'])]
+        estudiantes = [ids[f'{prefijo}_estudiante{n:06d}'] for n in range(options['estudiantes'])]
+        return docentes, estudiantes
+
+    def _cursos(self, options):
+        marca = f'Curso sintético ({options["prefijo"]})'
+        filas = [
+            (f'{6 + n % 6}°{chr(ord("A") + n // 6)}', marca, '2025-2026', True, 0, self.ahora, self.ahora)
+            for n in range(options['cursos'])
+        ]
+        self._insertar(Curso, ['nombre', 'descripcion', 'año_escolar', 'activo', 'matriculados', 'creado_en', 'actualizado_en'], filas)
+        return list(Curso.objects.filter(descripcion=marca).order_by('id').values_list('id', flat=True))
+
+    def _materias(self, options, cursos, docentes):
+        prefijo = options['prefijo'].upper()
+        filas = []
+        for n in range(options['materias']):
+            # Las materias se reparten en ronda: cada curso recibe una de cada asignatura antes de repetir
+            orden = n // len(cursos)
+            nombre = ASIGNATURAS[orden % len(ASIGNATURAS)]
+            if orden >= len(ASIGNATURAS):
+                nombre = f'{nombre} {orden // len(ASIGNATURAS) + 1}'
+            docente = self.rng.choice(docentes) if docentes else None
+            filas.append((
+                nombre, f'{prefijo}-{n:05d}', '', cursos[n % len(cursos)], docente,
+                self.rng.choice([1, 2, 2, 3, 3, 4]), True, 0, self.ahora, self.ahora,
+            ))
+        campos = ['nombre', 'codigo', 'descripcion', 'curso_id', 'docente_id', 'creditos', 'activa', 'inscritos',
+                  'creado_en', 'actualizado_en']
+        self._insertar(Materia, campos, filas)
+        return list(
+            Materia.objects.filter(codigo__startswith=f'{prefijo}-').order_by('codigo').values_list('id', 'curso_id', 'docente_id')
+        )
+
+    def _matriculas(self, options, estudiantes, cursos, materias):
+        """Asigna cada estudiante a un curso y devuelve {curso_id: (materias, estudiantes)}."""
+        grupos = {curso: ([], []) for curso in cursos}
+        for materia in materias:
+            grupos[materia[1]][0].append(materia)
+        filas = []
+        for estudiante in estudiantes:
+            curso = self.rng.choice(cursos)
+            grupos[curso][1].append(estudiante)
+            filas.append((estudiante, curso, options['desde'], True, self.ahora))
+        self._insertar(Matricula, ['estudiante_id', 'curso_id', 'fecha_matricula', 'activa', 'actualizado_en'], filas)
+        return grupos
+
+    def _pares(self, grupos):
+        for materias, estudiantes in grupos.values():
+            for materia in materias:
+                for estudiante in estudiantes:
+                    yield estudiante, materia
+
+    def _inscripciones(self, options, grupos):
+        filas = ((estudiante, materia[0], self.ahora, self.ahora) for estudiante, materia in self._pares(grupos))
+        self._insertar(InscripcionMateria, ['estudiante_id', 'materia_id', 'fecha_inscripcion', 'actualizado_en'], filas)
+
+    def _calificaciones(self, options, grupos):
+        """Nota = habilidad del estudiante + dificultad de la materia + ruido, en escala 1.0-5.0."""
+        habilidad = {}
+        dificultad = {}
+        periodos = [str(p) for p in range(1, options['periodos'] + 1)]
+
+        def filas():
+            for estudiante, materia in self._pares(grupos):
+                if estudiante not in habilidad:
+                    habilidad[estudiante] = self.rng.gauss(3.6, 0.55)
+                if materia[0] not in dificultad:
+                    dificultad[materia[0]] = self.rng.gauss(0, 0.3)
+                for periodo in periodos:
+                    nota = habilidad[estudiante] - dificultad[materia[0]] + self.rng.gauss(0, 0.4)
+                    nota = Decimal(str(round(min(5.0, max(1.0, nota)), 1)))
+                    # Una parte del último periodo queda pendiente de notificar
+                    notificado = periodo != periodos[-1] or self.rng.random() > 0.1
+                    yield (estudiante, materia[0], periodo, nota, '', self.ahora, self.ahora, notificado)
+
+        campos = ['estudiante_id', 'materia_id', 'periodo', 'nota', 'observaciones',
+                  'fecha_registro', 'fecha_modificacion', 'notificado']
+        self._insertar(Calificacion, campos, filas())
+
+    def _clases(self, options):
+        """Fechas de clase de una materia: 2 o 3 días fijos por semana desde --desde."""
+        dias_semana = set(self.rng.sample(range(5), self.rng.choice([2, 3])))
+        fechas = []
+        dia = options['desde']
+        while len(fechas) < options['dias']:
+            if dia.weekday() in dias_semana:
+                fechas.append(dia)
+            dia += timedelta(days=1)
+        return fechas
+
+    def _asistencias(self, options, grupos):
+        """
+        Cada estudiante tiene una propensión a faltar (cola larga de ausentismo crónico)
+        y las ausencias se agrupan en rachas: tras una falta es más probable otra.
+        """
+        propension = {}
+        clases = {}
+
+        def filas():
+            for estudiante, materia in self._pares(grupos):
+                if estudiante not in propension:
+                    propension[estudiante] = self.rng.betavariate(1, 20)
+                if materia[0] not in clases:
+                    clases[materia[0]] = self._clases(options)
+                base = propension[estudiante]
+                ausente_antes = False
+                for fecha in clases[materia[0]]:
+                    p = min(0.6, base * 4) if ausente_antes else base
+                    azar = self.rng.random()
+                    if azar < p:
+                        estado = 'ausente'
+                    elif azar < p + 0.04:
+                        estado = 'tardanza'
+                    elif azar < p + 0.06:
+                        estado = 'excusado'
+                    else:
+                        estado = 'presente'
+                    ausente_antes = estado == 'ausente'
+                    yield (estudiante, materia[0], fecha, estado, '', materia[2], self.ahora, self.ahora)
+
+        campos = ['estudiante_id', 'materia_id', 'fecha', 'estado', 'observaciones', 'registrado_por_id', 'creado_en', 'actualizado_en']
+        self._insertar(Asistencia, campos, filas())
+
+    def _notificaciones(self, options, estudiantes):
+        promedio = options['notificaciones']
+
+        def filas():
+            for estudiante in estudiantes:
+                for _ in range(self.rng.randint(0, 2 * promedio)):
+                    tipo, titulo, mensaje = self.rng.choices(NOTIFICACIONES, weights=[6, 3, 1])[0]
+                    yield (estudiante, tipo, titulo, mensaje, self.rng.random() < 0.7, self.ahora, self.ahora)
+
+        campos = ['estudiante_id', 'tipo', 'titulo', 'mensaje', 'leida', 'creada_en', 'actualizado_en']
+        self._insertar(Notificacion, campos, filas())
@@ -0,0 +1,134 @@
+"""
+Métricas en formato Prometheus.
+
+Con varios workers de Gunicorn las métricas se agregan a través de la carpeta
+compartida PROMETHEUS_MULTIPROC_DIR (ver gunicorn.conf.py). Si
+prometheus_client no está instalado, las métricas quedan deshabilitadas.
+"""
+import hmac
+import os
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse, HttpResponseForbidden, HttpResponseNotFound
+
+from .models import Curso, Materia, Matricula, InscripcionMateria, Calificacion, Asistencia, Notificacion
+
+try:
+    import prometheus_client
+    from prometheus_client import CollectorRegistry, Counter, Histogram, multiprocess
+    from prometheus_client.core import GaugeMetricFamily
+except ImportError:  # pragma: no cover - dependencia opcional
+    prometheus_client = None
+
+
+if prometheus_client is not None:
+    LATENCIA = Histogram(
+        'estudify_request_latency_seconds',
+        'Latencia de las peticiones',
+        ['url_name', 'role'],
+    )
+    CONSULTAS = Histogram(
+        'estudify_request_queries',
+        'Consultas SQL por petición',
+        ['url_name', 'role'],
+        buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, float('inf')),
+    )
+    ERRORES = Counter(
+        'estudify_request_errors',
+        'Peticiones con respuesta 5xx',
+        ['url_name', 'role', 'status'],
+    )
+
+
+def _role(request):
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return 'anonimo'
+    if user.is_superuser or user.is_staff:
+        return 'admin'
+    return user.role
+
+
+def observar_peticion(request, response, url_name, duracion, consultas):
+    """Registra una petición terminada (lo llama ServerTimingMiddleware)."""
+    if prometheus_client is None:
+        return
+    etiquetas = (url_name or 'desconocida', _role(request))
+    LATENCIA.labels(*etiquetas).observe(duracion)
+    CONSULTAS.labels(*etiquetas).observe(consultas)
+    if response.status_code >= 500:
+        ERRORES.labels(*etiquetas, str(response.status_code)).inc()
+
+
+# Tablas cuyo tamaño se publica como gauge
+TABLAS = (Curso, Materia, Matricula, InscripcionMateria, Calificacion, Asistencia, Notificacion)
+
+# Segundos que se reutilizan los COUNT(*) de las tablas fuera de PostgreSQL
+TAMANOS_TIMEOUT = 300
+
+
+def _contar_tablas():
+    return {modelo._meta.db_table: modelo.objects.count() for modelo in TABLAS}
+
+
+def _tamanos_tablas():
+    """
+    Filas por tabla. En PostgreSQL se usa la estimación del planificador para
+    no recorrer tablas grandes; en otras bases, los COUNT(*) se guardan en la
+    caché para no repetirlos en cada lectura de /metrics.
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT relname, reltuples::bigint FROM pg_class WHERE relname = ANY(%s)',
+                [[modelo._meta.db_table for modelo in TABLAS]]
+            )
+            return dict(cursor.fetchall())
+    return cache.get_or_set('metricas:tamanos_tablas', _contar_tablas, TAMANOS_TIMEOUT)
+
+
+class ColectorBaseDatos:
+    """Gauges calculados al momento de la consulta de /metrics."""
+
+    def collect(self):
+        pendientes = GaugeMetricFamily(
+            'estudify_outbox_depth',
+            'Calificaciones pendientes de notificar al estudiante',
+        )
+        pendientes.add_metric([], Calificacion.objects.filter(notificado=False).count())
+        yield pendientes
+
+        filas = GaugeMetricFamily('estudify_table_rows', 'Filas por tabla', labels=['tabla'])
+        for tabla, total in sorted(_tamanos_tablas().items()):
+            filas.add_metric([tabla], total)
+        yield filas
+
+
+def metrics_view(request):
+    """
+    Expone las métricas. Con METRICS_TOKEN se exige como Bearer token; sin él
+    solo responde en desarrollo (DEBUG), porque las latencias, los errores por
+    vista y los tamaños de las tablas no deben ser públicos.
+    """
+    if prometheus_client is None:
+        return HttpResponseNotFound('prometheus_client no está instalado')
+    if not settings.METRICS_TOKEN:
+        if not settings.DEBUG:
+            return HttpResponseNotFound('Defina METRICS_TOKEN para publicar /metrics')
+    elif not hmac.compare_digest(
+        request.headers.get('Authorization', '').encode(), f'Bearer {settings.METRICS_TOKEN}'.encode()
+    ):
+        return HttpResponseForbidden()
+
+    extra = CollectorRegistry()
+    extra.register(ColectorBaseDatos())
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+
+    contenido = prometheus_client.generate_latest(registry) + prometheus_client.generate_latest(extra)
+    return HttpResponse(contenido, content_type=prometheus_client.CONTENT_TYPE_LATEST)
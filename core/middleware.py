@@ -0,0 +1,243 @@
+"""
+Middleware del proyecto.
+"""
+import json
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.http import Http404
+from django.utils.functional import SimpleLazyObject, cached_property
+
+from . import cache as versiones
+from .metrics import observar_peticion
+from .models import Materia
+from .replica import en_primaria
+
+
+class ContextoDocente:
+    """
+    Materias del docente, cargadas una vez por petición.
+
+    Las listas, los formularios y las estadísticas usan las activas (materias,
+    materia_ids); editar o eliminar registros, los reportes y la gestión de
+    inscritos aceptan también las inactivas (materias_todas, materia_ids_todas,
+    materia(..., inactivas=True)), como antes de cargarlas aquí.
+
+    Entre peticiones la lista se guarda en caché con la versión del docente
+    (cambia cuando se crea, edita o elimina alguna de sus materias) y la del
+    catálogo (cambia al editar un curso).
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    @cached_property
+    def materias_todas(self):
+        version_docente, version_catalogo = versiones.obtener_versiones(
+            (versiones.DOCENTE, self.user.id), (versiones.CATALOGO, '')
+        )
+        clave = f'docente_materias:{self.user.id}:{version_docente}:{version_catalogo}'
+        materias = cache.get(clave)
+        if materias is None:
+            with en_primaria():
+                materias = list(Materia.objects.filter(docente_id=self.user.id).select_related('curso'))
+            cache.set(clave, materias, settings.DASHBOARD_CACHE_TIMEOUT)
+        return materias
+
+    @cached_property
+    def materias(self):
+        return [materia for materia in self.materias_todas if materia.activa]
+
+    @cached_property
+    def materias_por_id(self):
+        return {materia.id: materia for materia in self.materias}
+
+    @cached_property
+    def materia_ids(self):
+        return frozenset(self.materias_por_id)
+
+    @cached_property
+    def materia_ids_todas(self):
+        return frozenset(materia.id for materia in self.materias_todas)
+
+    @cached_property
+    def curso_ids(self):
+        return frozenset(materia.curso_id for materia in self.materias)
+
+    def materia(self, materia_id, inactivas=False):
+        """Devuelve una materia (activa, salvo con inactivas=True) del docente o lanza Http404."""
+        try:
+            materia_id = int(materia_id)
+        except (TypeError, ValueError):
+            raise Http404('Materia no encontrada')
+        materia = self.materias_por_id.get(materia_id)
+        if materia is None and inactivas:
+            materia = next((m for m in self.materias_todas if m.id == materia_id), None)
+        if materia is None:
+            raise Http404('Materia no encontrada')
+        return materia
+
+
+class ContextoDocenteMiddleware:
+    """Adjunta request.docente; las materias solo se cargan si la vista las usa."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.docente = SimpleLazyObject(lambda: ContextoDocente(request.user))
+        return self.get_response(request)
+
+
+# ==================== MÉTRICAS POR PETICIÓN ====================
+
+logger = logging.getLogger('estudify.performance')
+
+_metricas_actuales = ContextVar('metricas_peticion', default=None)
+
+
+class MetricasPeticion:
+    """Tiempos y consultas acumulados durante una petición."""
+
+    __slots__ = ('inicio', 'consultas', 'tiempo_sql', 'tiempo_plantillas')
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.consultas = 0
+        self.tiempo_sql = 0.0
+        self.tiempo_plantillas = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        """Wrapper de connection.execute_wrapper: cuenta y cronometra cada consulta."""
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.tiempo_sql += time.perf_counter() - inicio
+            self.consultas += 1
+
+
+def metricas_en_curso():
+    """Métricas de la petición en curso (None fuera de ServerTimingMiddleware)."""
+    return _metricas_actuales.get()
+
+
+def medicion_en_curso():
+    """
+    Métricas y execute_wrapper (Server-Timing, consultas lentas) activos en la
+    petición, por alias, para reanudarlos con reanudar_medicion() fuera de la
+    pila de middlewares: en los hilos de en_paralelo y al generar una
+    respuesta en streaming.
+    """
+    return _metricas_actuales.get(), {conexion.alias: list(conexion.execute_wrappers) for conexion in connections.all()}
+
+
+@contextmanager
+def reanudar_medicion(medicion):
+    metricas, wrappers = medicion
+    token = _metricas_actuales.set(metricas)
+    try:
+        with ExitStack() as stack:
+            for conexion in connections.all():
+                for wrapper in wrappers.get(conexion.alias, ()):
+                    stack.enter_context(conexion.execute_wrapper(wrapper))
+            yield
+    finally:
+        _metricas_actuales.reset(token)
+
+
+def _al_terminar(contenido, terminar):
+    try:
+        yield from contenido
+    finally:
+        terminar()
+
+
+async def _al_terminar_async(contenido, terminar):
+    try:
+        async for bloque in contenido:
+            yield bloque
+    finally:
+        terminar()
+
+
+class ServerTimingMiddleware:
+    """
+    Mide cada petición: tiempo total, número y tiempo de consultas SQL,
+    tiempo de plantillas y nombre de la URL resuelta.
+
+    Emite los tiempos en la cabecera Server-Timing (según SERVER_TIMING_HEADER)
+    y registra las peticiones que superan SLOW_REQUEST_THRESHOLD_MS en el
+    logger estudify.performance. El tiempo de plantillas lo suman los motores
+    de core/plantillas.py.
+
+    En las respuestas en streaming la cabecera sale antes que el cuerpo: cubre
+    lo hecho en la vista (core/streaming.py ya trae ahí el primer bloque de
+    filas). La latencia de Prometheus y el registro de peticiones lentas se
+    toman al terminar el cuerpo, con las consultas hechas mientras se enviaba.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.umbral = settings.SLOW_REQUEST_THRESHOLD_MS / 1000
+
+    def _con_cabecera(self, request):
+        if settings.SERVER_TIMING_HEADER == 'staff':
+            user = getattr(request, 'user', None)
+            return user is not None and user.is_staff
+        return settings.SERVER_TIMING_HEADER
+
+    def __call__(self, request):
+        metricas = MetricasPeticion()
+        request.metricas = metricas
+        token = _metricas_actuales.set(metricas)
+        try:
+            with ExitStack() as stack:
+                for conexion in connections.all():
+                    stack.enter_context(conexion.execute_wrapper(metricas))
+                response = self.get_response(request)
+        finally:
+            _metricas_actuales.reset(token)
+
+        match = request.resolver_match
+        url_name = match.view_name if match else None
+        if self._con_cabecera(request):
+            response['Server-Timing'] = (
+                f'total;dur={(time.perf_counter() - metricas.inicio) * 1000:.1f};desc="{url_name or "-"}", '
+                f'db;dur={metricas.tiempo_sql * 1000:.1f};desc="{metricas.consultas} consultas", '
+                f'tpl;dur={metricas.tiempo_plantillas * 1000:.1f}'
+            )
+
+        def terminar():
+            self._registrar(request, response, url_name, metricas)
+
+        if not response.streaming:
+            terminar()
+        elif response.is_async:
+            response.streaming_content = _al_terminar_async(response.streaming_content, terminar)
+        else:
+            response.streaming_content = _al_terminar(response.streaming_content, terminar)
+        return response
+
+    def _registrar(self, request, response, url_name, metricas):
+        total = time.perf_counter() - metricas.inicio
+        observar_peticion(request, response, url_name, total, metricas.consultas)
+        if total >= self.umbral:
+            registro = {
+                'evento': 'peticion_lenta',
+                'metodo': request.method,
+                'ruta': request.path,
+                'url_name': url_name,
+                'status': response.status_code,
+                'usuario_id': request.user.id if hasattr(request, 'user') and request.user.is_authenticated else None,
+                'total_ms': round(total * 1000, 1),
+                'sql_ms': round(metricas.tiempo_sql * 1000, 1),
+                'consultas': metricas.consultas,
+                'plantillas_ms': round(metricas.tiempo_plantillas * 1000, 1),
+            }
+            logger.warning(json.dumps(registro), extra={'metricas': registro})
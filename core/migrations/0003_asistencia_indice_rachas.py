@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_inscripcionmateria'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='asistencia',
+            index=models.Index(fields=['materia', 'estudiante', 'fecha'], name='asistencia_mat_est_fecha'),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def _conteo(modelo, campo, **filtros):
+    return Coalesce(Subquery(
+        modelo.objects.filter(**{campo: OuterRef('pk')}, **filtros)
+        .order_by().values(campo).annotate(n=Count('pk')).values('n'),
+        output_field=IntegerField(),
+    ), Value(0))
+
+
+def inicializar_contadores(apps, schema_editor):
+    Materia = apps.get_model('core', 'Materia')
+    Curso = apps.get_model('core', 'Curso')
+    InscripcionMateria = apps.get_model('core', 'InscripcionMateria')
+    Matricula = apps.get_model('core', 'Matricula')
+    Materia.objects.update(inscritos=_conteo(InscripcionMateria, 'materia'))
+    Curso.objects.update(matriculados=_conteo(Matricula, 'curso', activa=True))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_asistencia_indice_rachas'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='curso',
+            name='cupo',
+            field=models.PositiveIntegerField(blank=True, help_text='Vacío = sin límite', null=True, verbose_name='Cupo'),
+        ),
+        migrations.AddField(
+            model_name='curso',
+            name='matriculados',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Matriculados'),
+        ),
+        migrations.AddField(
+            model_name='materia',
+            name='cupo',
+            field=models.PositiveIntegerField(blank=True, help_text='Vacío = sin límite', null=True, verbose_name='Cupo'),
+        ),
+        migrations.AddField(
+            model_name='materia',
+            name='inscritos',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Inscritos'),
+        ),
+        migrations.CreateModel(
+            name='ListaEspera',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('creada_en', models.DateTimeField(auto_now_add=True, verbose_name='En espera desde')),
+                ('estudiante', models.ForeignKey(limit_choices_to={'role': 'estudiante'}, on_delete=django.db.models.deletion.CASCADE, related_name='listas_espera', to=settings.AUTH_USER_MODEL, verbose_name='Estudiante')),
+                ('materia', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lista_espera', to='core.materia', verbose_name='Materia')),
+            ],
+            options={
+                'verbose_name': 'Lista de Espera',
+                'verbose_name_plural': 'Listas de Espera',
+                'ordering': ['materia', 'creada_en', 'id'],
+                'unique_together': {('estudiante', 'materia')},
+            },
+        ),
+        migrations.RunPython(inicializar_contadores, migrations.RunPython.noop),
+    ]
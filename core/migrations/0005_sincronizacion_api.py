@@ -0,0 +1,48 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_cupos_lista_espera'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asistencia',
+            name='actualizado_en',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Última Modificación'),
+        ),
+        migrations.AddField(
+            model_name='curso',
+            name='actualizado_en',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Última Modificación'),
+        ),
+        migrations.AddField(
+            model_name='inscripcionmateria',
+            name='actualizado_en',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Última Modificación'),
+        ),
+        migrations.AddField(
+            model_name='materia',
+            name='actualizado_en',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Última Modificación'),
+        ),
+        migrations.AddField(
+            model_name='matricula',
+            name='actualizado_en',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Última Modificación'),
+        ),
+        migrations.AddField(
+            model_name='notificacion',
+            name='actualizado_en',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Última Modificación'),
+        ),
+        migrations.AlterField(
+            model_name='calificacion',
+            name='fecha_modificacion',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Última Modificación'),
+        ),
+    ]
@@ -4,13 +4,30 @@ from django.utils import timezone
 
 # Los modelos Curso, Materia y Matricula se mantienen iguales
 
+
+def _excluir_contador(instancia, contador, kwargs):
+    """
+    Al editar una instancia existente no se reescribe su contador de cupo: solo lo
+    modifican los UPDATE condicionales de core/inscripciones.py, y guardar el valor
+    leído pisaría las inscripciones concurrentes.
+    """
+    if instancia._state.adding or kwargs.get('update_fields') is not None or kwargs.get('force_insert'):
+        return
+    kwargs['update_fields'] = [
+        campo.name for campo in instancia._meta.concrete_fields
+        if not campo.primary_key and campo.name != contador
+    ]
+
 class Curso(models.Model):
     """Representa un curso o grado académico (ej: 10°, 11°)"""
     nombre = models.CharField(max_length=100, verbose_name="Nombre del Curso")
     descripcion = models.TextField(blank=True, verbose_name="Descripción")
     año_escolar = models.CharField(max_length=9, verbose_name="Año Escolar", help_text="Ej: 2024-2025")
     activo = models.BooleanField(default=True, verbose_name="Activo")
+    cupo = models.PositiveIntegerField(null=True, blank=True, verbose_name="Cupo", help_text="Vacío = sin límite")
+    matriculados = models.PositiveIntegerField(default=0, editable=False, verbose_name="Matriculados")
     creado_en = models.DateTimeField(auto_now_add=True)
+    actualizado_en = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Última Modificación")
 
     class Meta:
         verbose_name = "Curso"
@@ -20,6 +37,10 @@ class Curso(models.Model):
     def __str__(self):
         return f"{self.nombre} ({self.año_escolar})"
 
+    def save(self, *args, **kwargs):
+        _excluir_contador(self, 'matriculados', kwargs)
+        super().save(*args, **kwargs)
+
 
 class Materia(models.Model):
     """Representa una materia o asignatura"""
@@ -37,7 +58,10 @@ class Materia(models.Model):
     )
     creditos = models.IntegerField(default=1, verbose_name="Créditos")
     activa = models.BooleanField(default=True, verbose_name="Activa")
+    cupo = models.PositiveIntegerField(null=True, blank=True, verbose_name="Cupo", help_text="Vacío = sin límite")
+    inscritos = models.PositiveIntegerField(default=0, editable=False, verbose_name="Inscritos")
     creado_en = models.DateTimeField(auto_now_add=True)
+    actualizado_en = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Última Modificación")
 
     class Meta:
         verbose_name = "Materia"
@@ -47,6 +71,14 @@ class Materia(models.Model):
     def __str__(self):
         return f"{self.nombre} - {self.curso.nombre}"
 
+    def save(self, *args, **kwargs):
+        _excluir_contador(self, 'inscritos', kwargs)
+        super().save(*args, **kwargs)
+
+    @property
+    def llena(self):
+        return self.cupo is not None and self.inscritos >= self.cupo
+
 
 class Matricula(models.Model):
     """Relación entre estudiantes y cursos (Se mantiene para indicar el curso principal del estudiante)"""
@@ -60,6 +92,7 @@ class Matricula(models.Model):
     curso = models.ForeignKey(Curso, on_delete=models.CASCADE, related_name='matriculas', verbose_name="Curso")
     fecha_matricula = models.DateField(default=timezone.now, verbose_name="Fecha de Matrícula")
     activa = models.BooleanField(default=True, verbose_name="Activa")
+    actualizado_en = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Última Modificación")
 
     class Meta:
         verbose_name = "Matrícula"
@@ -91,6 +124,7 @@ class InscripcionMateria(models.Model):
         verbose_name="Materia Inscrita"
     )
     fecha_inscripcion = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Inscripción")
+    actualizado_en = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Última Modificación")
 
     class Meta:
         verbose_name = "Inscripción a Materia"
@@ -103,6 +137,33 @@ class InscripcionMateria(models.Model):
         return f"Inscripción: {self.estudiante.username} en {self.materia.nombre}"
 
 
+class ListaEspera(models.Model):
+    """Estudiantes en espera de un cupo en una materia llena, por orden de llegada."""
+    estudiante = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        limit_choices_to={'role': 'estudiante'},
+        related_name='listas_espera',
+        verbose_name="Estudiante"
+    )
+    materia = models.ForeignKey(
+        Materia,
+        on_delete=models.CASCADE,
+        related_name='lista_espera',
+        verbose_name="Materia"
+    )
+    creada_en = models.DateTimeField(auto_now_add=True, verbose_name="En espera desde")
+
+    class Meta:
+        verbose_name = "Lista de Espera"
+        verbose_name_plural = "Listas de Espera"
+        unique_together = ['estudiante', 'materia']
+        ordering = ['materia', 'creada_en', 'id']
+
+    def __str__(self):
+        return f"Espera: {self.estudiante.username} en {self.materia.nombre}"
+
+
 # Los modelos Calificacion, Asistencia y Notificacion se adaptan para usar esta nueva lógica
 # Su estructura original ya usa 'estudiante' y 'materia', lo cual es correcto.
 
@@ -128,7 +189,7 @@ class Calificacion(models.Model):
     nota = models.DecimalField(max_digits=4, decimal_places=2, verbose_name="Nota")
     observaciones = models.TextField(blank=True, verbose_name="Observaciones")
     fecha_registro = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Registro")
-    fecha_modificacion = models.DateTimeField(auto_now=True, verbose_name="Última Modificación")
+    fecha_modificacion = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Última Modificación")
     notificado = models.BooleanField(default=False, verbose_name="Notificado")
 
     class Meta:
@@ -144,6 +205,21 @@ class Calificacion(models.Model):
     def aprobado(self):
         return self.nota >= 3.0
 
+    def notificacion(self):
+        """Notificación (sin guardar) que avisa al estudiante de esta calificación."""
+        return Notificacion(
+            estudiante_id=self.estudiante_id,
+            tipo='calificacion',
+            titulo=f'Nueva calificación en {self.materia.nombre}',
+            mensaje=f'Has recibido una calificación de {self.nota} en {self.materia.nombre} - {self.get_periodo_display()}'
+        )
+
+    def notificar(self):
+        """Avisa al estudiante de la nueva calificación y la marca como notificada."""
+        self.notificacion().save()
+        self.notificado = True
+        self.save()
+
 
 class Asistencia(models.Model):
     """Registro de asistencia de estudiantes"""
@@ -173,12 +249,17 @@ class Asistencia(models.Model):
         verbose_name="Registrado por"
     )
     creado_en = models.DateTimeField(auto_now_add=True)
+    actualizado_en = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Última Modificación")
 
     class Meta:
         verbose_name = "Asistencia"
         verbose_name_plural = "Asistencias"
         unique_together = ['estudiante', 'materia', 'fecha']
         ordering = ['-fecha']
+        indexes = [
+            # Recorrido por materia y estudiante en orden de fecha (rachas de ausencias)
+            models.Index(fields=['materia', 'estudiante', 'fecha'], name='asistencia_mat_est_fecha'),
+        ]
 
     def __str__(self):
         return f"{self.estudiante.username} - {self.materia.nombre} - {self.fecha}: {self.get_estado_display()}"
@@ -203,6 +284,7 @@ class Notificacion(models.Model):
     mensaje = models.TextField(verbose_name="Mensaje")
     leida = models.BooleanField(default=False, verbose_name="Leída")
     creada_en = models.DateTimeField(auto_now_add=True)
+    actualizado_en = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Última Modificación")
 
     class Meta:
         verbose_name = "Notificación"
@@ -0,0 +1,48 @@
+"""
+Motores de plantillas que cronometran el render.
+
+Son los backends de Django (aquí) y de Jinja2 (core/jinja.py) configurados en
+TEMPLATES: devuelven las plantillas envueltas en PlantillaCronometrada, que
+suma la duración de cada render de primer nivel al tiempo de plantillas de la
+petición en curso (ServerTimingMiddleware). Las inclusiones se renderizan
+dentro del motor y no se cuentan dos veces.
+"""
+import time
+
+from django.template.backends import django as backend_django
+
+from .middleware import metricas_en_curso
+
+
+class PlantillaCronometrada:
+    """Plantilla de un motor cuyo render suma al tiempo de plantillas de la petición."""
+
+    def __init__(self, plantilla):
+        self.plantilla = plantilla
+
+    def __getattr__(self, nombre):
+        return getattr(self.plantilla, nombre)
+
+    def render(self, context=None, request=None):
+        metricas = metricas_en_curso()
+        if metricas is None:
+            return self.plantilla.render(context, request)
+        inicio = time.perf_counter()
+        try:
+            return self.plantilla.render(context, request)
+        finally:
+            metricas.tiempo_plantillas += time.perf_counter() - inicio
+
+
+class MotorCronometrado:
+    """Mixin para un backend de plantillas: envuelve las plantillas que entrega."""
+
+    def from_string(self, template_code):
+        return PlantillaCronometrada(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return PlantillaCronometrada(super().get_template(template_name))
+
+
+class DjangoTemplates(MotorCronometrado, backend_django.DjangoTemplates):
+    pass
@@ -0,0 +1,145 @@
+"""
+Captura de consultas lentas con su plan de ejecución.
+
+Se activa con SLOW_QUERY_LOG_MS > 0. Cada consulta que supera el umbral se
+escribe como una línea JSON en el logger estudify.slow_queries (archivo
+rotativo configurado en settings.LOGGING) con el SQL, sus parámetros, la
+vista y el punto del código que la originó y la salida de EXPLAIN
+(EXPLAIN ANALYZE en PostgreSQL). El comando resumen_consultas_lentas agrupa
+el archivo por huella de consulta.
+"""
+import hashlib
+import json
+import logging
+import re
+import time
+import traceback
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+
+logger = logging.getLogger('estudify.slow_queries')
+
+_RE_LISTA_IN = re.compile(r'IN \((?:%s, )*%s\)')
+_RE_CADENA = re.compile(r"'(?:[^']|'')*'")
+_RE_NUMERO = re.compile(r'\b\d+(?:\.\d+)?\b')
+_RE_ESPACIOS = re.compile(r'\s+')
+
+
+def normalizar_sql(sql):
+    """Quita literales y largo de listas IN para agrupar consultas con la misma forma."""
+    sql = _RE_LISTA_IN.sub('IN (...)', sql)
+    sql = _RE_CADENA.sub('?', sql)
+    sql = _RE_NUMERO.sub('?', sql)
+    return _RE_ESPACIOS.sub(' ', sql).strip()
+
+
+def huella_sql(sql):
+    return hashlib.md5(normalizar_sql(sql).encode()).hexdigest()[:12]
+
+
+# Módulos de instrumentación que envuelven las consultas y no son su origen real
+_INSTRUMENTACION = ('core/querylog.py', 'core/middleware.py')
+
+
+def _origen():
+    """Marco más interno de la pila que pertenece al proyecto (no a Django, librerías ni instrumentación)."""
+    base = str(settings.BASE_DIR)
+    for marco in reversed(traceback.extract_stack()):
+        if not marco.filename.startswith(base) or 'site-packages' in marco.filename:
+            continue
+        ruta = marco.filename[len(base) + 1:].replace('\\', '/')
+        if ruta not in _INSTRUMENTACION:
+            return f'{ruta}:{marco.lineno} en {marco.name}'
+    return None
+
+
+def _parametros(params):
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {clave: repr(valor) for clave, valor in params.items()}
+    return [repr(valor) for valor in params]
+
+
+class CapturaConsultasLentas:
+    """Wrapper para connection.execute_wrapper que registra las consultas lentas."""
+
+    def __init__(self, umbral_ms, vista=None):
+        self.umbral = umbral_ms / 1000
+        self.vista = vista
+        self._explicando = False
+
+    def __call__(self, execute, sql, params, many, context):
+        if self._explicando:
+            return execute(sql, params, many, context)
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracion = time.perf_counter() - inicio
+            if duracion >= self.umbral:
+                self._registrar(context['connection'], sql, params, many, duracion)
+
+    def _explicar(self, conexion, sql, params):
+        """Plan de la consulta; solo para lecturas, porque ANALYZE vuelve a ejecutarla."""
+        if not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+            return None
+        opciones = {'analyze': True} if conexion.vendor == 'postgresql' and settings.SLOW_QUERY_EXPLAIN_ANALYZE else {}
+        prefijo = conexion.ops.explain_query_prefix(**opciones)
+        self._explicando = True
+        try:
+            with conexion.cursor() as cursor:
+                cursor.execute(f'{prefijo} {sql}', params)
+                return '\n'.join(str(fila[-1]) for fila in cursor.fetchall())
+        except Exception as error:
+            return f'EXPLAIN falló: {error}'
+        finally:
+            self._explicando = False
+
+    def _registrar(self, conexion, sql, params, many, duracion):
+        vista = self.vista
+        if callable(vista):
+            vista = vista()
+        registro = {
+            'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'alias': conexion.alias,
+            'duracion_ms': round(duracion * 1000, 2),
+            'huella': huella_sql(sql),
+            'sql': sql,
+            'params': None if many else _parametros(params),
+            'vista': vista,
+            'origen': _origen(),
+            'plan': None if many else self._explicar(conexion, sql, params),
+        }
+        logger.warning(json.dumps(registro, default=str))
+
+
+@contextmanager
+def capturar_consultas_lentas(umbral_ms=None, vista=None):
+    """Activa la captura en todas las conexiones (útil también fuera de una petición)."""
+    captura = CapturaConsultasLentas(umbral_ms or settings.SLOW_QUERY_LOG_MS, vista)
+    with ExitStack() as stack:
+        for conexion in connections.all():
+            stack.enter_context(conexion.execute_wrapper(captura))
+        yield captura
+
+
+class ConsultasLentasMiddleware:
+    """Captura las consultas lentas de cada petición; inactivo si SLOW_QUERY_LOG_MS es 0."""
+
+    def __init__(self, get_response):
+        if not settings.SLOW_QUERY_LOG_MS:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        def vista():
+            match = request.resolver_match
+            return match.view_name if match else request.path
+
+        with capturar_consultas_lentas(vista=vista):
+            return self.get_response(request)
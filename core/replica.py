@@ -0,0 +1,142 @@
+"""
+Lecturas en réplica para reportes, exportaciones, estadísticas y dashboards.
+
+Con DATABASE_REPLICA_URL definida, settings agrega el alias 'replica' y el
+router RouterReplica. Solo leen de la réplica las vistas marcadas con
+@lectura_replica y el código dentro de en_replica(); todo lo demás, y toda
+escritura, va a la primaria.
+
+Lectura de lo propio escrito: cuando una petición escribe en la base,
+ReplicaMiddleware deja una cookie que fija al navegador en la primaria por
+REPLICA_PIN_SECONDS, para que el usuario no vea datos anteriores a su cambio
+mientras la réplica se pone al día. Sin réplica configurada, todo queda
+inactivo y se usa la primaria.
+
+Lo que se guarda en caché bajo un sello de versión (core/cache.py) se
+reconstruye dentro de en_primaria(): leído de una réplica atrasada, el
+dato viejo quedaría guardado bajo el sello nuevo y lo verían todos los
+navegadores, no solo el que escribió.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS
+
+
+REPLICA = 'replica'
+COOKIE_PRIMARIA = 'estudify_primaria'
+
+
+class _Estado:
+    __slots__ = ('replica', 'fijado', 'escribio')
+
+    def __init__(self, fijado=False):
+        self.replica = False
+        self.fijado = fijado
+        self.escribio = False
+
+
+_estado = ContextVar('estudify_replica', default=None)
+
+
+def replica_configurada():
+    return REPLICA in settings.DATABASES
+
+
+@contextmanager
+def en_replica():
+    """Lee de la réplica dentro del bloque (vistas de solo lectura, exportaciones, comandos)."""
+    estado = _estado.get()
+    token = None
+    if estado is None:
+        estado = _Estado()
+        token = _estado.set(estado)
+    anterior = estado.replica
+    estado.replica = True
+    try:
+        yield
+    finally:
+        estado.replica = anterior
+        if token is not None:
+            _estado.reset(token)
+
+
+@contextmanager
+def en_primaria():
+    """Lee de la primaria dentro del bloque aunque la vista esté marcada con @lectura_replica."""
+    estado = _estado.get()
+    if estado is None:
+        yield
+        return
+    anterior = estado.replica
+    estado.replica = False
+    try:
+        yield
+    finally:
+        estado.replica = anterior
+
+
+def lectura_replica(vista):
+    """Marca una vista de solo lectura; va debajo de @login_required para que la sesión y el usuario se lean de la primaria."""
+    if iscoroutinefunction(vista):
+        # Las consultas de la vista async copian el contexto de la petición (y este estado)
+        @wraps(vista)
+        async def envuelta_async(request, *args, **kwargs):
+            with en_replica():
+                return await vista(request, *args, **kwargs)
+        return envuelta_async
+
+    @wraps(vista)
+    def envuelta(request, *args, **kwargs):
+        with en_replica():
+            return vista(request, *args, **kwargs)
+    return envuelta
+
+
+class RouterReplica:
+    def db_for_read(self, model, **hints):
+        estado = _estado.get()
+        if estado is None or not estado.replica or estado.fijado or estado.escribio:
+            return None
+        return REPLICA if replica_configurada() else None
+
+    def db_for_write(self, model, **hints):
+        estado = _estado.get()
+        if estado is not None:
+            estado.escribio = True
+        # Explícito: sin esto Django escribiría en la base de la que se leyó la instancia
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primaria y réplica tienen los mismos datos
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # La réplica recibe el esquema por replicación, no por migrate
+        return db != REPLICA
+
+
+class ReplicaMiddleware:
+    """Fija en la primaria, por unos segundos, a los navegadores que acaban de escribir."""
+
+    def __init__(self, get_response):
+        if not replica_configurada():
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        estado = _Estado(fijado=COOKIE_PRIMARIA in request.COOKIES)
+        token = _estado.set(estado)
+        try:
+            response = self.get_response(request)
+        finally:
+            _estado.reset(token)
+        if estado.escribio:
+            response.set_cookie(
+                COOKIE_PRIMARIA, '1', max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax'
+            )
+        return response
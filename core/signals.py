@@ -0,0 +1,100 @@
+"""
+Señales que invalidan las versiones de caché cuando cambian los datos.
+"""
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import cache as versiones
+from .models import Curso, Materia, Matricula, InscripcionMateria, Calificacion, Asistencia, Notificacion
+
+
+def _docente_de_materia(instance):
+    """Docente de la materia del registro, sin consultar si la materia ya está cargada."""
+    materia = instance._state.fields_cache.get('materia')
+    if materia is not None:
+        return materia.docente_id
+    return Materia.objects.filter(pk=instance.materia_id).values_list('docente_id', flat=True).first()
+
+
+@receiver([post_save, post_delete], sender=Calificacion)
+@receiver([post_save, post_delete], sender=Asistencia)
+@receiver([post_save, post_delete], sender=InscripcionMateria)
+def invalidar_estudiante_y_docente(sender, instance, **kwargs):
+    """Calificaciones, asistencias e inscripciones afectan al estudiante y al docente de la materia."""
+    versiones.invalidar(versiones.USUARIO, instance.estudiante_id, _docente_de_materia(instance))
+
+
+@receiver([post_save, post_delete], sender=Notificacion)
+def invalidar_notificaciones(sender, instance, **kwargs):
+    versiones.invalidar(versiones.USUARIO, instance.estudiante_id)
+
+
+@receiver([post_save, post_delete], sender=Matricula)
+def invalidar_matricula(sender, instance, **kwargs):
+    """Una matrícula cambia el total de estudiantes de los docentes del curso y los cursos más poblados."""
+    docentes = Materia.objects.filter(curso_id=instance.curso_id).values_list('docente_id', flat=True)
+    versiones.invalidar(versiones.USUARIO, instance.estudiante_id, *set(docentes))
+    versiones.invalidar(versiones.MATRICULAS, '')
+
+
+@receiver(pre_save, sender=Materia)
+def recordar_docente_anterior(sender, instance, **kwargs):
+    """Guarda el docente previo para invalidar también su versión si la materia cambia de docente."""
+    instance._docente_anterior_id = None
+    if instance.pk:
+        instance._docente_anterior_id = Materia.objects.filter(pk=instance.pk).values_list(
+            'docente_id', flat=True
+        ).first()
+
+
+@receiver([post_save, post_delete], sender=Materia)
+def invalidar_materia(sender, instance, **kwargs):
+    docentes = (instance.docente_id, getattr(instance, '_docente_anterior_id', None))
+    versiones.invalidar(versiones.USUARIO, *docentes)
+    versiones.invalidar(versiones.DOCENTE, *docentes)
+    versiones.invalidar(versiones.CATALOGO, '')
+
+
+@receiver([post_save, post_delete], sender=Curso)
+def invalidar_curso(sender, instance, **kwargs):
+    versiones.invalidar(versiones.CATALOGO, '')
+
+
+# Campos del usuario que muestra el catálogo (nombre de los docentes y docentes activos)
+CAMPOS_CATALOGO = ('username', 'first_name', 'last_name', 'role', 'is_active')
+
+
+def _afecta_catalogo(update_fields):
+    return update_fields is None or bool(set(update_fields) & set(CAMPOS_CATALOGO))
+
+
+@receiver(pre_save, sender=settings.AUTH_USER_MODEL)
+def recordar_usuario_anterior(sender, instance, update_fields=None, **kwargs):
+    """Guarda los campos del catálogo antes de guardar, para invalidarlo solo si cambian."""
+    instance._catalogo_anterior = None
+    if instance.pk and _afecta_catalogo(update_fields):
+        instance._catalogo_anterior = sender.objects.filter(pk=instance.pk).values(*CAMPOS_CATALOGO).first()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidar_usuario(sender, instance, update_fields=None, **kwargs):
+    """
+    El catálogo incluye los nombres de los docentes: se invalida si cambia el
+    nombre, el rol o el estado de un docente, o si alguien entra o sale del
+    rol. Registros, perfiles y contraseñas de los demás usuarios no lo afectan.
+    """
+    if not _afecta_catalogo(update_fields):
+        return
+    anterior = getattr(instance, '_catalogo_anterior', None)
+    actual = {campo: getattr(instance, campo) for campo in CAMPOS_CATALOGO}
+    roles = {actual['role'], anterior['role'] if anterior else None}
+    if 'docente' in roles and actual != anterior:
+        versiones.invalidar(versiones.CATALOGO, '')
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidar_docente_eliminado(sender, instance, **kwargs):
+    # Sus materias quedan sin docente (SET_NULL, sin señales de Materia)
+    if instance.role == 'docente':
+        versiones.invalidar(versiones.CATALOGO, '')
@@ -0,0 +1,103 @@
+"""
+Respuestas HTML de las listas largas: en streaming y parciales.
+
+La página se renderiza una vez sin filas, con MARCADOR en el lugar de las
+filas de la tabla: lo anterior al marcador se envía de inmediato y lo
+posterior al final. Las filas se leen con un cursor del lado del servidor
+(QuerySet.iterator; en PostgreSQL, un cursor con nombre) y se envían en
+bloques renderizados con la plantilla parcial de filas. Así el primer byte
+no espera a la consulta y la memoria del worker depende del tamaño del
+bloque, no del total de filas.
+
+El primer bloque de filas se lee dentro de la vista, antes de crear la
+respuesta: la consulta se ejecuta (y falla, si falla) mientras siguen
+activos los middlewares que la miden, y Server-Timing la incluye. Los
+bloques siguientes se leen y renderizan con esas mismas mediciones
+reanudadas (core/middleware.py), así que las consultas lentas y las
+métricas de la petición también los ven. Si la base falla a mitad de la
+respuesta, el estado HTTP ya se envió: la página queda cortada en lugar de
+mostrar el error 500.
+
+Cuando la petición lleva la cabecera CABECERA_PARCIAL (los filtros de las
+listas, ver static/js/filtros.js) solo se envían las filas: ni la página ni
+el contexto que únicamente usa la página (menú, opciones de los filtros).
+"""
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.shortcuts import render
+from django.template.loader import get_template, render_to_string
+from django.utils.cache import patch_vary_headers
+
+from .middleware import medicion_en_curso, reanudar_medicion
+
+
+MARCADOR = '<!-- filas -->'
+
+CABECERA_PARCIAL = 'X-Parcial'
+
+
+def es_parcial(request):
+    """La petición pide solo las filas de la tabla."""
+    return request.headers.get(CABECERA_PARCIAL) == 'filas'
+
+
+def render_lista(request, plantilla, plantilla_filas, context, nombre):
+    """
+    Renderiza una lista cuyas filas (context[nombre], un QuerySet) pinta
+    plantilla_filas. Con STREAMING_LISTS envía la respuesta en streaming; si
+    no, renderiza la página completa como render(). Las peticiones parciales
+    reciben solo las filas.
+    """
+    parcial = es_parcial(request)
+    if not settings.STREAMING_LISTS:
+        if parcial:
+            response = HttpResponse(render_to_string(plantilla_filas, {nombre: context[nombre]}))
+        else:
+            response = render(request, plantilla, context)
+    else:
+        if parcial:
+            inicio, fin = '', ''
+        else:
+            inicio, fin = render_to_string(plantilla, {**context, 'streaming': True}, request).split(MARCADOR, 1)
+        tamano = settings.STREAMING_CHUNK_SIZE
+        filas = context[nombre].iterator(chunk_size=tamano)
+        primer_bloque = list(islice(filas, tamano))
+        contenido = _generar(
+            inicio, get_template(plantilla_filas), primer_bloque, filas, nombre, fin, medicion_en_curso()
+        )
+        if isinstance(request, ASGIRequest):
+            # Bajo ASGI un iterador síncrono se leería completo antes de enviarse
+            contenido = _en_hilo_de_la_peticion(contenido)
+        response = StreamingHttpResponse(contenido, content_type='text/html; charset=utf-8')
+    # La misma URL devuelve la página o solo las filas según la cabecera
+    patch_vary_headers(response, [CABECERA_PARCIAL])
+    return response
+
+
+def _generar(inicio, plantilla_filas, bloque, filas, nombre, fin, medicion):
+    tamano = settings.STREAMING_CHUNK_SIZE
+    if inicio:
+        yield inicio
+    # Sin ninguna fila, la plantilla parcial pinta el mensaje de lista vacía
+    with reanudar_medicion(medicion):
+        html = plantilla_filas.render({nombre: bloque})
+    yield html
+    while len(bloque) == tamano:
+        with reanudar_medicion(medicion):
+            bloque = list(islice(filas, tamano))
+            html = plantilla_filas.render({nombre: bloque}) if bloque else ''
+        if html:
+            yield html
+    if fin:
+        yield fin
+
+
+async def _en_hilo_de_la_peticion(generador):
+    """Recorre el generador bloque a bloque en el hilo síncrono de la petición (el del cursor)."""
+    siguiente = sync_to_async(next)
+    while (bloque := await siguiente(generador, None)) is not None:
+        yield bloque
@@ -4,13 +4,19 @@ Contiene vistas de consulta (solo lectura) y acciones específicas (exportar, ma
 """
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
-from django.db.models import Avg
+from django.core.paginator import Paginator
+from django.db.models import Avg, Count, Q
 from django.utils import timezone
 from django.http import HttpResponse
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment
 # Importación COMPLETA de modelos para el contexto del estudiante
 from .models import Matricula, Calificacion, Asistencia, Notificacion, InscripcionMateria 
+from .analytics import resumen_asistencia, resumen_asistencia_por_mes
+from .asincrono import en_paralelo, usuario
+from .cache import acontexto_dashboard
+from .replica import lectura_replica
+
+
+ASISTENCIAS_POR_PAGINA = 50
 
 
 def is_student(user):
@@ -20,67 +26,80 @@ def is_student(user):
 
 @login_required
 @user_passes_test(is_student)
-def student_dashboard(request):
+@lectura_replica
+async def student_dashboard(request):
     """Dashboard principal para estudiantes, mostrando estadísticas clave."""
-    
+    user = await usuario(request)
+    context = await acontexto_dashboard(user, lambda: _contexto_student_dashboard(user))
+    return render(request, 'student/dashboard.html', context)
+
+
+async def _contexto_student_dashboard(user):
+    """Calcula el contexto del dashboard del estudiante (se guarda en caché por usuario)."""
     # Matrículas activas (Curso)
     matriculas = Matricula.objects.filter(
-        estudiante=request.user,
+        estudiante=user,
         activa=True
     ).select_related('curso')
 
     # Materias inscritas directamente (InscripcionMateria)
     materias_inscritas = InscripcionMateria.objects.filter(
-        estudiante=request.user
-    ).select_related('materia', 'materia__curso')
+        estudiante=user
+    ).select_related('materia', 'materia__curso', 'materia__docente')
 
     # Calificaciones
     calificaciones = Calificacion.objects.filter(
-        estudiante=request.user
+        estudiante=user
     ).select_related('materia', 'materia__curso').order_by('-fecha_registro')
 
-    # Promedio general
-    promedio = calificaciones.aggregate(Avg('nota'))['nota__avg'] or 0
-
     # Notificaciones no leídas
     notificaciones = Notificacion.objects.filter(
-        estudiante=request.user,
+        estudiante=user,
         leida=False
     ).order_by('-creada_en')[:5]
 
     # Asistencias del mes
     mes_actual = timezone.now().month
     asistencias_mes = Asistencia.objects.filter(
-        estudiante=request.user,
+        estudiante=user,
         fecha__month=mes_actual
     )
-    total_asistencias = asistencias_mes.count()
-    presentes = asistencias_mes.filter(estado='presente').count()
-    porcentaje_asistencia = (presentes / total_asistencias * 100) if total_asistencias > 0 else 0
 
-    context = {
+    # Las consultas no dependen entre sí: se ejecutan a la vez
+    matriculas, materias_inscritas, recientes, promedio, notificaciones, asistencia = await en_paralelo(
+        lambda: list(matriculas),
+        lambda: list(materias_inscritas),
+        lambda: list(calificaciones[:10]),
+        lambda: calificaciones.aggregate(Avg('nota'))['nota__avg'] or 0,
+        lambda: list(notificaciones),
+        lambda: asistencias_mes.aggregate(total=Count('id'), presentes=Count('id', filter=Q(estado='presente'))),
+    )
+    total_asistencias = asistencia['total']
+    porcentaje_asistencia = (asistencia['presentes'] / total_asistencias * 100) if total_asistencias > 0 else 0
+
+    # Se evalúan como listas para que el contexto pueda guardarse en caché
+    return {
         'matriculas': matriculas,
-        'materias_inscritas': materias_inscritas, 
-        'calificaciones': calificaciones,
+        'materias_inscritas': materias_inscritas,
+        'calificaciones': recientes,
         'promedio': round(promedio, 2),
         'notificaciones': notificaciones,
         'porcentaje_asistencia': round(porcentaje_asistencia, 1),
     }
 
-    return render(request, 'student/dashboard.html', context)
-
 
 @login_required
 @user_passes_test(is_student)
-def mis_calificaciones(request):
+async def mis_calificaciones(request):
     """Ver todas las calificaciones agrupadas por materia."""
+    user = await usuario(request)
     calificaciones = Calificacion.objects.filter(
-        estudiante=request.user
+        estudiante=user
     ).select_related('materia', 'materia__curso').order_by('materia__curso', 'materia', 'periodo')
 
     # Agrupar por materia y calcular promedios
     calificaciones_por_materia = {}
-    for cal in calificaciones:
+    async for cal in calificaciones:
         materia_key = cal.materia.id
         if materia_key not in calificaciones_por_materia:
             calificaciones_por_materia[materia_key] = {
@@ -123,29 +142,62 @@ def mis_cursos(request):
 
 @login_required
 @user_passes_test(is_student)
-def mis_asistencias(request):
-    """Ver registro de asistencias y estadísticas."""
-    asistencias = Asistencia.objects.filter(
-        estudiante=request.user
-    ).select_related('materia').order_by('-fecha')
-
-    # Estadísticas
-    total = asistencias.count()
-    presentes = asistencias.filter(estado='presente').count()
-    # Las otras cuentas se mantienen, pero solo presentes afecta el porcentaje
-    # ausentes = asistencias.filter(estado='ausente').count()
-    # tardanzas = asistencias.filter(estado='tardanza').count()
-    # excusados = asistencias.filter(estado='excusado').count()
+async def mis_asistencias(request):
+    """Ver registro de asistencias y estadísticas (dos consultas sin importar el historial)."""
+    user = await usuario(request)
+    por_mes = request.GET.get('por_mes') == '1'
 
-    porcentaje_asistencia = (presentes / total * 100) if total > 0 else 0
+    # Detalle paginado, solo con las columnas que usa la plantilla
+    asistencias = Asistencia.objects.filter(
+        estudiante=user
+    ).select_related('materia').only(
+        'fecha', 'estado', 'observaciones', 'materia__nombre'
+    ).order_by('-fecha', '-id')
+    try:
+        numero = max(int(request.GET.get('page', 1)), 1)
+    except (TypeError, ValueError):
+        numero = 1
+
+    def calcular_resumen():
+        # Conteos por estado, por materia (y opcionalmente por mes) y rachas en una sola consulta
+        if por_mes:
+            return resumen_asistencia_por_mes(estudiante_id=user.id)
+        return resumen_asistencia(estudiante_id=user.id), []
+
+    # El resumen y la página pedida del detalle se consultan a la vez
+    (resumen, resumen_meses), filas = await en_paralelo(
+        calcular_resumen,
+        lambda: list(asistencias[(numero - 1) * ASISTENCIAS_POR_PAGINA:numero * ASISTENCIAS_POR_PAGINA]),
+    )
+    resumen_materias = sorted(resumen.values(), key=lambda datos: datos['materia_nombre'])
+
+    totales = dict.fromkeys(('total', 'presentes', 'ausentes', 'tardanzas', 'excusados'), 0)
+    for datos in resumen_materias:
+        for clave in totales:
+            totales[clave] += datos[clave]
+    total = totales['total']
+    porcentaje_asistencia = (totales['presentes'] / total * 100) if total > 0 else 0
+
+    paginator = Paginator(asistencias, ASISTENCIAS_POR_PAGINA)
+    paginator.count = total  # Ya conocido por el resumen: evita el COUNT(*)
+    page_obj = paginator.get_page(numero)
+    if page_obj.number == numero:
+        page_obj.object_list = filas
+    else:
+        # Página fuera de rango: se muestra la última, como hace get_page
+        page_obj.object_list = [asistencia async for asistencia in page_obj.object_list]
 
     context = {
-        'asistencias': asistencias,
+        'asistencias': page_obj,
+        'page_obj': page_obj,
+        'por_mes': por_mes,
+        'resumen_materias': resumen_materias,
+        'resumen_meses': resumen_meses,
         'total': total,
-        'presentes': presentes,
-        'ausentes': asistencias.filter(estado='ausente').count(),
-        'tardanzas': asistencias.filter(estado='tardanza').count(),
-        'excusados': asistencias.filter(estado='excusado').count(),
+        'presentes': totales['presentes'],
+        'ausentes': totales['ausentes'],
+        'tardanzas': totales['tardanzas'],
+        'excusados': totales['excusados'],
         'porcentaje_asistencia': round(porcentaje_asistencia, 1),
     }
     return render(request, 'student/asistencias.html', context)
@@ -153,9 +205,13 @@ def mis_asistencias(request):
 
 @login_required
 @user_passes_test(is_student)
+@lectura_replica
 def exportar_calificaciones(request):
     """Exportar calificaciones del estudiante a un archivo Excel."""
-    
+    # openpyxl tarda en importarse: se carga al exportar, no al arrancar cada worker
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, PatternFill, Alignment
+
     wb = Workbook()
     ws = wb.active
     ws.title = "Mis Calificaciones"
@@ -215,13 +271,14 @@ def marcar_notificacion_leida(request, notificacion_id):
 
 @login_required
 @user_passes_test(is_student)
-def mis_notificaciones(request):
+async def mis_notificaciones(request):
     """Ver todas las notificaciones del estudiante."""
+    user = await usuario(request)
     notificaciones = Notificacion.objects.filter(
-        estudiante=request.user
+        estudiante=user
     ).order_by('-creada_en')
 
     context = {
-        'notificaciones': notificaciones,
+        'notificaciones': [notificacion async for notificacion in notificaciones],
     }
-    return render(request, 'student/notificaciones.html', context)
\ No newline at end of file
+    return render(request, 'student/notificaciones.html', context)
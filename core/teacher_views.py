@@ -6,11 +6,17 @@ from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
 from django.db.models import Avg, Count, Q
 from django.utils import timezone
-from django.http import HttpResponse
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment
-from .models import Materia, Matricula, Calificacion, Asistencia, Notificacion, InscripcionMateria
+from django.http import HttpResponse, HttpResponseBadRequest
+from django.utils.dateparse import parse_date
+from asgiref.sync import sync_to_async
+from .models import Matricula, Calificacion, Asistencia, InscripcionMateria
 from accounts.models import CustomUser
+from .analytics import resumen_asistencia
+from .asincrono import en_paralelo, usuario
+from .cache import acontexto_dashboard
+from .replica import lectura_replica
+from .streaming import render_lista
+from . import inscripciones
 
 
 def is_teacher(user):
@@ -19,46 +25,71 @@ def is_teacher(user):
 
 @login_required
 @user_passes_test(is_teacher)
-def teacher_dashboard(request):
+@lectura_replica
+async def teacher_dashboard(request):
     """Dashboard principal para docentes"""
-    # Materias del docente
-    materias = Materia.objects.filter(docente=request.user, activa=True)
+    user = await usuario(request)
+    context = await acontexto_dashboard(user, lambda: _contexto_teacher_dashboard(request.docente))
+    return render(request, 'teacher/dashboard.html', context)
+
+
+async def _contexto_teacher_dashboard(docente):
+    """Calcula el contexto del dashboard del docente (se guarda en caché por usuario)."""
+    # Materias del docente (en caché por docente)
+    materias = await sync_to_async(lambda: docente.materias)()
 
     # Estudiantes totales
     estudiantes_ids = Matricula.objects.filter(
-        curso__materias__in=materias,
+        curso_id__in=docente.curso_ids,
         activa=True
     ).values_list('estudiante_id', flat=True).distinct()
-    total_estudiantes = len(estudiantes_ids)
 
     # Calificaciones recientes
-    calificaciones_recientes = Calificacion.objects.filter(
-        materia__in=materias
-    ).select_related('estudiante', 'materia').order_by('-fecha_registro')[:10]
+    calificaciones = Calificacion.objects.filter(materia_id__in=docente.materia_ids)
+    calificaciones_recientes = calificaciones.select_related(
+        'estudiante', 'materia'
+    ).order_by('-fecha_registro')[:10]
 
-    # Estadísticas
-    total_calificaciones = Calificacion.objects.filter(materia__in=materias).count()
-    promedio_general = Calificacion.objects.filter(materia__in=materias).aggregate(Avg('nota'))['nota__avg'] or 0
+    # Las consultas no dependen entre sí: se ejecutan a la vez
+    total_estudiantes, calificaciones_recientes, estadisticas = await en_paralelo(
+        lambda: len(estudiantes_ids),
+        lambda: list(calificaciones_recientes),
+        lambda: calificaciones.aggregate(total=Count('id'), promedio=Avg('nota')),
+    )
 
-    context = {
+    # Se evalúan como listas para que el contexto pueda guardarse en caché
+    return {
         'materias': materias,
         'total_estudiantes': total_estudiantes,
-        'total_calificaciones': total_calificaciones,
-        'promedio_general': round(promedio_general, 2),
+        'total_calificaciones': estadisticas['total'],
+        'promedio_general': round(estadisticas['promedio'] or 0, 2),
         'calificaciones_recientes': calificaciones_recientes,
     }
 
-    return render(request, 'teacher/dashboard.html', context)
-
 
 # ==================== GESTIÓN DE CALIFICACIONES ====================
 
+def _filtros_validos(materia_id, fecha=None):
+    """
+    Valida los filtros de la URL de las listas antes de armar la respuesta:
+    una vez que empieza el streaming ya no se puede responder con un 400.
+    """
+    try:
+        if materia_id:
+            int(materia_id)
+        if fecha and parse_date(fecha) is None:
+            return False
+    except ValueError:
+        return False
+    return True
+
+
 @login_required
 @user_passes_test(is_teacher)
 def calificaciones_lista(request):
     """Lista de calificaciones del docente"""
-    materias = Materia.objects.filter(docente=request.user, activa=True)
-    calificaciones = Calificacion.objects.filter(materia__in=materias).select_related(
+    materias = request.docente.materias
+    calificaciones = Calificacion.objects.filter(materia_id__in=request.docente.materia_ids).select_related(
         'estudiante', 'materia', 'materia__curso'
     ).order_by('-fecha_registro')
 
@@ -66,6 +97,8 @@ def calificaciones_lista(request):
     materia_id = request.GET.get('materia')
     periodo = request.GET.get('periodo')
     search = request.GET.get('search')
+    if not _filtros_validos(materia_id):
+        return HttpResponseBadRequest('Filtros inválidos')
 
     if materia_id:
         calificaciones = calificaciones.filter(materia_id=materia_id)
@@ -86,14 +119,16 @@ def calificaciones_lista(request):
         'periodo_filter': periodo,
         'search_query': search,
     }
-    return render(request, 'teacher/calificaciones_lista.html', context)
+    return render_lista(
+        request, 'teacher/calificaciones_lista.html', 'teacher/calificaciones_filas.html', context, 'calificaciones'
+    )
 
 
 @login_required
 @user_passes_test(is_teacher)
 def calificacion_crear(request):
     """Crear nueva calificación"""
-    materias = Materia.objects.filter(docente=request.user, activa=True)
+    materias = request.docente.materias
 
     if request.method == 'POST':
         estudiante_id = request.POST.get('estudiante')
@@ -103,7 +138,7 @@ def calificacion_crear(request):
         observaciones = request.POST.get('observaciones', '')
 
         # Verificar que la materia pertenece al docente
-        materia = get_object_or_404(Materia, id=materia_id, docente=request.user)
+        materia = request.docente.materia(materia_id, inactivas=True)
 
         # Verificar si ya existe una calificación
         if Calificacion.objects.filter(estudiante_id=estudiante_id, materia=materia, periodo=periodo).exists():
@@ -120,25 +155,16 @@ def calificacion_crear(request):
         )
 
         # Crear notificación
-        Notificacion.objects.create(
-            estudiante_id=estudiante_id,
-            tipo='calificacion',
-            titulo=f'Nueva calificación en {materia.nombre}',
-            mensaje=f'Has recibido una calificación de {nota} en {materia.nombre} - {calificacion.get_periodo_display()}'
-        )
-
-        calificacion.notificado = True
-        calificacion.save()
+        calificacion.notificar()
 
         messages.success(request, 'Calificación registrada exitosamente')
         return redirect('teacher_calificaciones_lista')
 
     # Obtener estudiantes de las materias del docente
-    cursos_ids = materias.values_list('curso_id', flat=True).distinct()
     estudiantes = CustomUser.objects.filter(
         role='estudiante',
         is_active=True,
-        matriculas__curso_id__in=cursos_ids,
+        matriculas__curso_id__in=request.docente.curso_ids,
         matriculas__activa=True
     ).distinct()
 
@@ -154,7 +180,9 @@ def calificacion_crear(request):
 @user_passes_test(is_teacher)
 def calificacion_editar(request, calificacion_id):
     """Editar calificación"""
-    calificacion = get_object_or_404(Calificacion, id=calificacion_id, materia__docente=request.user)
+    calificacion = get_object_or_404(
+        Calificacion, id=calificacion_id, materia_id__in=request.docente.materia_ids_todas
+    )
 
     if request.method == 'POST':
         calificacion.nota = request.POST.get('nota')
@@ -175,7 +203,9 @@ def calificacion_editar(request, calificacion_id):
 @user_passes_test(is_teacher)
 def calificacion_eliminar(request, calificacion_id):
     """Eliminar calificación"""
-    calificacion = get_object_or_404(Calificacion, id=calificacion_id, materia__docente=request.user)
+    calificacion = get_object_or_404(
+        Calificacion, id=calificacion_id, materia_id__in=request.docente.materia_ids_todas
+    )
 
     if request.method == 'POST':
         calificacion.delete()
@@ -191,8 +221,8 @@ def calificacion_eliminar(request, calificacion_id):
 @user_passes_test(is_teacher)
 def asistencias_lista(request):
     """Lista de asistencias del docente"""
-    materias = Materia.objects.filter(docente=request.user, activa=True)
-    asistencias = Asistencia.objects.filter(materia__in=materias).select_related(
+    materias = request.docente.materias
+    asistencias = Asistencia.objects.filter(materia_id__in=request.docente.materia_ids).select_related(
         'estudiante', 'materia'
     ).order_by('-fecha')
 
@@ -200,6 +230,8 @@ def asistencias_lista(request):
     materia_id = request.GET.get('materia')
     estado = request.GET.get('estado')
     fecha = request.GET.get('fecha')
+    if not _filtros_validos(materia_id, fecha):
+        return HttpResponseBadRequest('Filtros inválidos')
 
     if materia_id:
         asistencias = asistencias.filter(materia_id=materia_id)
@@ -216,14 +248,16 @@ def asistencias_lista(request):
         'estado_filter': estado,
         'fecha_filter': fecha,
     }
-    return render(request, 'teacher/asistencias_lista.html', context)
+    return render_lista(
+        request, 'teacher/asistencias_lista.html', 'teacher/asistencias_filas.html', context, 'asistencias'
+    )
 
 
 @login_required
 @user_passes_test(is_teacher)
 def asistencia_crear(request):
     """Registrar asistencia"""
-    materias = Materia.objects.filter(docente=request.user, activa=True)
+    materias = request.docente.materias
 
     if request.method == 'POST':
         estudiante_id = request.POST.get('estudiante')
@@ -233,7 +267,7 @@ def asistencia_crear(request):
         observaciones = request.POST.get('observaciones', '')
 
         # Verificar que la materia pertenece al docente
-        materia = get_object_or_404(Materia, id=materia_id, docente=request.user)
+        materia = request.docente.materia(materia_id, inactivas=True)
 
         # Verificar si ya existe un registro
         if Asistencia.objects.filter(estudiante_id=estudiante_id, materia=materia, fecha=fecha).exists():
@@ -254,11 +288,10 @@ def asistencia_crear(request):
         return redirect('teacher_asistencias_lista')
 
     # Obtener estudiantes de las materias del docente
-    cursos_ids = materias.values_list('curso_id', flat=True).distinct()
     estudiantes = CustomUser.objects.filter(
         role='estudiante',
         is_active=True,
-        matriculas__curso_id__in=cursos_ids,
+        matriculas__curso_id__in=request.docente.curso_ids,
         matriculas__activa=True
     ).distinct()
 
@@ -275,7 +308,9 @@ def asistencia_crear(request):
 @user_passes_test(is_teacher)
 def asistencia_editar(request, asistencia_id):
     """Editar asistencia"""
-    asistencia = get_object_or_404(Asistencia, id=asistencia_id, materia__docente=request.user)
+    asistencia = get_object_or_404(
+        Asistencia, id=asistencia_id, materia_id__in=request.docente.materia_ids_todas
+    )
 
     if request.method == 'POST':
         asistencia.estado = request.POST.get('estado')
@@ -297,7 +332,9 @@ def asistencia_editar(request, asistencia_id):
 @user_passes_test(is_teacher)
 def asistencia_eliminar(request, asistencia_id):
     """Eliminar asistencia"""
-    asistencia = get_object_or_404(Asistencia, id=asistencia_id, materia__docente=request.user)
+    asistencia = get_object_or_404(
+        Asistencia, id=asistencia_id, materia_id__in=request.docente.materia_ids_todas
+    )
 
     if request.method == 'POST':
         asistencia.delete()
@@ -311,6 +348,7 @@ def asistencia_eliminar(request, asistencia_id):
 
 @login_required
 @user_passes_test(is_teacher)
+@lectura_replica
 def generar_reporte(request):
     """Generar reporte de calificaciones en Excel"""
     materia_id = request.GET.get('materia')
@@ -319,7 +357,11 @@ def generar_reporte(request):
         messages.error(request, 'Debes seleccionar una materia')
         return redirect('teacher_dashboard')
 
-    materia = get_object_or_404(Materia, id=materia_id, docente=request.user)
+    materia = request.docente.materia(materia_id, inactivas=True)
+
+    # openpyxl tarda en importarse: se carga al exportar, no al arrancar cada worker
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, PatternFill, Alignment
 
     # Crear workbook
     wb = Workbook()
@@ -369,30 +411,53 @@ def generar_reporte(request):
 
 @login_required
 @user_passes_test(is_teacher)
-def estadisticas(request):
+@lectura_replica
+async def estadisticas(request):
     """Ver estadísticas de las materias del docente"""
-    materias = Materia.objects.filter(docente=request.user, activa=True)
+    await usuario(request)
+    docente = request.docente
+    materias = await sync_to_async(lambda: docente.materias)()
+
+    def calificaciones_por_materia():
+        # Calificaciones agregadas por materia en una sola consulta
+        return {
+            fila['materia_id']: fila
+            for fila in Calificacion.objects.filter(materia_id__in=docente.materia_ids).values(
+                'materia_id'
+            ).annotate(
+                total=Count('id'),
+                promedio=Avg('nota'),
+                aprobados=Count('id', filter=Q(nota__gte=3.0)),
+                reprobados=Count('id', filter=Q(nota__lt=3.0)),
+            )
+        }
+
+    def asistencias_por_materia():
+        # Asistencia y estudiantes con ausentismo crónico por materia (una sola consulta)
+        asistencias = {}
+        for (_, materia_id), datos in resumen_asistencia(materia_ids=docente.materia_ids).items():
+            acumulado = asistencias.setdefault(materia_id, {'total': 0, 'presentes': 0, 'cronicos': 0})
+            acumulado['total'] += datos['total']
+            acumulado['presentes'] += datos['presentes']
+            acumulado['cronicos'] += datos['cronico']
+        return asistencias
+
+    calificaciones, asistencias = await en_paralelo(calificaciones_por_materia, asistencias_por_materia)
 
     stats = []
     for materia in materias:
-        calificaciones = Calificacion.objects.filter(materia=materia)
-        total_cal = calificaciones.count()
-        promedio = calificaciones.aggregate(Avg('nota'))['nota__avg'] or 0
-        aprobados = calificaciones.filter(nota__gte=3.0).count()
-        reprobados = calificaciones.filter(nota__lt=3.0).count()
-
-        asistencias = Asistencia.objects.filter(materia=materia)
-        total_asist = asistencias.count()
-        presentes = asistencias.filter(estado='presente').count()
-        porcentaje_asist = (presentes / total_asist * 100) if total_asist > 0 else 0
+        cal = calificaciones.get(materia.id, {})
+        asist = asistencias.get(materia.id, {'total': 0, 'presentes': 0, 'cronicos': 0})
+        porcentaje_asist = (asist['presentes'] / asist['total'] * 100) if asist['total'] > 0 else 0
 
         stats.append({
             'materia': materia,
-            'total_calificaciones': total_cal,
-            'promedio': round(promedio, 2),
-            'aprobados': aprobados,
-            'reprobados': reprobados,
+            'total_calificaciones': cal.get('total', 0),
+            'promedio': round(cal.get('promedio') or 0, 2),
+            'aprobados': cal.get('aprobados', 0),
+            'reprobados': cal.get('reprobados', 0),
             'porcentaje_asistencia': round(porcentaje_asist, 1),
+            'ausentismo_cronico': asist['cronicos'],
         })
 
     return render(request, 'teacher/estadisticas.html', {'stats': stats})
@@ -404,17 +469,22 @@ def estadisticas(request):
 @user_passes_test(is_teacher)
 def estudiantes_materia(request):
     """Ver y gestionar estudiantes inscritos en las materias del docente"""
-    materias = Materia.objects.filter(docente=request.user, activa=True)
+    materias = request.docente.materias
 
     materia_id = request.GET.get('materia')
     materia_seleccionada = None
     estudiantes_inscritos = []
 
     if materia_id:
-        materia_seleccionada = get_object_or_404(Materia, id=materia_id, docente=request.user)
-        estudiantes_inscritos = InscripcionMateria.objects.filter(
+        materia_seleccionada = request.docente.materia(materia_id, inactivas=True)
+        estudiantes_inscritos = list(InscripcionMateria.objects.filter(
             materia=materia_seleccionada
-        ).select_related('estudiante').order_by('estudiante__username')
+        ).select_related('estudiante').order_by('estudiante__username'))
+
+        # Rachas de ausencias, primera ausencia y ausencias por semana de cada estudiante
+        resumen = resumen_asistencia(materia_ids=[materia_seleccionada.id])
+        for inscripcion in estudiantes_inscritos:
+            inscripcion.asistencia = resumen.get((inscripcion.estudiante_id, materia_seleccionada.id))
 
     context = {
         'materias': materias,
@@ -428,24 +498,23 @@ def estudiantes_materia(request):
 @user_passes_test(is_teacher)
 def inscribir_estudiante(request):
     """Inscribir un estudiante existente a una materia"""
-    materias = Materia.objects.filter(docente=request.user, activa=True)
+    materias = request.docente.materias
 
     if request.method == 'POST':
         materia_id = request.POST.get('materia')
         estudiante_id = request.POST.get('estudiante')
 
-        materia = get_object_or_404(Materia, id=materia_id, docente=request.user)
+        materia = request.docente.materia(materia_id, inactivas=True)
         estudiante = get_object_or_404(CustomUser, id=estudiante_id, role='estudiante')
 
-        # Verificar si ya está inscrito
-        if InscripcionMateria.objects.filter(estudiante=estudiante, materia=materia).exists():
-            messages.error(request, f'{estudiante.get_full_name() or estudiante.username} ya está inscrito en {materia.nombre}')
+        nombre = estudiante.get_full_name() or estudiante.username
+        resultado = inscripciones.inscribir_materia(estudiante, materia.id, lista_espera=False, solo_activas=False)
+        if resultado == inscripciones.INSCRITO:
+            messages.success(request, f'{nombre} inscrito exitosamente en {materia.nombre}')
+        elif resultado == inscripciones.YA_INSCRITO:
+            messages.error(request, f'{nombre} ya está inscrito en {materia.nombre}')
         else:
-            InscripcionMateria.objects.create(
-                estudiante=estudiante,
-                materia=materia
-            )
-            messages.success(request, f'{estudiante.get_full_name() or estudiante.username} inscrito exitosamente en {materia.nombre}')
+            messages.error(request, f'{materia.nombre} no tiene cupos disponibles')
 
         return redirect(f'/teacher/estudiantes/?materia={materia_id}')
 
@@ -467,9 +536,9 @@ def inscribir_estudiante(request):
 def desinscribir_estudiante(request, inscripcion_id):
     """Desinscribir un estudiante de una materia"""
     inscripcion = get_object_or_404(
-        InscripcionMateria,
+        InscripcionMateria.objects.select_related('estudiante', 'materia__curso'),
         id=inscripcion_id,
-        materia__docente=request.user
+        materia_id__in=request.docente.materia_ids_todas
     )
 
     if request.method == 'POST':
@@ -477,7 +546,7 @@ def desinscribir_estudiante(request, inscripcion_id):
         estudiante_nombre = inscripcion.estudiante.get_full_name() or inscripcion.estudiante.username
         materia_nombre = inscripcion.materia.nombre
 
-        inscripcion.delete()
+        inscripciones.desinscribir_materia(inscripcion)
         messages.success(request, f'{estudiante_nombre} desinscrito de {materia_nombre}')
         return redirect(f'/teacher/estudiantes/?materia={materia_id}')
 
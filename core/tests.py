@@ -1,3 +1,1327 @@
-from django.test import TestCase
+import ast
+import gc
+import json
+import re
+from contextlib import contextmanager
+from datetime import date, timedelta
+from io import StringIO
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from unittest import skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.db import connection, connections, router
+from django.db.backends.signals import connection_created
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteWrapper
+from django.db.models import NOT_PROVIDED
+from django.http import HttpResponse
+from django.template import engines
+from django.template.loader import get_template
+from django.test import Client, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from core import urls as core_urls
+from core import cache as versiones
+from core import analytics, inscripciones, replica
+from core.models import (
+    Curso, Materia, Matricula, InscripcionMateria, ListaEspera, Calificacion, Asistencia, Notificacion
+)
+from core.catalog import obtener_catalogo
+from core.management.commands.benchmark_arranque import medir_arranque
+from core.management.commands.seed_escuela import Command as SeedEscuela
+from core.middleware import ContextoDocente
+from core.plantillas import PlantillaCronometrada
+from core.querylog import normalizar_sql
+
+
+# Máximo de consultas por vista (incluye la sesión y el usuario de la petición).
+# Toda URL de core/urls.py debe declarar su presupuesto.
+PRESUPUESTO_CONSULTAS = {
+    'core_home': 2,
+    'admin_dashboard': 11,
+    'admin_usuarios_lista': 3,
+    'admin_usuario_crear': 2,
+    'admin_usuario_editar': 3,
+    'admin_usuario_eliminar': 3,
+    'admin_cursos_lista': 5,
+    'admin_curso_crear': 2,
+    'admin_curso_editar': 3,
+    'admin_curso_eliminar': 3,
+    'admin_materias_lista': 5,
+    'admin_materia_crear': 5,
+    'admin_materia_editar': 6,
+    'admin_materia_eliminar': 4,
+    'teacher_dashboard': 8,
+    'teacher_calificaciones_lista': 4,
+    'teacher_calificacion_crear': 4,
+    'teacher_calificacion_editar': 6,
+    'teacher_calificacion_eliminar': 6,
+    'teacher_asistencias_lista': 4,
+    'teacher_asistencia_crear': 4,
+    'teacher_asistencia_editar': 6,
+    'teacher_asistencia_eliminar': 6,
+    'teacher_estadisticas': 5,
+    'teacher_generar_reporte': 4,
+    'teacher_estudiantes_materia': 5,
+    'teacher_inscribir_estudiante': 4,
+    'teacher_desinscribir_estudiante': 4,
+    'student_dashboard': 9,
+    'student_calificaciones': 3,
+    'student_cursos': 4,
+    'student_asistencias': 4,
+    'student_notificaciones': 3,
+    'student_exportar': 3,
+    'student_marcar_leida': 4,
+    'student_listar_materias': 8,
+    'estudiante_inscribir_materia': 2,
+    'student_listar_cursos': 7,
+    'student_matricular_curso': 2,
+}
+
+# Veces que puede repetirse la misma forma de consulta en una petición antes de considerarla N+1
+MAX_REPETICIONES = 2
+
+
+def sembrar_datos():
+    """Datos de prueba con suficientes filas para que un N+1 se note en el conteo de consultas."""
+    admin = CustomUser.objects.create_superuser('admin', 'admin@estudify.com', 'clave', role='admin')
+    docentes = [
+        CustomUser.objects.create_user(f'docente{i}', password='clave', role='docente', first_name=f'Docente {i}')
+        for i in range(3)
+    ]
+    estudiantes = [
+        CustomUser.objects.create_user(f'estudiante{i}', password='clave', role='estudiante', first_name=f'Est {i}')
+        for i in range(12)
+    ]
+    cursos = [Curso.objects.create(nombre=f'{10 + i}°', año_escolar='2025-2026') for i in range(3)]
+    materias = [
+        Materia.objects.create(
+            nombre=f'Materia {i}', codigo=f'MAT{i}', curso=cursos[i % 3], docente=docentes[i % 3]
+        )
+        for i in range(9)
+    ]
+    inicio = date(2025, 2, 3)
+    estados = ['presente', 'presente', 'ausente', 'tardanza', 'presente', 'excusado', 'ausente']
+    for n, estudiante in enumerate(estudiantes):
+        Matricula.objects.create(estudiante=estudiante, curso=cursos[n % 3])
+        for materia in materias:
+            InscripcionMateria.objects.create(estudiante=estudiante, materia=materia)
+            for periodo in ('1', '2'):
+                Calificacion.objects.create(
+                    estudiante=estudiante, materia=materia, periodo=periodo, nota=2 + (n % 4), notificado=True
+                )
+            Asistencia.objects.bulk_create([
+                Asistencia(
+                    estudiante=estudiante, materia=materia, fecha=inicio + timedelta(days=dia),
+                    estado=estados[(n + dia) % len(estados)], registrado_por=materia.docente
+                )
+                for dia in range(8)
+            ])
+        for i in range(6):
+            Notificacion.objects.create(estudiante=estudiante, tipo='general', titulo=f'Aviso {i}', mensaje='Mensaje')
+    return {
+        'admin': admin,
+        'docente': docentes[0],
+        'estudiante': estudiantes[0],
+        'curso': cursos[0],
+        'materia': materias[0],
+    }
+
+
+# Sin collectstatic no hay manifiesto: las pruebas que renderizan páginas usan el storage simple
+SIN_MANIFIESTO = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+@override_settings(STORAGES=SIN_MANIFIESTO)
+class PresupuestoConsultasTest(TestCase):
+    """Renderiza cada URL de core/urls.py con el rol adecuado y controla sus consultas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = sembrar_datos()
+        docente, estudiante, materia = cls.datos['docente'], cls.datos['estudiante'], cls.datos['materia']
+        cls.kwargs = {
+            'user_id': estudiante.id,
+            'curso_id': cls.datos['curso'].id,
+            'materia_id': materia.id,
+            'calificacion_id': Calificacion.objects.filter(materia=materia).first().id,
+            'asistencia_id': Asistencia.objects.filter(materia=materia).first().id,
+            'inscripcion_id': InscripcionMateria.objects.filter(materia=materia).first().id,
+            'notificacion_id': Notificacion.objects.filter(estudiante=estudiante).first().id,
+        }
+        cls.query_strings = {
+            'teacher_generar_reporte': f'?materia={materia.id}',
+            'teacher_estudiantes_materia': f'?materia={materia.id}',
+        }
+
+    def setUp(self):
+        # Se mide el costo sin caché (primera visita)
+        cache.clear()
+
+    def _usuario(self, nombre):
+        if nombre.startswith('admin_'):
+            return self.datos['admin']
+        if nombre.startswith('teacher_'):
+            return self.datos['docente']
+        if nombre.startswith(('student_', 'estudiante_')):
+            return self.datos['estudiante']
+        return None
+
+    def _url(self, patron):
+        kwargs = {clave: self.kwargs[clave] for clave in patron.pattern.converters}
+        return reverse(patron.name, kwargs=kwargs) + self.query_strings.get(patron.name, '')
+
+    def test_todas_las_urls_tienen_presupuesto(self):
+        nombres = {patron.name for patron in core_urls.urlpatterns}
+        self.assertEqual(nombres - set(PRESUPUESTO_CONSULTAS), set())
+
+    def test_presupuesto_y_repeticiones_por_vista(self):
+        for patron in core_urls.urlpatterns:
+            with self.subTest(url=patron.name):
+                cache.clear()
+                usuario = self._usuario(patron.name)
+                if usuario is not None:
+                    self.client.force_login(usuario)
+                else:
+                    self.client.logout()
+
+                with CaptureQueriesContext(connection) as consultas:
+                    response = self.client.get(self._url(patron))
+                    if response.streaming:
+                        # Los bloques siguientes de una lista en streaming se leen al enviarse
+                        b''.join(response.streaming_content)
+                self.assertLess(response.status_code, 400)
+
+                sql = [consulta['sql'] for consulta in consultas.captured_queries]
+                self.assertLessEqual(
+                    len(sql), PRESUPUESTO_CONSULTAS[patron.name],
+                    f'{patron.name} ejecutó {len(sql)} consultas:\n' + '\n'.join(sql)
+                )
+                forma, repeticiones = Counter(normalizar_sql(s) for s in sql).most_common(1)[0] if sql else ('', 0)
+                self.assertLessEqual(
+                    repeticiones, MAX_REPETICIONES,
+                    f'{patron.name} repite {repeticiones} veces la consulta: {forma}'
+                )
+
+    def test_estilos_en_la_hoja_estatica(self):
+        self.client.force_login(self.datos['estudiante'])
+        response = self.client.get(reverse('student_dashboard'))
+        self.assertNotContains(response, '<style')
+        self.assertContains(response, f'href="{settings.STATIC_URL}css/estudify.css"')
+        self.assertIsNotNone(finders.find('css/estudify.css'))
+
+    def test_generador_coincide_con_las_plantillas(self):
+        # generate_templates.py sobrescribe estos archivos: si quedara atrás, revertiría los cambios
+        ruta = settings.BASE_DIR / 'generate_templates.py'
+        arbol = ast.parse(ruta.read_text(encoding='utf-8'))
+        asignacion = next(
+            nodo for nodo in arbol.body
+            if isinstance(nodo, ast.Assign) and getattr(nodo.targets[0], 'id', None) == 'templates'
+        )
+        for archivo, contenido in ast.literal_eval(asignacion.value).items():
+            with self.subTest(archivo=archivo):
+                self.assertEqual((settings.BASE_DIR / archivo).read_text(encoding='utf-8'), contenido)
+
+
+@override_settings(STORAGES=SIN_MANIFIESTO)
+class AdminDjangoConsultasTest(TestCase):
+    """Las listas del admin de Django no deben crecer en consultas con el número de filas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = sembrar_datos()
+
+    def setUp(self):
+        # Los ids se reutilizan entre pruebas: la foto en caché del usuario sería de otro
+        cache.clear()
+
+    def test_changelists_sin_n_mas_1(self):
+        self.client.force_login(self.datos['admin'])
+        for modelo in (Curso, Materia, Matricula, Calificacion, Asistencia, Notificacion):
+            with self.subTest(modelo=modelo.__name__):
+                url = reverse(f'admin:core_{modelo._meta.model_name}_changelist')
+                with CaptureQueriesContext(connection) as consultas:
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                forma, repeticiones = Counter(
+                    normalizar_sql(consulta['sql']) for consulta in consultas.captured_queries
+                ).most_common(1)[0]
+                self.assertLessEqual(repeticiones, MAX_REPETICIONES, f'Consulta repetida: {forma}')
+
+
+@override_settings(STORAGES=SIN_MANIFIESTO)
+class MateriaInactivaDocenteTest(TestCase):
+    """Las listas muestran las materias activas; editar, eliminar, reportar y desinscribir aceptan las inactivas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = sembrar_datos()
+        cls.materia = cls.datos['materia']
+        cls.materia.activa = False
+        cls.materia.save()
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.datos['docente'])
+
+    def test_alcance_de_las_materias_inactivas(self):
+        calificacion = Calificacion.objects.filter(materia=self.materia).first()
+        asistencia = Asistencia.objects.filter(materia=self.materia).first()
+        inscripcion = InscripcionMateria.objects.filter(materia=self.materia).first()
+
+        lista = self.client.get(reverse('teacher_calificaciones_lista'))
+        self.assertNotIn(self.materia, lista.context['materias'])
+        self.assertFalse(Calificacion.objects.filter(
+            pk__in=[c.pk for c in lista.context['calificaciones']], materia=self.materia
+        ).exists())
+
+        for url in (
+            reverse('teacher_calificacion_editar', args=[calificacion.id]),
+            reverse('teacher_asistencia_editar', args=[asistencia.id]),
+            reverse('teacher_desinscribir_estudiante', args=[inscripcion.id]),
+            reverse('teacher_generar_reporte') + f'?materia={self.materia.id}',
+            reverse('teacher_estudiantes_materia') + f'?materia={self.materia.id}',
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 200)
+        self.client.post(reverse('teacher_calificacion_eliminar', args=[calificacion.id]))
+        self.assertFalse(Calificacion.objects.filter(pk=calificacion.pk).exists())
+
+        # Las materias de otro docente siguen fuera de alcance
+        ajena = Calificacion.objects.exclude(materia__docente=self.datos['docente']).first()
+        self.assertEqual(self.client.get(reverse('teacher_calificacion_editar', args=[ajena.id])).status_code, 404)
+
+    def test_docente_inscribe_en_materia_inactiva(self):
+        nuevo = CustomUser.objects.create_user('est_nuevo', password='clave', role='estudiante')
+        respuesta = self.client.post(
+            reverse('teacher_inscribir_estudiante'), {'materia': self.materia.id, 'estudiante': nuevo.id}
+        )
+        self.assertEqual(respuesta.status_code, 302)
+        self.assertTrue(InscripcionMateria.objects.filter(estudiante=nuevo, materia=self.materia).exists())
+
+        # El estudiante, en cambio, no puede inscribirse por su cuenta en una materia inactiva
+        otro = CustomUser.objects.create_user('est_otro', password='clave', role='estudiante')
+        self.client.force_login(otro)
+        respuesta = self.client.post(reverse('estudiante_inscribir_materia', args=[self.materia.id]))
+        self.assertEqual(respuesta.status_code, 404)
+        self.assertFalse(InscripcionMateria.objects.filter(estudiante=otro).exists())
+
+
+class InvalidacionCatalogoTest(TestCase):
+    """Solo los cambios que muestra el catálogo (nombre, rol y estado de los docentes) lo invalidan."""
+
+    def _cambia_catalogo(self, accion):
+        cache.clear()
+        antes = versiones.obtener_versiones((versiones.CATALOGO, ''))
+        with self.captureOnCommitCallbacks(execute=True):
+            accion()
+        return versiones.obtener_versiones((versiones.CATALOGO, '')) != antes
+
+    def test_cambios_de_usuarios(self):
+        docente = CustomUser.objects.create_user('docente', password='clave', role='docente', first_name='Ana')
+        estudiante = CustomUser.objects.create_user('estudiante', password='clave', role='estudiante')
+
+        def editar(usuario, **campos):
+            def accion():
+                for campo, valor in campos.items():
+                    setattr(usuario, campo, valor)
+                usuario.save()
+            return accion
+
+        def cambiar_clave(usuario):
+            usuario.set_password('otra-clave')
+            usuario.save()
+
+        sin_efecto = {
+            'registro de estudiante': lambda: CustomUser.objects.create_user('nuevo', password='clave'),
+            'perfil de estudiante': editar(estudiante, first_name='Luis', email='luis@estudify.com'),
+            'contraseña de docente': lambda: cambiar_clave(docente),
+            'correo de docente': editar(docente, email='ana@estudify.com'),
+            'inicio de sesión': lambda: docente.save(update_fields=['last_login']),
+        }
+        for nombre, accion in sin_efecto.items():
+            with self.subTest(cambio=nombre):
+                self.assertFalse(self._cambia_catalogo(accion))
+
+        invalidan = {
+            'alta de docente': lambda: CustomUser.objects.create_user('otro', password='clave', role='docente'),
+            'nombre de docente': editar(docente, first_name='Ana María'),
+            'docente desactivado': editar(docente, is_active=False),
+            'estudiante pasa a docente': editar(estudiante, role='docente'),
+            'docente pasa a estudiante': editar(estudiante, role='estudiante'),
+            'docente eliminado': lambda: docente.delete(),
+        }
+        for nombre, accion in invalidan.items():
+            with self.subTest(cambio=nombre):
+                self.assertTrue(self._cambia_catalogo(accion))
+
+
+@override_settings(STORAGES=SIN_MANIFIESTO)
+class ServerTimingTest(TestCase):
+    """La cabecera Server-Timing se envía según SERVER_TIMING_HEADER e incluye el tiempo de plantillas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = sembrar_datos()
+
+    def _cabecera(self, usuario):
+        self.client.force_login(usuario)
+        return self.client.get(reverse('teacher_estudiantes_materia')).headers.get('Server-Timing')
+
+    def test_segun_la_configuracion(self):
+        docente, admin = self.datos['docente'], self.datos['admin']
+        admin.role = 'docente'
+        admin.save()
+        with override_settings(SERVER_TIMING_HEADER=False):
+            self.assertIsNone(self._cabecera(docente))
+        with override_settings(SERVER_TIMING_HEADER='staff'):
+            self.assertIsNone(self._cabecera(docente))
+            self.assertIsNotNone(self._cabecera(admin))
+        with override_settings(SERVER_TIMING_HEADER=True):
+            cabecera = self._cabecera(docente)
+        self.assertIn('desc="teacher_estudiantes_materia"', cabecera)
+        # Los motores de core/plantillas.py suman el render sin modificar las clases de Django
+        self.assertNotEqual(re.search(r'tpl;dur=([\d.]+)', cabecera).group(1), '0.0')
+        self.assertIsInstance(engines['django'].get_template('base.html'), PlantillaCronometrada)
+
+
+class MetricasTest(TestCase):
+    """/metrics exige METRICS_TOKEN fuera de desarrollo y no repite los COUNT(*) de las tablas."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_token_y_tamanos_en_cache(self):
+        url = reverse('metrics')
+        with override_settings(METRICS_TOKEN='', DEBUG=False):
+            self.assertEqual(self.client.get(url).status_code, 404)
+        with override_settings(METRICS_TOKEN='', DEBUG=True):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+        cache.clear()
+        with override_settings(METRICS_TOKEN='secreto'):
+            self.assertEqual(self.client.get(url).status_code, 403)
+            self.assertEqual(self.client.get(url, headers={'Authorization': 'Bearer otro'}).status_code, 403)
+            with CaptureQueriesContext(connection) as primera:
+                response = self.client.get(url, headers={'Authorization': 'Bearer secreto'})
+            self.assertContains(response, 'estudify_table_rows{tabla="core_asistencia"}')
+            with CaptureQueriesContext(connection) as segunda:
+                self.client.get(url, headers={'Authorization': 'Bearer secreto'})
+        # Solo la profundidad de notificaciones pendientes se consulta en cada lectura
+        self.assertEqual(len(primera.captured_queries), 8)
+        self.assertEqual(len(segunda.captured_queries), 1)
+
+
+class AnaliticaAsistenciaTest(TestCase):
+    """Rachas (gaps-and-islands), serie semanal y umbral de ausentismo crónico calculados en la base."""
+
+    @classmethod
+    def setUpTestData(cls):
+        curso = Curso.objects.create(nombre='10°', año_escolar='2025-2026')
+        cls.materia = Materia.objects.create(nombre='Física', codigo='FIS', curso=curso)
+        cls.otra = Materia.objects.create(nombre='Química', codigo='QUI', curso=curso)
+        cls.estudiante = CustomUser.objects.create_user('est', password='clave', role='estudiante')
+
+    def _marcar(self, estudiante, materia, estados):
+        Asistencia.objects.bulk_create([
+            Asistencia(estudiante=estudiante, materia=materia, fecha=date.fromisoformat(fecha), estado=estado)
+            for fecha, estado in estados
+        ])
+
+    def test_rachas_y_semanas(self):
+        # Sin clase el martes ni el jueves: las ausencias del lunes y del miércoles son consecutivas
+        self._marcar(self.estudiante, self.materia, [
+            ('2025-03-03', 'ausente'), ('2025-03-05', 'ausente'), ('2025-03-07', 'presente'),
+            ('2025-03-10', 'ausente'), ('2025-03-11', 'ausente'), ('2025-03-12', 'ausente'),
+            ('2025-03-13', 'tardanza'), ('2025-03-17', 'ausente'),
+        ])
+        # Las mismas fechas en otra materia no se mezclan con las rachas de la primera
+        self._marcar(self.estudiante, self.otra, [
+            ('2025-03-03', 'presente'), ('2025-03-05', 'presente'), ('2025-03-07', 'presente'),
+            ('2025-03-10', 'presente'), ('2025-03-11', 'presente'), ('2025-03-12', 'presente'),
+            ('2025-03-13', 'presente'), ('2025-03-17', 'ausente'),
+        ])
+        resumen = analytics.resumen_asistencia(estudiante_id=self.estudiante.id)
+
+        fisica = resumen[(self.estudiante.id, self.materia.id)]
+        self.assertEqual((fisica['racha_maxima'], fisica['racha_actual']), (3, 1))
+        self.assertEqual(fisica['primera_ausencia'], date(2025, 3, 3))
+        self.assertEqual(
+            [(s['semana'], s['total'], s['ausentes'], s['porcentaje_ausencia']) for s in fisica['semanas']],
+            [(date(2025, 3, 3), 3, 2, 66.7), (date(2025, 3, 10), 4, 3, 75.0), (date(2025, 3, 17), 1, 1, 100.0)],
+        )
+        quimica = resumen[(self.estudiante.id, self.otra.id)]
+        self.assertEqual((quimica['racha_maxima'], quimica['racha_actual']), (1, 1))
+        self.assertEqual(quimica['primera_ausencia'], date(2025, 3, 17))
+
+    def test_semana_que_cruza_meses(self):
+        self._marcar(self.estudiante, self.materia, [('2025-03-31', 'ausente'), ('2025-04-01', 'presente')])
+        resumen, meses = analytics.resumen_asistencia_por_mes(estudiante_id=self.estudiante.id)
+        semanas = resumen[(self.estudiante.id, self.materia.id)]['semanas']
+        self.assertEqual([(s['semana'], s['total']) for s in semanas], [(date(2025, 3, 31), 2)])
+        self.assertEqual([(m['mes'], m['total']) for m in meses], [(date(2025, 3, 1), 1), (date(2025, 4, 1), 1)])
+
+    def test_umbral_de_ausentismo_cronico(self):
+        inicio = date(2025, 3, 3)
+        for nombre, registros in (('en_umbral', 10), ('bajo_umbral', 11)):
+            estudiante = CustomUser.objects.create_user(nombre, password='clave', role='estudiante')
+            self._marcar(estudiante, self.materia, [
+                ((inicio + timedelta(days=dia)).isoformat(), 'ausente' if dia == 0 else 'presente')
+                for dia in range(registros)
+            ])
+        resumen = analytics.resumen_asistencia(materia_ids=[self.materia.id])
+        por_usuario = {CustomUser.objects.get(pk=est).username: datos for (est, _), datos in resumen.items()}
+        self.assertEqual(por_usuario['en_umbral']['porcentaje_ausencia'], analytics.UMBRAL_AUSENTISMO_CRONICO)
+        self.assertTrue(por_usuario['en_umbral']['cronico'])
+        self.assertEqual(por_usuario['bajo_umbral']['porcentaje_ausencia'], 9.1)
+        self.assertFalse(por_usuario['bajo_umbral']['cronico'])
+        self.assertEqual(analytics.resumen_asistencia(materia_ids=[]), {})
+
+
+class SeedEscuelaTest(TestCase):
+    """seed_escuela genera los volúmenes pedidos y el mismo colegio para la misma semilla."""
+
+    OPCIONES = dict(estudiantes=12, docentes=3, cursos=2, materias=4, dias=5, periodos=2, notificaciones=2, lote=7)
+
+    def _notas(self, prefijo):
+        return list(
+            Calificacion.objects.filter(estudiante__username__startswith=f'{prefijo}_')
+            .order_by('estudiante__username', 'materia__codigo', 'periodo')
+            .values_list('estudiante__first_name', 'materia__nombre', 'periodo', 'nota')
+        )
+
+    def _asistencias(self, prefijo):
+        return list(
+            Asistencia.objects.filter(estudiante__username__startswith=f'{prefijo}_')
+            .order_by('estudiante__username', 'materia__codigo', 'fecha')
+            .values_list('fecha', 'estado')
+        )
+
+    def test_volumenes_y_determinismo(self):
+        call_command('seed_escuela', prefijo='a', semilla=7, stdout=StringIO(), **self.OPCIONES)
+        call_command('seed_escuela', prefijo='b', semilla=7, stdout=StringIO(), **self.OPCIONES)
+
+        self.assertEqual(CustomUser.objects.filter(username__startswith='a_', role='estudiante').count(), 12)
+        self.assertEqual(Matricula.objects.filter(estudiante__username__startswith='a_').count(), 12)
+        # Cada estudiante cursa las 2 materias de su curso, con 2 periodos y 5 clases cada una
+        self.assertEqual(InscripcionMateria.objects.filter(estudiante__username__startswith='a_').count(), 24)
+        self.assertEqual(len(self._notas('a')), 48)
+        self.assertEqual(len(self._asistencias('a')), 120)
+
+        self.assertEqual(self._notas('a'), self._notas('b'))
+        self.assertEqual(self._asistencias('a'), self._asistencias('b'))
+
+    def test_invalida_catalogo(self):
+        # bulk_create no dispara señales: el comando debe subir la versión del catálogo por su cuenta
+        antes = versiones.obtener_versiones((versiones.CATALOGO, ''))
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('seed_escuela', prefijo='c', semilla=1, stdout=StringIO(), **self.OPCIONES)
+        self.assertNotEqual(versiones.obtener_versiones((versiones.CATALOGO, '')), antes)
+
+    def test_columnas_copy_cubren_las_obligatorias(self):
+        # COPY no aplica los default de Django ni auto_now: toda columna NOT NULL sin default en la
+        # base de datos debe ir en la lista de campos o la carga falla en PostgreSQL
+        listas = {}
+
+        class Registro(SeedEscuela):
+            def _insertar(self, modelo, campos, filas):
+                listas[modelo] = campos
+                return super()._insertar(modelo, campos, filas)
+
+        call_command(Registro(), prefijo='d', semilla=1, stdout=StringIO(), **self.OPCIONES)
+        self.assertEqual(len(listas), 8)
+        for modelo, campos in listas.items():
+            obligatorias = {
+                campo.attname for campo in modelo._meta.concrete_fields
+                if not campo.primary_key and not campo.null and campo.db_default is NOT_PROVIDED
+            }
+            self.assertEqual(obligatorias - set(campos), set(), modelo.__name__)
+
+
+class CupoInscripcionTest(TestCase):
+    """Cupos, envíos repetidos y lista de espera."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.curso = Curso.objects.create(nombre='10°', año_escolar='2025-2026', cupo=1)
+        cls.materia = Materia.objects.create(nombre='Física', codigo='FIS', curso=cls.curso, cupo=2)
+        cls.estudiantes = [
+            CustomUser.objects.create_user(f'est{i}', password='clave', role='estudiante') for i in range(3)
+        ]
+
+    def _contador(self):
+        return Materia.objects.get(pk=self.materia.pk).inscritos
+
+    def test_cupo_lleno_pasa_a_lista_de_espera(self):
+        primero, segundo, tercero = self.estudiantes
+        self.assertEqual(inscripciones.inscribir_materia(primero, self.materia.id), inscripciones.INSCRITO)
+        self.assertEqual(inscripciones.inscribir_materia(segundo, self.materia.id), inscripciones.INSCRITO)
+        self.assertEqual(inscripciones.inscribir_materia(tercero, self.materia.id), inscripciones.EN_ESPERA)
+        self.assertEqual(self._contador(), 2)
+
+        # Reenvíos: no cambian el contador ni duplican filas
+        self.assertEqual(inscripciones.inscribir_materia(primero, self.materia.id), inscripciones.YA_INSCRITO)
+        self.assertEqual(inscripciones.inscribir_materia(tercero, self.materia.id), inscripciones.YA_EN_ESPERA)
+        self.assertEqual(self._contador(), 2)
+        self.assertEqual(ListaEspera.objects.count(), 1)
+
+    def test_desinscribir_promueve_lista_de_espera(self):
+        primero, segundo, tercero = self.estudiantes
+        for estudiante in self.estudiantes:
+            inscripciones.inscribir_materia(estudiante, self.materia.id)
+
+        inscripcion = InscripcionMateria.objects.get(estudiante=primero, materia=self.materia)
+        self.assertTrue(inscripciones.desinscribir_materia(inscripcion))
+        self.assertFalse(inscripciones.desinscribir_materia(inscripcion))
+
+        self.assertTrue(InscripcionMateria.objects.filter(estudiante=tercero, materia=self.materia).exists())
+        self.assertFalse(ListaEspera.objects.exists())
+        self.assertEqual(self._contador(), 2)
+        self.assertTrue(Notificacion.objects.filter(estudiante=tercero, titulo__startswith='Cupo asignado').exists())
+
+    def test_guardar_materia_no_pisa_el_contador(self):
+        materia = Materia.objects.get(pk=self.materia.pk)
+        inscripciones.inscribir_materia(self.estudiantes[0], self.materia.id)
+        materia.nombre = 'Física I'
+        materia.save()
+        self.assertEqual(self._contador(), 1)
+
+    def test_matricula_con_cupo(self):
+        primero, segundo, _ = self.estudiantes
+        self.assertEqual(inscripciones.matricular_curso(primero, self.curso.id), inscripciones.MATRICULADO)
+        self.assertEqual(inscripciones.matricular_curso(primero, self.curso.id), inscripciones.YA_MATRICULADO)
+        self.assertEqual(inscripciones.matricular_curso(segundo, self.curso.id), inscripciones.SIN_CUPO)
+        self.assertEqual(Curso.objects.get(pk=self.curso.pk).matriculados, 1)
+
+
+@override_settings(STORAGES=SIN_MANIFIESTO)
+class FragmentosTest(TestCase):
+    """Los fragmentos {% cache %} se reutilizan y cambian de clave cuando cambian sus datos."""
+
+    def setUp(self):
+        cache.clear()
+        self.datos = sembrar_datos()
+        self.client.force_login(self.datos['admin'])
+
+    def test_cursos_populares_cambian_con_una_matricula(self):
+        nuevo = CustomUser.objects.create_user('nuevo', password='clave', role='estudiante')
+        with CaptureQueriesContext(connection) as primera:
+            self.client.get(reverse('admin_dashboard'))
+        with CaptureQueriesContext(connection) as segunda:
+            response = self.client.get(reverse('admin_dashboard'))
+        # En caché el fragmento, la consulta de cursos_populares ni siquiera se ejecuta
+        self.assertEqual(len(segunda), len(primera) - 1)
+        self.assertContains(response, '<td>4</td>', count=3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Matricula.objects.create(estudiante=nuevo, curso=self.datos['curso'])
+        self.assertContains(self.client.get(reverse('admin_dashboard')), '<td>5</td>')
+
+    def test_lista_de_materias_refleja_la_edicion(self):
+        self.client.get(reverse('admin_materias_lista'))
+        materia = self.datos['materia']
+        with self.captureOnCommitCallbacks(execute=True):
+            materia.nombre = 'Álgebra'
+            materia.save()
+        self.assertContains(self.client.get(reverse('admin_materias_lista')), 'Álgebra')
+
+    def test_menu_por_rol(self):
+        self.assertContains(self.client.get(reverse('admin_dashboard')), reverse('admin_usuarios_lista'))
+        self.client.force_login(self.datos['docente'])
+        response = self.client.get(reverse('teacher_calificaciones_lista'))
+        self.assertContains(response, reverse('teacher_estadisticas'))
+        self.assertNotContains(response, reverse('admin_usuarios_lista'))
+
+
+@override_settings(STORAGES=SIN_MANIFIESTO)
+class PlantillasJinja2Test(TestCase):
+    """Las versiones Jinja2 de las tablas grandes producen el mismo HTML que las de Django."""
+
+    CON_JINJA2 = [settings.TEMPLATES_JINJA2, *settings.TEMPLATES]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = sembrar_datos()
+
+    def _html(self, usuario, url):
+        self.client.force_login(usuario)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        html = b''.join(response.streaming_content) if response.streaming else response.content
+        return ' '.join(html.decode().split()).replace('> <', '><')
+
+    def test_mismo_html_que_django(self):
+        estudiante = self.datos['estudiante']
+        paginas = [
+            (self.datos['docente'], reverse('teacher_calificaciones_lista')),
+            (self.datos['docente'], reverse('teacher_asistencias_lista')),
+            (self.datos['admin'], reverse('admin_usuarios_lista')),
+            (estudiante, reverse('student_calificaciones')),
+            (estudiante, reverse('student_asistencias') + '?por_mes=1'),
+        ]
+        for usuario, url in paginas:
+            with self.subTest(url=url):
+                django = self._html(usuario, url)
+                with override_settings(TEMPLATES=self.CON_JINJA2):
+                    jinja2 = self._html(usuario, url)
+                self.assertEqual(jinja2, django)
+
+    def test_las_demas_plantillas_usan_django(self):
+        with override_settings(TEMPLATES=self.CON_JINJA2):
+            self.assertEqual(get_template('teacher/calificaciones_lista.html').backend.name, 'jinja2')
+            self.assertEqual(get_template('teacher/dashboard.html').backend.name, 'django')
+
+
+@override_settings(STORAGES=SIN_MANIFIESTO, STREAMING_CHUNK_SIZE=10)
+class ListasEnStreamingTest(TestCase):
+    """Las listas largas del docente se envían por bloques con el mismo HTML que la página completa."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = sembrar_datos()
+
+    def setUp(self):
+        self.client.force_login(self.datos['docente'])
+
+    def _bloques(self, url):
+        response = self.client.get(url)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/html; charset=utf-8')
+        return [bloque.decode() for bloque in response.streaming_content]
+
+    def test_mismo_html_que_sin_streaming(self):
+        for url in (reverse('teacher_calificaciones_lista'), reverse('teacher_asistencias_lista') + '?estado=presente'):
+            with self.subTest(url=url):
+                bloques = self._bloques(url)
+                with override_settings(STREAMING_LISTS=False):
+                    response = self.client.get(url)
+                self.assertFalse(response.streaming)
+                self.assertEqual(' '.join(''.join(bloques).split()), ' '.join(response.content.decode().split()))
+
+    def test_envia_la_pagina_antes_que_las_filas(self):
+        bloques = self._bloques(reverse('teacher_calificaciones_lista'))
+        # 3 materias x 12 estudiantes x 2 periodos = 72 filas: inicio, 8 bloques de filas y cierre
+        self.assertEqual(len(bloques), 10)
+        self.assertIn('<tbody id="filas-calificaciones">', bloques[0])
+        self.assertNotIn('<td>', bloques[0])
+        self.assertEqual(bloques[1].count('<tr>'), 10)
+        self.assertIn('</html>', bloques[-1])
+
+    @override_settings(SERVER_TIMING_HEADER=True, SLOW_QUERY_LOG_MS=0.001, SLOW_REQUEST_THRESHOLD_MS=0)
+    def test_mediciones_incluyen_las_filas(self):
+        with self.assertLogs('estudify.slow_queries', 'WARNING') as lentas, \
+                self.assertLogs('estudify.performance', 'WARNING') as peticiones, \
+                CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(reverse('teacher_calificaciones_lista'))
+            # La consulta de las filas corre en la vista, dentro de Server-Timing
+            en_la_vista = len(consultas.captured_queries)
+            self.assertIn(f'"{en_la_vista} consultas"', response['Server-Timing'])
+            self.assertEqual(peticiones.records, [])
+            b''.join(response.streaming_content)
+            response.close()
+
+        filas = [
+            registro for registro in (json.loads(r.getMessage()) for r in lentas.records)
+            if 'core_calificacion' in registro['sql']
+        ]
+        self.assertTrue(filas)
+        self.assertEqual({registro['vista'] for registro in filas}, {'teacher_calificaciones_lista'})
+        # El registro de la petición se escribe al terminar el cuerpo, con todas sus consultas
+        peticion, = [json.loads(registro.getMessage()) for registro in peticiones.records]
+        self.assertEqual(peticion['consultas'], len(consultas.captured_queries))
+
+    def test_lista_vacia(self):
+        bloques = self._bloques(reverse('teacher_asistencias_lista') + '?fecha=1999-01-01')
+        self.assertEqual(len(bloques), 3)
+        self.assertIn('No hay asistencias registradas', bloques[1])
+
+
+@override_settings(STORAGES=SIN_MANIFIESTO)
+class RespuestasParcialesTest(TestCase):
+    """Con la cabecera X-Parcial los filtros de las listas reciben solo las filas de la tabla."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = sembrar_datos()
+
+    def _html(self, usuario, url, **headers):
+        self.client.force_login(usuario)
+        response = self.client.get(url, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('X-Parcial', response['Vary'])
+        html = b''.join(response.streaming_content) if response.streaming else response.content
+        return ' '.join(html.decode().split())
+
+    def test_solo_las_filas_filtradas(self):
+        materia = self.datos['materia']
+        paginas = [
+            (self.datos['docente'], reverse('teacher_calificaciones_lista') + f'?materia={materia.id}&periodo=1', 12),
+            (self.datos['docente'], reverse('teacher_asistencias_lista') + '?estado=ausente', 81),
+            (self.datos['admin'], reverse('admin_usuarios_lista') + '?role=docente&search=docente', 3),
+        ]
+        for streaming in (True, False):
+            for usuario, url, filas in paginas:
+                with self.subTest(url=url, streaming=streaming), override_settings(STREAMING_LISTS=streaming):
+                    parcial = self._html(usuario, url, X_Parcial='filas')
+                    self.assertEqual(parcial.count('<tr>'), filas)
+                    self.assertFalse(parcial.startswith('<!DOCTYPE'))
+                    self.assertNotIn('navbar', parcial)
+                    self.assertIn(parcial, self._html(usuario, url))
+
+    def test_lista_vacia(self):
+        parcial = self._html(
+            self.datos['docente'], reverse('teacher_asistencias_lista') + '?fecha=1999-01-01', X_Parcial='filas'
+        )
+        self.assertEqual(parcial.count('<tr>'), 1)
+        self.assertIn('No hay asistencias registradas', parcial)
+
+    def test_filtros_invalidos(self):
+        self.client.force_login(self.datos['docente'])
+        urls = [
+            reverse('teacher_calificaciones_lista') + '?materia=abc',
+            reverse('teacher_asistencias_lista') + '?materia=1x',
+            reverse('teacher_asistencias_lista') + '?fecha=2025-13-45',
+            reverse('teacher_asistencias_lista') + '?fecha=ayer',
+        ]
+        for streaming in (True, False):
+            for url in urls:
+                with self.subTest(url=url, streaming=streaming), override_settings(STREAMING_LISTS=streaming):
+                    response = self.client.get(url, headers={'X-Parcial': 'filas'})
+                    self.assertEqual(response.status_code, 400)
+                    self.assertFalse(response.streaming)
+
+    def test_el_formulario_conserva_los_filtros(self):
+        html = self._html(self.datos['docente'], reverse('teacher_calificaciones_lista') + '?periodo=2&search=Est')
+        self.assertIn('data-filtros="filas-calificaciones"', html)
+        self.assertIn('<tbody id="filas-calificaciones">', html)
+        self.assertIn('<option value="2" selected>', html)
+        self.assertIn('value="Est"', html)
+        self.assertIn(f'src="{settings.STATIC_URL}js/filtros.js"', html)
+
+
+class ApiTest(TestCase):
+    """La API JSON aplica las reglas de cada rol, pagina por cursor y responde 304 con el ETag vigente."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = sembrar_datos()
+
+    def setUp(self):
+        cache.clear()
+
+    def _todas(self, url):
+        filas = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            filas += response.json()['resultados']
+            url = response.json()['siguiente']
+        return filas
+
+    def _patch(self, url, datos, **headers):
+        return self.client.patch(url, json.dumps(datos), content_type='application/json', headers=headers)
+
+    def test_cada_rol_ve_sus_filas(self):
+        docente, estudiante = self.datos['docente'], self.datos['estudiante']
+        casos = [
+            (self.datos['admin'], Calificacion.objects.count(), Notificacion.objects.count()),
+            (docente, Calificacion.objects.filter(materia__docente=docente).count(), 0),
+            (estudiante, Calificacion.objects.filter(estudiante=estudiante).count(),
+             Notificacion.objects.filter(estudiante=estudiante).count()),
+        ]
+        for usuario, calificaciones, notificaciones in casos:
+            with self.subTest(usuario=usuario.username):
+                self.client.force_login(usuario)
+                self.assertEqual(len(self._todas(reverse('api_calificaciones') + '?limit=1000')), calificaciones)
+                self.assertEqual(len(self._todas(reverse('api_notificaciones') + '?limit=1000')), notificaciones)
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('api_cursos')).status_code, 401)
+
+    def test_cursor_y_campos(self):
+        self.client.force_login(self.datos['docente'])
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(reverse('api_calificaciones') + '?limit=10&fields=nota')
+        self.assertEqual(set(response.json()['resultados'][0]), {'id', 'nota', 'fecha_modificacion'})
+        self.assertNotIn('observaciones', consultas.captured_queries[-1]['sql'])
+
+        filas = self._todas(reverse('api_calificaciones') + '?limit=10&fields=nota')
+        self.assertEqual(len(filas), 72)
+        self.assertEqual(len({fila['id'] for fila in filas}), 72)
+        self.assertEqual(self.client.get(reverse('api_calificaciones') + '?fields=clave').status_code, 400)
+        self.assertEqual(self.client.get(reverse('api_calificaciones') + '?cursor=x').status_code, 400)
+
+    def test_since_y_etag(self):
+        self.client.force_login(self.datos['docente'])
+        url = reverse('api_calificaciones') + '?since=' + timezone.now().isoformat().replace('+', '%2B')
+        vacia = self.client.get(url)
+        self.assertEqual(vacia.json()['resultados'], [])
+        self.assertEqual(self.client.get(url, headers={'If-None-Match': vacia['ETag']}).status_code, 304)
+
+        calificacion = Calificacion.objects.filter(materia=self.datos['materia']).first()
+        detalle = reverse('api_calificaciones_detalle', args=[calificacion.id])
+        etag = self.client.get(detalle)['ETag']
+        self.assertEqual(self._patch(detalle, {'nota': '4.5'}, If_Match=etag).status_code, 200)
+        self.assertEqual(self._patch(detalle, {'nota': '1.0'}, If_Match=etag).status_code, 412)
+
+        response = self.client.get(url, headers={'If-None-Match': vacia['ETag']})
+        self.assertEqual([fila['id'] for fila in response.json()['resultados']], [calificacion.id])
+        self.assertEqual(response.json()['resultados'][0]['nota'], '4.50')
+
+    def test_escrituras_del_docente(self):
+        docente = self.datos['docente']
+        self.client.force_login(docente)
+        nuevo = CustomUser.objects.create_user('nuevo', password='clave', role='estudiante')
+        datos = {'estudiante': nuevo.id, 'materia': self.datos['materia'].id, 'periodo': '1', 'nota': 4.2}
+        # Sin matrícula en el curso ni inscripción en la materia no se le puede calificar
+        response = self.client.post(reverse('api_calificaciones'), json.dumps(datos), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()['errores']), {'estudiante'})
+        Matricula.objects.create(estudiante=nuevo, curso=self.datos['materia'].curso)
+        response = self.client.post(reverse('api_calificaciones'), json.dumps(datos), content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(response.json()['notificado'])
+        self.assertTrue(Notificacion.objects.filter(estudiante=nuevo, tipo='calificacion').exists())
+
+        # Repetida, en una materia ajena o con un campo que no se edita
+        self.assertEqual(
+            self.client.post(reverse('api_calificaciones'), json.dumps(datos), content_type='application/json')
+            .status_code, 400
+        )
+        ajena = Materia.objects.exclude(docente=docente).first()
+        response = self.client.post(
+            reverse('api_calificaciones'), json.dumps({**datos, 'materia': ajena.id}), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('materia', response.json()['errores'])
+        detalle = reverse('api_calificaciones_detalle', args=[Calificacion.objects.get(estudiante=nuevo).id])
+        self.assertEqual(self._patch(detalle, {'periodo': '2'}).status_code, 400)
+        self.assertEqual(self.client.delete(detalle).status_code, 204)
+
+        self.client.force_login(self.datos['admin'])
+        self.assertEqual(
+            self.client.post(reverse('api_calificaciones'), json.dumps(datos), content_type='application/json')
+            .status_code, 403
+        )
+
+    def test_estudiante_notificaciones_e_inscripciones(self):
+        estudiante = self.datos['estudiante']
+        self.client.force_login(estudiante)
+        notificacion = Notificacion.objects.filter(estudiante=estudiante).first()
+        detalle = reverse('api_notificaciones_detalle', args=[notificacion.id])
+        self.assertTrue(self._patch(detalle, {'leida': True}).json()['leida'])
+        self.assertEqual(self._patch(detalle, {'titulo': 'Otro'}).status_code, 400)
+        ajena = Notificacion.objects.exclude(estudiante=estudiante).first()
+        self.assertEqual(self.client.get(reverse('api_notificaciones_detalle', args=[ajena.id])).status_code, 404)
+
+        materia = Materia.objects.create(nombre='Robótica', codigo='ROB1', curso=self.datos['curso'], cupo=1)
+        response = self.client.post(
+            reverse('api_inscripciones'), json.dumps({'materia': materia.id}), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['estudiante'], estudiante.id)
+        materia.refresh_from_db()
+        self.assertEqual(materia.inscritos, 1)
+        otro = CustomUser.objects.filter(role='estudiante').exclude(pk=estudiante.pk).first()
+        self.client.force_login(otro)
+        response = self.client.post(
+            reverse('api_inscripciones'), json.dumps({'materia': materia.id}), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(ListaEspera.objects.filter(estudiante=otro, materia=materia).exists())
+
+
+class ApiLoteTest(TestCase):
+    """La carga por lotes crea o actualiza por la clave única, valida por bloque y responde por registro."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = sembrar_datos()
+
+    def setUp(self):
+        cache.clear()
+
+    def _lote(self, nombre, registros):
+        return self.client.post(reverse(f'api_{nombre}_lote'), json.dumps(registros), content_type='application/json')
+
+    def test_calificaciones(self):
+        docente, estudiante, materia = self.datos['docente'], self.datos['estudiante'], self.datos['materia']
+        self.client.force_login(docente)
+        nuevo = CustomUser.objects.create_user('nuevo', password='clave', role='estudiante')
+        InscripcionMateria.objects.create(estudiante=nuevo, materia=materia)
+        sin_inscribir = CustomUser.objects.create_user('sin_inscribir', password='clave', role='estudiante')
+        ajena = Materia.objects.exclude(docente=docente).first()
+        existente = Calificacion.objects.get(estudiante=estudiante, materia=materia, periodo='1')
+        registros = [
+            {'estudiante': estudiante.id, 'materia': materia.id, 'periodo': '1', 'nota': '4.8'},
+            {'estudiante': nuevo.id, 'materia': materia.id, 'periodo': '1', 'nota': 3.1},
+            {'estudiante': nuevo.id, 'materia': materia.id, 'periodo': '1', 'nota': 3.9, 'observaciones': 'Corregida'},
+            {'estudiante': nuevo.id, 'materia': ajena.id, 'periodo': '1', 'nota': 4},
+            {'estudiante': nuevo.id, 'materia': materia.id, 'periodo': '9', 'nota': 'diez', 'color': 'rojo'},
+            {'estudiante': docente.id, 'materia': materia.id, 'periodo': '2', 'nota': 4},
+            {'estudiante': sin_inscribir.id, 'materia': materia.id, 'periodo': '2', 'nota': 4},
+        ]
+        antes = versiones.obtener_versiones((versiones.USUARIO, estudiante.id))
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self._lote('calificaciones', registros)
+        self.assertEqual(response.status_code, 200)
+        cuerpo = response.json()
+        self.assertEqual(
+            (cuerpo['creados'], cuerpo['actualizados'], cuerpo['omitidos'], cuerpo['errores']), (1, 1, 1, 4)
+        )
+        resultados = cuerpo['resultados']
+        self.assertEqual([r['estado'] for r in resultados],
+                         ['actualizado', 'omitido', 'creado', 'error', 'error', 'error', 'error'])
+        self.assertEqual(resultados[0]['id'], existente.id)
+        self.assertEqual(resultados[1]['reemplazado_por'], 2)
+        self.assertEqual(set(resultados[3]['errores']), {'materia'})
+        self.assertEqual(set(resultados[4]['errores']), {'periodo', 'nota', 'color'})
+        self.assertEqual(set(resultados[5]['errores']), {'estudiante'})
+        # Un estudiante que no cursa la materia se rechaza aunque la materia sea del docente
+        self.assertEqual(resultados[6]['errores'], {'estudiante': ['El estudiante no cursa esta materia.']})
+        self.assertFalse(Calificacion.objects.filter(estudiante=sin_inscribir).exists())
+
+        existente.refresh_from_db()
+        self.assertEqual(str(existente.nota), '4.80')
+        creada = Calificacion.objects.get(estudiante=nuevo, materia=materia, periodo='1')
+        self.assertEqual((str(creada.nota), creada.observaciones, creada.notificado), ('3.90', 'Corregida', True))
+        # Solo la calificación nueva se notifica, como en calificacion_crear
+        self.assertEqual(Notificacion.objects.filter(estudiante=nuevo, tipo='calificacion').count(), 1)
+        self.assertFalse(Notificacion.objects.filter(estudiante=estudiante, tipo='calificacion').exists())
+        # Sin señales, la vista cambia las versiones de caché del estudiante y del docente
+        self.assertNotEqual(versiones.obtener_versiones((versiones.USUARIO, estudiante.id)), antes)
+
+        # El admin también carga lotes; el estudiante no
+        self.client.force_login(self.datos['admin'])
+        self.assertEqual(self._lote('calificaciones', registros[3:4]).json()['creados'], 1)
+        self.client.force_login(estudiante)
+        self.assertEqual(self._lote('calificaciones', registros[:1]).status_code, 403)
+
+    def test_consultas_por_bloque(self):
+        docente = self.datos['docente']
+        self.client.force_login(docente)
+        filas = Asistencia.objects.filter(materia__docente=docente).values('estudiante_id', 'materia_id', 'fecha')
+        registros = [
+            {'estudiante': fila['estudiante_id'], 'materia': fila['materia_id'],
+             'fecha': (fila['fecha'] + timedelta(days=dias)).isoformat(), 'estado': 'ausente'}
+            for fila in filas for dias in (0, 30)
+        ]
+        self.assertEqual(len(registros), 576)
+        with override_settings(API_BATCH_CHUNK_SIZE=200):
+            with CaptureQueriesContext(connection) as consultas:
+                response = self._lote('asistencias', registros)
+        self.assertEqual((response.json()['creados'], response.json()['actualizados']), (288, 288))
+        # Por cada uno de los 3 bloques: materias, estudiantes, claves existentes y el upsert (que
+        # SQLite parte según su límite de parámetros), no una consulta por registro
+        self.assertLess(len(consultas.captured_queries), 30)
+        self.assertEqual(Asistencia.objects.filter(materia__docente=docente, estado='ausente').count(), 576)
+        self.assertEqual(
+            Asistencia.objects.filter(materia__docente=docente, registrado_por=docente).count(), 576
+        )
+
+    def test_ndjson_y_limite(self):
+        self.client.force_login(self.datos['docente'])
+        estudiante, materia = self.datos['estudiante'], self.datos['materia']
+        lineas = [
+            json.dumps({'estudiante': estudiante.id, 'materia': materia.id, 'fecha': '2025-06-02'}),
+            '',
+            '{"estudiante": ',
+            json.dumps({'estudiante': estudiante.id, 'materia': materia.id, 'fecha': '2025-13-40'}),
+        ]
+        response = self.client.post(
+            reverse('api_asistencias_lote'), '\n'.join(lineas), content_type='application/x-ndjson'
+        )
+        resultados = response.json()['resultados']
+        self.assertEqual([r['estado'] for r in resultados], ['creado', 'error', 'error'])
+        self.assertEqual(Asistencia.objects.get(pk=resultados[0]['id']).estado, 'presente')
+        self.assertIn('fecha', resultados[2]['errores'])
+
+        with override_settings(API_BATCH_MAX_RECORDS=2):
+            self.assertEqual(
+                self.client.post(reverse('api_asistencias_lote'), '\n'.join(lineas),
+                                 content_type='application/x-ndjson').status_code, 413
+            )
+            self.assertEqual(self._lote('asistencias', [{}, {}, {}]).status_code, 413)
+        self.assertEqual(self._lote('asistencias', {'estudiante': 1}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('api_asistencias_lote')).status_code, 405)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'La concurrencia real requiere PostgreSQL')
+class InscripcionConcurrenteTest(TransactionTestCase):
+    """Cientos de inscripciones simultáneas no superan el cupo."""
+
+    def test_inscripciones_simultaneas(self):
+        curso = Curso.objects.create(nombre='11°', año_escolar='2025-2026')
+        materia = Materia.objects.create(nombre='Química', codigo='QUI', curso=curso, cupo=25)
+        estudiantes = [
+            CustomUser.objects.create_user(f'est{i}', password='clave', role='estudiante') for i in range(200)
+        ]
+
+        def inscribir(estudiante):
+            try:
+                # Cada estudiante envía dos veces, como un doble clic
+                return [inscripciones.inscribir_materia(estudiante, materia.id) for _ in range(2)]
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=40) as pool:
+            list(pool.map(inscribir, estudiantes))
+
+        materia.refresh_from_db()
+        self.assertEqual(materia.inscritos, 25)
+        self.assertEqual(InscripcionMateria.objects.filter(materia=materia).count(), 25)
+        self.assertEqual(ListaEspera.objects.filter(materia=materia).count(), 175)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'La concurrencia real requiere PostgreSQL')
+class LoteConcurrenteTest(TransactionTestCase):
+    """Lotes simultáneos con las mismas filas nuevas las crean (y notifican) una sola vez."""
+
+    def test_lotes_simultaneos(self):
+        datos = sembrar_datos()
+        materia = datos['materia']
+        registros = [
+            {'estudiante': inscripcion.estudiante_id, 'materia': materia.id, 'periodo': 'final', 'nota': 4}
+            for inscripcion in InscripcionMateria.objects.filter(materia=materia)
+        ]
+        antes = Notificacion.objects.filter(tipo='calificacion').count()
+
+        def enviar(_):
+            try:
+                cliente = Client()
+                cliente.force_login(datos['docente'])
+                return cliente.post(
+                    reverse('api_calificaciones_lote'), json.dumps(registros), content_type='application/json'
+                ).json()['creados']
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            creados = list(pool.map(enviar, range(8)))
+
+        self.assertEqual(sum(creados), len(registros))
+        self.assertEqual(Notificacion.objects.filter(tipo='calificacion').count() - antes, len(registros))
+
+
+CON_REPLICA = {**settings.DATABASES, 'replica': {**settings.DATABASES['default']}}
+
+
+@override_settings(DATABASES=CON_REPLICA)
+class ReplicaTest(TestCase):
+    """Router de réplica: qué lecturas van a la réplica y cuándo se fija la primaria."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def _peticion(self, vista, **cookies):
+        request = self.factory.get('/')
+        request.COOKIES.update(cookies)
+        return replica.ReplicaMiddleware(vista)(request)
+
+    def test_solo_lecturas_marcadas_van_a_la_replica(self):
+        self.assertEqual(router.db_for_read(Calificacion), 'default')
+        with replica.en_replica():
+            self.assertEqual(router.db_for_read(Calificacion), 'replica')
+            self.assertEqual(router.db_for_write(Calificacion), 'default')
+        self.assertEqual(router.db_for_read(Calificacion), 'default')
+
+    def test_escritura_fija_la_primaria(self):
+        destinos = []
+
+        @replica.lectura_replica
+        def vista(request):
+            destinos.append(router.db_for_read(Calificacion))
+            Curso.objects.create(nombre='10°', año_escolar='2025-2026')
+            destinos.append(router.db_for_read(Calificacion))
+            return HttpResponse()
+
+        response = self._peticion(vista)
+        self.assertEqual(destinos, ['replica', 'default'])
+        cookie = response.cookies[replica.COOKIE_PRIMARIA]
+        self.assertEqual(cookie['max-age'], settings.REPLICA_PIN_SECONDS)
+        self.assertTrue(cookie['httponly'])
+
+    def test_navegador_fijado_lee_de_la_primaria(self):
+        destinos = []
+
+        @replica.lectura_replica
+        def vista(request):
+            destinos.append(router.db_for_read(Calificacion))
+            return HttpResponse()
+
+        response = self._peticion(vista, **{replica.COOKIE_PRIMARIA: '1'})
+        self.assertEqual(destinos, ['default'])
+        self.assertNotIn(replica.COOKIE_PRIMARIA, response.cookies)
+
+        self._peticion(vista)
+        self.assertEqual(destinos, ['default', 'replica'])
+
+    def test_no_migra_la_replica(self):
+        self.assertFalse(router.allow_migrate('replica', 'core'))
+        self.assertTrue(router.allow_migrate('default', 'core'))
+
+
+@override_settings(DATABASES=CON_REPLICA)
+class ReplicaAtrasadaTest(TestCase):
+    """Con una réplica atrasada de verdad, lo cacheado bajo un sello nuevo se reconstruye desde la primaria."""
+
+    def setUp(self):
+        cache.clear()
+        # Réplica propia (SQLite en memoria) con las tablas vacías: todavía no recibió nada de la primaria
+        atrasada = SQLiteWrapper(
+            {**connections.settings['default'], 'NAME': 'file:replica_atrasada?mode=memory&cache=shared'}, 'replica'
+        )
+        connections['replica'] = atrasada
+        self.addCleanup(connections.__delitem__, 'replica')
+        self.addCleanup(atrasada.close)
+        with atrasada.schema_editor() as editor:
+            for modelo in (CustomUser, Curso, Materia):
+                editor.create_model(modelo)
+        self.docente = CustomUser.objects.create_user('doc', password='clave', role='docente')
+        self.curso = Curso.objects.create(nombre='10°', año_escolar='2025-2026')
+
+    def test_reconstruye_desde_la_primaria(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            materia = Materia.objects.create(nombre='Física', codigo='FIS', curso=self.curso, docente=self.docente)
+
+        async def construir():
+            return {'materias': await Materia.objects.filter(docente=self.docente).acount()}
+
+        with replica.en_replica():
+            # Las lecturas sueltas de la vista sí ven la réplica atrasada
+            self.assertFalse(Materia.objects.filter(pk=materia.pk).exists())
+            self.assertEqual(ContextoDocente(self.docente).materia(materia.pk).codigo, 'FIS')
+            contexto = async_to_sync(versiones.acontexto_dashboard)(self.docente, construir)
+            self.assertEqual(contexto, {'materias': 1})
+            self.assertEqual([m.id for m in obtener_catalogo().materias], [materia.pk])
+
+        # Y lo guardado en caché es el dato de la primaria
+        self.assertEqual(ContextoDocente(self.docente).materia_ids, {materia.pk})
+
+
+class SinReplicaTest(TestCase):
+    def test_todo_lee_de_la_primaria(self):
+        self.assertNotIn('replica', settings.DATABASES)
+        with replica.en_replica():
+            self.assertEqual(router.db_for_read(Calificacion), 'default')
+        with self.assertRaises(MiddlewareNotUsed):
+            replica.ReplicaMiddleware(lambda request: HttpResponse())
+
+
+@override_settings(STORAGES=SIN_MANIFIESTO)
+class VistasAsincronasTest(TransactionTestCase):
+    """Las vistas async dan el mismo contexto con las consultas en paralelo (conexiones propias) o en secuencia."""
+
+    CLAVES = {
+        'student_dashboard': ['matriculas', 'materias_inscritas', 'calificaciones', 'promedio',
+                              'notificaciones', 'porcentaje_asistencia'],
+        'student_calificaciones': ['calificaciones_por_materia'],
+        'student_asistencias': ['resumen_materias', 'total', 'presentes', 'porcentaje_asistencia'],
+        'student_notificaciones': ['notificaciones'],
+        'teacher_dashboard': ['materias', 'total_estudiantes', 'total_calificaciones', 'promedio_general',
+                              'calificaciones_recientes'],
+        'teacher_estadisticas': ['stats'],
+    }
+
+    def setUp(self):
+        self.datos = sembrar_datos()
+
+    @contextmanager
+    def _en_paralelo(self):
+        # SQLite en memoria no cierra las conexiones de los hilos del executor: las libera el
+        # recolector de ciclos, y si corre mientras otra conexión ejecuta una consulta sobre la
+        # caché compartida, SQLite se bloquea. Se recolecta entre peticiones.
+        gc.disable()
+        try:
+            with override_settings(ASYNC_PARALLEL_QUERIES=True):
+                yield
+        finally:
+            gc.collect()
+            gc.enable()
+
+    def _contexto(self, nombre, query=''):
+        cache.clear()
+        usuario = self.datos['docente'] if nombre.startswith('teacher_') else self.datos['estudiante']
+        self.client.force_login(usuario)
+        response = self.client.get(reverse(nombre) + query)
+        self.assertEqual(response.status_code, 200)
+        return {clave: repr(response.context[clave]) for clave in self.CLAVES[nombre]}
+
+    def test_paralelo_igual_a_secuencial(self):
+        for nombre in self.CLAVES:
+            with self.subTest(vista=nombre):
+                with override_settings(ASYNC_PARALLEL_QUERIES=False):
+                    secuencial = self._contexto(nombre)
+                with self._en_paralelo():
+                    self.assertEqual(self._contexto(nombre), secuencial)
+
+    def _conexiones_y_consultas(self, nombre):
+        cache.clear()
+        usuario = self.datos['docente'] if nombre.startswith('teacher_') else self.datos['estudiante']
+        self.client.force_login(usuario)
+        abiertas = []
+
+        def contar(sender, connection, **kwargs):
+            abiertas.append(connection.alias)
+
+        connection_created.connect(contar)
+        try:
+            response = self.client.get(reverse(nombre))
+        finally:
+            connection_created.disconnect(contar)
+        consultas = int(re.search(r'"(\d+) consultas"', response['Server-Timing']).group(1))
+        return len(abiertas), consultas
+
+    @override_settings(SERVER_TIMING_HEADER=True)
+    def test_conexiones_por_peticion(self):
+        self.assertFalse(settings.ASYNC_PARALLEL_QUERIES)
+        abiertas_en_paralelo = 0
+        for nombre in self.CLAVES:
+            with self.subTest(vista=nombre):
+                # Por defecto todo va por la conexión de la petición
+                abiertas, secuencial = self._conexiones_y_consultas(nombre)
+                self.assertEqual(abiertas, 0)
+                # En paralelo los hilos usan sus propias conexiones, pero Server-Timing sigue
+                # contando todas las consultas
+                with self._en_paralelo():
+                    abiertas, paralelo = self._conexiones_y_consultas(nombre)
+                abiertas_en_paralelo += abiertas
+                self.assertEqual(paralelo, secuencial)
+        self.assertGreater(abiertas_en_paralelo, 0)
+
+    def test_pagina_fuera_de_rango_muestra_la_ultima(self):
+        cache.clear()
+        self.client.force_login(self.datos['estudiante'])
+        response = self.client.get(reverse('student_asistencias') + '?page=99')
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj.number, page_obj.paginator.num_pages)
+        self.assertTrue(len(page_obj.object_list))
+
+
+# Presupuesto del arranque de un worker (django.setup() + resolución de URLs) en un proceso
+# nuevo; holgado para máquinas lentas de CI, hoy ronda los 130 ms
+PRESUPUESTO_ARRANQUE_MS = 1500
+
+# Dependencias pesadas que solo debe cargar la vista que las usa
+IMPORTACIONES_DIFERIDAS = ['openpyxl']
+
+
+class ArranqueTest(TestCase):
+    def test_presupuesto_de_arranque(self):
+        resultado = medir_arranque()
+        self.assertLessEqual(resultado['total_ms'], PRESUPUESTO_ARRANQUE_MS)
+        cargadas = [
+            modulo for modulo in IMPORTACIONES_DIFERIDAS
+            if any(m == modulo or m.startswith(f'{modulo}.') for m in resultado['modulos'])
+        ]
+        self.assertEqual(cargadas, [], 'Se importan al arrancar en lugar de en la vista que las usa')
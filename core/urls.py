@@ -1,8 +1,19 @@
 from django.urls import path
 from . import views
-from .admin_views import *
-from .teacher_views import *
-from .student_views import * # Importa todas las vistas del estudiante aquí.
+from .admin_views import (
+    admin_dashboard, usuarios_lista, usuario_crear, usuario_editar, usuario_eliminar,
+    cursos_lista, curso_crear, curso_editar, curso_eliminar,
+    materias_lista, materia_crear, materia_editar, materia_eliminar,
+)
+from .teacher_views import (
+    teacher_dashboard, calificaciones_lista, calificacion_crear, calificacion_editar, calificacion_eliminar,
+    asistencias_lista, asistencia_crear, asistencia_editar, asistencia_eliminar,
+    estadisticas, generar_reporte, estudiantes_materia, inscribir_estudiante, desinscribir_estudiante,
+)
+from .student_views import (
+    student_dashboard, mis_calificaciones, mis_cursos, mis_asistencias, mis_notificaciones,
+    exportar_calificaciones, marcar_notificacion_leida,
+)
 
 urlpatterns = [
     path('', views.home, name='core_home'),
@@ -46,4 +57,8 @@ urlpatterns = [
     path('student/notificaciones/', mis_notificaciones, name='student_notificaciones'),
     path('student/exportar/', exportar_calificaciones, name='student_exportar'),
     path('student/notificacion/<int:notificacion_id>/leida/', marcar_notificacion_leida, name='student_marcar_leida'),
+    path('student/materias/disponibles/', views.estudiante_listar_materias, name='student_listar_materias'),
+    path('student/materias/<int:materia_id>/inscribir/', views.estudiante_inscribir_materia, name='estudiante_inscribir_materia'),
+    path('student/cursos/disponibles/', views.estudiante_listar_cursos, name='student_listar_cursos'),
+    path('student/cursos/<int:curso_id>/matricular/', views.estudiante_matricular_curso, name='student_matricular_curso'),
 ]
\ No newline at end of file
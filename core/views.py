@@ -1,17 +1,17 @@
 from django.http import HttpResponse, HttpResponseForbidden
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.db.models import Avg, Count, Q
 from django.utils import timezone
 from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment
 
 # Asegúrate de importar TODOS tus modelos
 # IMPORTANTE: Esto asume que todos estos modelos están en core.models
-from core.models import Curso, Materia, Matricula, Calificacion, Asistencia, Notificacion, InscripcionMateria 
+from core.models import Curso, Materia, Matricula, Calificacion, Asistencia, Notificacion, InscripcionMateria, ListaEspera
 from accounts.models import CustomUser 
+from core.catalog import obtener_catalogo
+from core import inscripciones
 
 
 # ----------------------------------------------------------------------
@@ -129,21 +129,38 @@ def estudiante_listar_materias(request):
         return HttpResponseForbidden()
 
     # IDs de las materias a las que el estudiante ya está inscrito
-    materias_inscritas_ids = InscripcionMateria.objects.filter(
+    materias_inscritas_ids = set(InscripcionMateria.objects.filter(
         estudiante=request.user
-    ).values_list('materia_id', flat=True)
+    ).values_list('materia_id', flat=True))
 
-    # Materias activas excluyendo las ya inscritas
-    materias_disponibles = Materia.objects.filter(activa=True).exclude(
-        id__in=materias_inscritas_ids
-    ).select_related('curso', 'docente').order_by('curso__nombre', 'nombre')
+    # Ocupación al momento (los contadores cambian con cada inscripción, no van en el catálogo)
+    ocupacion = _ocupacion(Materia.objects.filter(activa=True), 'inscritos')
+    en_espera = set(ListaEspera.objects.filter(
+        estudiante=request.user
+    ).values_list('materia_id', flat=True))
+
+    # Materias activas del catálogo excluyendo las ya inscritas
+    materias_disponibles = [
+        (materia, ocupacion.get(materia.id))
+        for materia in obtener_catalogo().materias_activas
+        if materia.id not in materias_inscritas_ids
+    ]
 
     context = {
-        'materias_disponibles': materias_disponibles
+        'materias_disponibles': materias_disponibles,
+        'en_espera': en_espera,
     }
     return render(request, 'student/materias_disponibles.html', context) 
 
 
+def _ocupacion(queryset, contador):
+    """{id: {'ocupados', 'cupo', 'llena'}} de las filas con cupo definido."""
+    return {
+        id: {'ocupados': ocupados, 'cupo': cupo, 'llena': ocupados >= cupo}
+        for id, ocupados, cupo in queryset.filter(cupo__isnull=False).order_by().values_list('id', contador, 'cupo')
+    }
+
+
 @login_required
 def estudiante_inscribir_materia(request, materia_id):
     """Procesa la inscripción del estudiante a una materia específica."""
@@ -154,16 +171,17 @@ def estudiante_inscribir_materia(request, materia_id):
         # Nota: La URL correcta es 'student_listar_materias' (corregida en urls.py)
         return redirect('student_listar_materias') 
 
-    materia = get_object_or_404(Materia, id=materia_id, activa=True)
+    resultado = inscripciones.inscribir_materia(request.user, materia_id)
+    nombre = Materia.objects.filter(id=materia_id).values_list('nombre', flat=True).first()
 
-    try:
-        InscripcionMateria.objects.create(
-            estudiante=request.user,
-            materia=materia
-        )
-        messages.success(request, f"¡Inscripción exitosa a {materia.nombre}!")
-    except Exception:
-        messages.error(request, f"Ya estás inscrito en {materia.nombre}.")
+    if resultado == inscripciones.INSCRITO:
+        messages.success(request, f"¡Inscripción exitosa a {nombre}!")
+    elif resultado == inscripciones.YA_INSCRITO:
+        messages.info(request, f"Ya estás inscrito en {nombre}.")
+    elif resultado == inscripciones.EN_ESPERA:
+        messages.warning(request, f"{nombre} no tiene cupo: quedaste en la lista de espera.")
+    else:
+        messages.info(request, f"Ya estás en la lista de espera de {nombre}.")
 
     return redirect('student_listar_materias')
 
@@ -174,14 +192,17 @@ def estudiante_listar_cursos(request):
     if request.user.role != 'estudiante':
         return HttpResponseForbidden()
 
-    cursos_matriculados_ids = Matricula.objects.filter(
+    cursos_matriculados_ids = set(Matricula.objects.filter(
         estudiante=request.user,
         activa=True
-    ).values_list('curso_id', flat=True)
+    ).values_list('curso_id', flat=True))
 
-    cursos_disponibles = Curso.objects.filter(activo=True).exclude(
-        id__in=cursos_matriculados_ids
-    ).order_by('nombre')
+    ocupacion = _ocupacion(Curso.objects.filter(activo=True), 'matriculados')
+    cursos_disponibles = [
+        (curso, ocupacion.get(curso.id))
+        for curso in obtener_catalogo().cursos_activos
+        if curso.id not in cursos_matriculados_ids
+    ]
 
     context = {
         'cursos_disponibles': cursos_disponibles
@@ -200,17 +221,15 @@ def estudiante_matricular_curso(request, curso_id):
         # Nota: La URL correcta es 'student_listar_cursos' (corregida en urls.py)
         return redirect('student_listar_cursos') 
 
-    curso = get_object_or_404(Curso, id=curso_id, activo=True)
-
-    try:
-        Matricula.objects.create(
-            estudiante=request.user,
-            curso=curso,
-            activa=True
-        )
-        messages.success(request, f"¡Matrícula exitosa al curso {curso.nombre}!")
-    except Exception:
-        messages.error(request, f"Ya estás matriculado en el curso {curso.nombre}.")
+    resultado = inscripciones.matricular_curso(request.user, curso_id)
+    nombre = Curso.objects.filter(id=curso_id).values_list('nombre', flat=True).first()
+
+    if resultado == inscripciones.MATRICULADO:
+        messages.success(request, f"¡Matrícula exitosa al curso {nombre}!")
+    elif resultado == inscripciones.YA_MATRICULADO:
+        messages.info(request, f"Ya estás matriculado en el curso {nombre}.")
+    else:
+        messages.error(request, f"El curso {nombre} no tiene cupos disponibles.")
 
     return redirect('student_listar_cursos')
 
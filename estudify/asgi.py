@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'estudify.settings')
+# settings solo permite ASYNC_PARALLEL_QUERIES bajo ASGI
+os.environ.setdefault('ESTUDIFY_ASGI', 'True')
 
 application = get_asgi_application()
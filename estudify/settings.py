@@ -31,37 +31,94 @@ INSTALLED_APPS = [
 # MIDDLEWARE
 # ============================
 MIDDLEWARE = [
+    "core.middleware.ServerTimingMiddleware",  # Tiempos por petición (cabecera Server-Timing)
+    "core.querylog.ConsultasLentasMiddleware",  # Solo activo con SLOW_QUERY_LOG_MS > 0
+    "core.replica.ReplicaMiddleware",  # Solo activo con DATABASE_REPLICA_URL
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",  # Para servir archivos estáticos en producción
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.middleware.ContextoDocenteMiddleware",  # request.docente: materias del docente
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Métricas por petición. La cabecera Server-Timing revela la vista resuelta y el número de
+# consultas: True, False o staff (solo a usuarios staff). Por defecto solo en desarrollo
+_server_timing = os.environ.get('SERVER_TIMING_HEADER', str(DEBUG))
+SERVER_TIMING_HEADER = 'staff' if _server_timing == 'staff' else _server_timing == 'True'
+SLOW_REQUEST_THRESHOLD_MS = int(os.environ.get('SLOW_REQUEST_THRESHOLD_MS', 500))
+
+# Consultas lentas con EXPLAIN (0 = deshabilitado)
+SLOW_QUERY_LOG_MS = float(os.environ.get('SLOW_QUERY_LOG_MS', 0))
+SLOW_QUERY_EXPLAIN_ANALYZE = os.environ.get('SLOW_QUERY_EXPLAIN_ANALYZE', 'True') == 'True'
+SLOW_QUERY_LOG_FILE = os.environ.get('SLOW_QUERY_LOG_FILE', str(BASE_DIR / "logs" / "slow_queries.jsonl"))
+
+# Endpoint /metrics (Prometheus); si se define, se exige "Authorization: Bearer <token>"
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
 ROOT_URLCONF = "estudify.urls"
 
 # ============================
 # TEMPLATES
 # ============================
+_TEMPLATE_LOADERS = [
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # El motor de Django con el tiempo de render en las métricas de la petición (core/plantillas.py)
+        "BACKEND": "core.plantillas.DjangoTemplates",
+        "NAME": "django",
         "DIRS": [BASE_DIR / "templates"],  # Carpeta global de plantillas
-        "APP_DIRS": True,
+        # Las plantillas de las apps las busca app_directories.Loader (con loaders explícitos va en False)
+        "APP_DIRS": False,
         "OPTIONS": {
             "context_processors": [
                 "django.template.context_processors.debug",
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "core.context_processors.fragmentos",
+            ],
+            # En producción cada worker compila cada plantilla una sola vez; en
+            # desarrollo se leen del disco en cada render para ver los cambios
+            "loaders": _TEMPLATE_LOADERS if DEBUG else [
+                ("django.template.loaders.cached.Loader", _TEMPLATE_LOADERS),
             ],
         },
     },
 ]
 
+# Jinja2 (opcional) para las plantillas de tablas grandes: las de jinja2/ tienen prioridad
+# y cualquier otra plantilla se sigue buscando en templates/ con el motor de Django
+JINJA2_TEMPLATES = os.environ.get('JINJA2_TEMPLATES', 'False') == 'True'
+JINJA2_BYTECODE_DIR = os.environ.get('JINJA2_BYTECODE_DIR', '')  # Vacío: directorio temporal del sistema
+TEMPLATES_JINJA2 = {
+    "BACKEND": "core.jinja.Jinja2",
+    "NAME": "jinja2",
+    "DIRS": [BASE_DIR / "jinja2"],
+    "APP_DIRS": False,
+    "OPTIONS": {
+        "environment": "core.jinja.entorno",
+        "context_processors": [
+            "django.contrib.auth.context_processors.auth",
+            "django.contrib.messages.context_processors.messages",
+        ],
+    },
+}
+if JINJA2_TEMPLATES:
+    TEMPLATES.insert(0, TEMPLATES_JINJA2)
+
+# Listas largas (calificaciones, asistencias y usuarios) en streaming: la página sale de
+# inmediato y las filas se envían en bloques leídos con un cursor del lado del servidor
+STREAMING_LISTS = os.environ.get('STREAMING_LISTS', 'True') == 'True'
+STREAMING_CHUNK_SIZE = int(os.environ.get('STREAMING_CHUNK_SIZE', 500))
+
 WSGI_APPLICATION = "estudify.wsgi.application"
 
 # ============================
@@ -70,7 +127,32 @@ WSGI_APPLICATION = "estudify.wsgi.application"
 # Usar PostgreSQL en producción (Render) y SQLite en desarrollo
 DATABASE_URL = os.environ.get('DATABASE_URL')
 
-if DATABASE_URL:
+# El driver de PostgreSQL es psycopg 3 en ambos modos (requirements.txt ya no
+# instala psycopg2). DB_POOL=True usa su pool nativo (Django 5.2) en lugar de
+# una conexión persistente por worker. Requiere PostgreSQL y psycopg-pool.
+DB_POOL = os.environ.get('DB_POOL', 'False') == 'True'
+
+if DATABASE_URL and DB_POOL:
+    # Producción con pool: las conexiones vuelven al pool al terminar cada petición
+    DATABASES = {
+        "default": dj_database_url.config(
+            default=DATABASE_URL,
+            conn_max_age=0,
+            conn_health_checks=False,
+        )
+    }
+    DATABASES["default"].setdefault("OPTIONS", {})["pool"] = {
+        "min_size": int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+        "max_size": int(os.environ.get('DB_POOL_MAX_SIZE', '10')),
+        "timeout": float(os.environ.get('DB_POOL_TIMEOUT', '10')),
+        "max_idle": float(os.environ.get('DB_POOL_MAX_IDLE', '300')),
+        "max_lifetime": float(os.environ.get('DB_POOL_MAX_LIFETIME', '3600')),
+    }
+    if os.environ.get('DB_POOL_CHECK', 'False') == 'True':
+        # Verifica cada conexión al sacarla del pool (un SELECT extra, como CONN_HEALTH_CHECKS)
+        from psycopg_pool import ConnectionPool
+        DATABASES["default"]["OPTIONS"]["pool"]["check"] = ConnectionPool.check_connection
+elif DATABASE_URL:
     # Producción (Render con PostgreSQL)
     DATABASES = {
         "default": dj_database_url.config(
@@ -88,6 +170,90 @@ else:
         }
     }
 
+# Réplica de solo lectura para reportes, exportaciones, estadísticas y dashboards
+# (core/replica.py). Sin DATABASE_REPLICA_URL todo se lee de la primaria.
+DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')
+
+if DATABASE_REPLICA_URL:
+    DATABASES["replica"] = dj_database_url.parse(
+        DATABASE_REPLICA_URL,
+        conn_max_age=DATABASES["default"].get("CONN_MAX_AGE", 0),
+        conn_health_checks=DATABASES["default"].get("CONN_HEALTH_CHECKS", False),
+    )
+    # En las pruebas la réplica apunta a la base de pruebas de la primaria
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+
+DATABASE_ROUTERS = ["core.replica.RouterReplica"]
+
+# Segundos que un navegador lee de la primaria después de escribir (lectura de lo propio escrito)
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', '5'))
+
+# ASYNC_PARALLEL_QUERIES=True lanza a la vez las consultas independientes de las vistas async,
+# cada una en un hilo con su propia conexión (core/asincrono.py). Solo se activa bajo ASGI
+# (estudify/asgi.py define ESTUDIFY_ASGI) y con DB_POOL: bajo WSGI o sin pool cada petición
+# abriría varias conexiones nuevas (con TLS en PostgreSQL) y, con CONN_MAX_AGE, cada hilo del
+# executor conservaría la suya. Por defecto las consultas van en secuencia.
+ASYNC_PARALLEL_QUERIES = (
+    os.environ.get('ASYNC_PARALLEL_QUERIES', 'False') == 'True'
+    and os.environ.get('ESTUDIFY_ASGI') == 'True'
+    and 'pool' in DATABASES['default'].get('OPTIONS', {})
+)
+
+# ============================
+# CACHÉ
+# ============================
+# CACHE_BACKEND: locmem, file, redis o memcached. Por defecto locmem en desarrollo y file
+# en producción: locmem es por proceso y, con varios workers, uno que no vio la invalidación
+# seguiría sirviendo dashboards viejos. Los backends externos requieren CACHE_URL; sin ella
+# se usa el de por defecto.
+CACHE_BACKEND_POR_DEFECTO = 'locmem' if DEBUG else 'file'
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', CACHE_BACKEND_POR_DEFECTO)
+CACHE_URL = os.environ.get('CACHE_URL')
+if CACHE_BACKEND in ('redis', 'memcached') and not CACHE_URL:
+    CACHE_BACKEND = CACHE_BACKEND_POR_DEFECTO
+
+if CACHE_BACKEND == 'file':
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.environ.get('CACHE_LOCATION', str(BASE_DIR / ".cache")),
+        }
+    }
+elif CACHE_BACKEND == 'redis' and CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+        }
+    }
+elif CACHE_BACKEND == 'memcached' and CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.memcached.PyMemcacheCache",
+            "LOCATION": CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "estudify",
+        }
+    }
+
+CACHES["default"]["KEY_PREFIX"] = "estudify"
+
+# locmem es por proceso: lo que un worker invalida sigue vigente en los demás
+CACHE_COMPARTIDA = CACHES["default"]["BACKEND"] != "django.core.cache.backends.locmem.LocMemCache"
+
+# Segundos que se conserva el contexto de los dashboards (la versión por usuario lo invalida antes).
+# Con locmem en producción (varios workers) se desactiva por defecto: la invalidación no llegaría
+DASHBOARD_CACHE_TIMEOUT = int(os.environ.get('DASHBOARD_CACHE_TIMEOUT', 300 if CACHE_COMPARTIDA or DEBUG else 0))
+
+# Segundos que se conservan los fragmentos {% cache %} de las plantillas (menú, cursos más
+# poblados, listas del catálogo); la clave incluye la versión de los datos. 0 los desactiva
+FRAGMENT_CACHE_TIMEOUT = int(os.environ.get('FRAGMENT_CACHE_TIMEOUT', 600))
+
 # ============================
 # PASSWORD VALIDATION
 # ============================
@@ -111,10 +277,15 @@ USE_TZ = True
 # ARCHIVOS ESTÁTICOS
 # ============================
 STATIC_URL = "/static/"
-STATICFILES_DIRS = []
+# static/ guarda los recursos propios (la hoja de estilos que enlaza base.html)
+STATICFILES_DIRS = [BASE_DIR / "static"]
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
-# Configuración de WhiteNoise para servir archivos estáticos en producción
+# Configuración de WhiteNoise para servir archivos estáticos en producción.
+# collectstatic agrega un hash del contenido al nombre y genera las versiones
+# .gz y .br (si Brotli está instalado); WhiteNoise sirve los archivos con hash
+# con caché de un año e "immutable" y elige la versión comprimida según
+# Accept-Encoding.
 STORAGES = {
     "default": {
         "BACKEND": "django.core.files.storage.FileSystemStorage",
@@ -142,6 +313,72 @@ LOGIN_URL = "/accounts/login/"
 LOGIN_REDIRECT_URL = "/"
 LOGOUT_REDIRECT_URL = "/"
 
+# ============================
+# SESIONES Y USUARIO POR PETICIÓN
+# ============================
+# SESSION_BACKEND: cached_db (la caché evita leer django_session en cada petición),
+# db o signed_cookies (la sesión viaja firmada en la cookie, sin consultas). Con locmem
+# un logout no se vería en los demás workers, así que por defecto solo se usa
+# cached_db con una caché compartida.
+SESSION_BACKEND = os.environ.get('SESSION_BACKEND', 'cached_db' if CACHE_COMPARTIDA else 'db')
+SESSION_ENGINE = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}[SESSION_BACKEND]
+
+# El usuario de la sesión se arma desde una foto en caché (accounts/backends.py)
+AUTHENTICATION_BACKENDS = ["accounts.backends.UsuarioEnCacheBackend"]
+
+# Segundos que se conserva la foto del usuario; 0 la desactiva. Por la misma razón que
+# las sesiones, por defecto solo se activa con una caché compartida.
+USER_CACHE_TIMEOUT = int(os.environ.get('USER_CACHE_TIMEOUT', 300 if CACHE_COMPARTIDA else 0))
+
+# ============================
+# API JSON (/api/v1/)
+# ============================
+# Filas por página de las listas (limit=) y máximo que puede pedir un cliente
+API_PAGE_SIZE = int(os.environ.get('API_PAGE_SIZE', 100))
+API_MAX_PAGE_SIZE = int(os.environ.get('API_MAX_PAGE_SIZE', 1000))
+
+# Carga por lotes (<recurso>/lote/): registros por petición y filas por transacción
+API_BATCH_MAX_RECORDS = int(os.environ.get('API_BATCH_MAX_RECORDS', 5000))
+API_BATCH_CHUNK_SIZE = int(os.environ.get('API_BATCH_CHUNK_SIZE', 500))
+
+# ============================
+# LOGGING
+# ============================
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "estudify.performance": {
+            "handlers": ["console"],
+            "level": "WARNING",
+            "propagate": False,
+        },
+    },
+}
+
+if SLOW_QUERY_LOG_MS:
+    os.makedirs(os.path.dirname(SLOW_QUERY_LOG_FILE), exist_ok=True)
+    LOGGING["formatters"] = {"jsonl": {"format": "%(message)s"}}
+    LOGGING["handlers"]["slow_queries"] = {
+        "class": "logging.handlers.RotatingFileHandler",
+        "filename": SLOW_QUERY_LOG_FILE,
+        "maxBytes": 10 * 1024 * 1024,
+        "backupCount": 5,
+        "formatter": "jsonl",
+    }
+    LOGGING["loggers"]["estudify.slow_queries"] = {
+        "handlers": ["slow_queries"],
+        "level": "WARNING",
+        "propagate": False,
+    }
+
 # ============================
 # DEFAULT PRIMARY KEY
 # ============================
@@ -1,8 +1,11 @@
 from django.contrib import admin
 from django.urls import path, include
+from core.metrics import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
     path('accounts/', include('accounts.urls')),
+    path('api/v1/', include('core.api')),
     path('', include('core.urls')),
 ]
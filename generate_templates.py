@@ -6,35 +6,443 @@ import os
 
 templates = {
     # Admin templates
+    # Hoja de estilos compartida que enlaza base.html (collectstatic la comprime y le pone hash)
+    'static/css/estudify.css': '''/* Estilos compartidos de Estudify (generado por generate_templates.py) */
+
+* {
+    margin: 0;
+    padding: 0;
+    box-sizing: border-box;
+}
+
+body {
+    font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    background-attachment: fixed;
+    color: #2d3748;
+    min-height: 100vh;
+}
+
+.navbar {
+    background: rgba(255, 255, 255, 0.95);
+    backdrop-filter: blur(10px);
+    color: #2d3748;
+    padding: 1rem 2rem;
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+    box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1), 0 2px 4px -1px rgba(0, 0, 0, 0.06);
+    position: sticky;
+    top: 0;
+    z-index: 1000;
+}
+
+.navbar h1 {
+    font-size: 1.75rem;
+    font-weight: 700;
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    -webkit-background-clip: text;
+    -webkit-text-fill-color: transparent;
+    background-clip: text;
+}
+
+.navbar a {
+    color: #4a5568;
+    text-decoration: none;
+    padding: 0.5rem 1rem;
+    border-radius: 6px;
+    transition: all 0.3s ease;
+    font-weight: 500;
+}
+
+.navbar a:hover {
+    background: rgba(102, 126, 234, 0.1);
+    color: #667eea;
+}
+
+.navbar-right {
+    display: flex;
+    gap: 1rem;
+    align-items: center;
+}
+
+.navbar-right span {
+    font-size: 0.9rem;
+    color: #4a5568;
+    font-weight: 500;
+}
+
+/* Enlaces del menú según el rol (antes con estilos en línea en cada enlace) */
+.navbar-links {
+    display: flex;
+    gap: 1.5rem;
+    align-items: center;
+    flex: 1;
+    margin-left: 2rem;
+}
+
+.navbar-links a,
+.navbar-links a:hover {
+    color: white;
+    text-decoration: none;
+}
+
+.btn {
+    padding: 0.625rem 1.25rem;
+    border: none;
+    border-radius: 8px;
+    cursor: pointer;
+    text-decoration: none;
+    display: inline-block;
+    font-size: 0.9rem;
+    font-weight: 600;
+    transition: all 0.3s ease;
+    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+}
+
+.btn:hover {
+    transform: translateY(-2px);
+    box-shadow: 0 4px 8px rgba(0,0,0,0.15);
+}
+
+.btn-primary {
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    color: white;
+}
+
+.btn-primary:hover {
+    opacity: 0.9;
+}
+
+.btn-danger {
+    background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
+    color: white;
+}
+
+.btn-success {
+    background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%);
+    color: white;
+}
+
+.btn-info {
+    background: linear-gradient(135deg, #43e97b 0%, #38f9d7 100%);
+    color: white;
+}
+
+.btn-warning {
+    background: linear-gradient(135deg, #fa709a 0%, #fee140 100%);
+    color: white;
+}
+
+.container {
+    max-width: 1200px;
+    margin: 2rem auto;
+    padding: 0 1rem;
+}
+
+.card {
+    background: rgba(255, 255, 255, 0.95);
+    backdrop-filter: blur(10px);
+    border-radius: 16px;
+    padding: 2rem;
+    margin-bottom: 1.5rem;
+    box-shadow: 0 10px 15px -3px rgba(0, 0, 0, 0.1), 0 4px 6px -2px rgba(0, 0, 0, 0.05);
+    border: 1px solid rgba(255, 255, 255, 0.3);
+    transition: all 0.3s ease;
+}
+
+.card:hover {
+    transform: translateY(-4px);
+    box-shadow: 0 20px 25px -5px rgba(0, 0, 0, 0.1), 0 10px 10px -5px rgba(0, 0, 0, 0.04);
+}
+
+.card-title, h2, h3 {
+    font-size: 1.5rem;
+    margin-bottom: 1.5rem;
+    color: #2d3748;
+    font-weight: 700;
+}
+
+.stats-grid {
+    display: grid;
+    grid-template-columns: repeat(auto-fit, minmax(220px, 1fr));
+    gap: 1.5rem;
+    margin-bottom: 2rem;
+}
+
+.stat-card {
+    background: rgba(255, 255, 255, 0.95);
+    backdrop-filter: blur(10px);
+    padding: 2rem;
+    border-radius: 16px;
+    box-shadow: 0 10px 15px -3px rgba(0, 0, 0, 0.1), 0 4px 6px -2px rgba(0, 0, 0, 0.05);
+    text-align: center;
+    border: 1px solid rgba(255, 255, 255, 0.3);
+    transition: all 0.3s ease;
+    position: relative;
+    overflow: hidden;
+}
+
+.stat-card::before {
+    content: '';
+    position: absolute;
+    top: 0;
+    left: 0;
+    width: 100%;
+    height: 4px;
+    background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
+}
+
+.stat-card:hover {
+    transform: translateY(-8px) scale(1.02);
+    box-shadow: 0 20px 25px -5px rgba(0, 0, 0, 0.1), 0 10px 10px -5px rgba(0, 0, 0, 0.04);
+}
+
+.stat-value {
+    font-size: 2.5rem;
+    font-weight: 800;
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    -webkit-background-clip: text;
+    -webkit-text-fill-color: transparent;
+    background-clip: text;
+    margin-bottom: 0.5rem;
+}
+
+.stat-label {
+    color: #718096;
+    font-size: 0.95rem;
+    font-weight: 500;
+    text-transform: uppercase;
+    letter-spacing: 0.5px;
+}
+
+table {
+    width: 100%;
+    border-collapse: separate;
+    border-spacing: 0;
+    margin-top: 1rem;
+}
+
+th, td {
+    padding: 1rem;
+    text-align: left;
+}
+
+th {
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    color: white;
+    font-weight: 600;
+    text-transform: uppercase;
+    font-size: 0.85rem;
+    letter-spacing: 0.5px;
+}
+
+th:first-child {
+    border-top-left-radius: 8px;
+}
+
+th:last-child {
+    border-top-right-radius: 8px;
+}
+
+tbody tr {
+    background: white;
+    transition: all 0.2s ease;
+}
+
+tbody tr:hover {
+    background: rgba(102, 126, 234, 0.05);
+    transform: scale(1.01);
+}
+
+tbody tr:last-child td:first-child {
+    border-bottom-left-radius: 8px;
+}
+
+tbody tr:last-child td:last-child {
+    border-bottom-right-radius: 8px;
+}
+
+td {
+    border-bottom: 1px solid #e2e8f0;
+}
+
+.badge {
+    padding: 0.375rem 1rem;
+    border-radius: 20px;
+    font-size: 0.85rem;
+    font-weight: 600;
+    display: inline-block;
+    text-transform: uppercase;
+    letter-spacing: 0.5px;
+}
+
+.badge-success {
+    background: linear-gradient(135deg, #81FBB8 0%, #28C76F 100%);
+    color: white;
+}
+
+.badge-danger {
+    background: linear-gradient(135deg, #FF6B95 0%, #EA5455 100%);
+    color: white;
+}
+
+.badge-warning {
+    background: linear-gradient(135deg, #FFC872 0%, #FF9F43 100%);
+    color: white;
+}
+
+.badge-info {
+    background: linear-gradient(135deg, #84D9FF 0%, #00CFE8 100%);
+    color: white;
+}
+
+.alert {
+    padding: 1.25rem;
+    border-radius: 12px;
+    margin-bottom: 1.5rem;
+    border-left: 4px solid;
+    animation: slideIn 0.3s ease;
+}
+
+@keyframes slideIn {
+    from {
+        opacity: 0;
+        transform: translateY(-10px);
+    }
+    to {
+        opacity: 1;
+        transform: translateY(0);
+    }
+}
+
+.alert-success {
+    background: rgba(129, 251, 184, 0.1);
+    color: #28C76F;
+    border-color: #28C76F;
+}
+
+.alert-error {
+    background: rgba(255, 107, 149, 0.1);
+    color: #EA5455;
+    border-color: #EA5455;
+}
+
+.notification {
+    background: rgba(255, 200, 114, 0.1);
+    border-left: 4px solid #FF9F43;
+    padding: 1.25rem;
+    margin-bottom: 1rem;
+    border-radius: 12px;
+    transition: all 0.3s ease;
+}
+
+.notification:hover {
+    transform: translateX(4px);
+    box-shadow: 0 4px 6px rgba(0,0,0,0.1);
+}
+
+.notification-title {
+    font-weight: 700;
+    margin-bottom: 0.5rem;
+    color: #2d3748;
+}
+
+form input, form select, form textarea {
+    width: 100%;
+    padding: 0.75rem 1rem;
+    border: 2px solid #e2e8f0;
+    border-radius: 8px;
+    font-size: 0.95rem;
+    transition: all 0.3s ease;
+    font-family: inherit;
+}
+
+form input:focus, form select:focus, form textarea:focus {
+    outline: none;
+    border-color: #667eea;
+    box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1);
+}
+
+form label {
+    display: block;
+    margin-bottom: 0.5rem;
+    color: #4a5568;
+    font-weight: 600;
+    font-size: 0.9rem;
+}
+
+hr {
+    border: none;
+    height: 1px;
+    background: linear-gradient(90deg, transparent, rgba(102, 126, 234, 0.3), transparent);
+    margin: 2rem 0;
+}
+''',
+
     'templates/admin/usuarios_lista.html': '''{% extends 'base.html' %}
+{% load static %}
 {% block title %}Gestión de Usuarios{% endblock %}
 {% block content %}
 <h2>👥 Gestión de Usuarios</h2>
 <div style="margin: 1.5rem 0;">
     <a href="{% url 'admin_usuario_crear' %}" class="btn btn-success">➕ Crear Usuario</a>
 </div>
+<form method="get" class="card" data-filtros="filas-usuarios">
+    <div style="display: flex; gap: 1rem; align-items: end;">
+        <div style="flex: 1;">
+            <label for="role">Rol:</label>
+            <select name="role" id="role">
+                <option value="">Todos</option>
+                {% for valor, etiqueta in roles %}
+                <option value="{{ valor }}" {% if role_filter == valor %}selected{% endif %}>{{ etiqueta }}</option>
+                {% endfor %}
+            </select>
+        </div>
+        <div style="flex: 1;">
+            <label for="activo">Estado:</label>
+            <select name="activo" id="activo">
+                <option value="">Todos</option>
+                <option value="true" {% if activo_filter == 'true' %}selected{% endif %}>Activos</option>
+                <option value="false" {% if activo_filter == 'false' %}selected{% endif %}>Inactivos</option>
+            </select>
+        </div>
+        <div style="flex: 1;">
+            <label for="search">Buscar:</label>
+            <input type="search" name="search" id="search" value="{{ search_query|default:'' }}" placeholder="Usuario, nombre o email">
+        </div>
+        <button type="submit" class="btn btn-primary">Filtrar</button>
+    </div>
+</form>
 <div class="card">
     <table>
         <thead>
             <tr><th>Username</th><th>Nombre</th><th>Email</th><th>Role</th><th>Estado</th><th>Acciones</th></tr>
         </thead>
-        <tbody>
-            {% for usuario in usuarios %}
-            <tr>
-                <td>{{ usuario.username }}</td>
-                <td>{{ usuario.get_full_name|default:"-" }}</td>
-                <td>{{ usuario.email|default:"-" }}</td>
-                <td><span class="badge badge-info">{{ usuario.get_role_display }}</span></td>
-                <td>{% if usuario.is_active %}<span class="badge badge-success">Activo</span>{% else %}<span class="badge badge-danger">Inactivo</span>{% endif %}</td>
-                <td>
-                    <a href="{% url 'admin_usuario_editar' usuario.id %}" class="btn btn-primary" style="padding: 0.25rem 0.5rem; font-size: 0.85rem;">Editar</a>
-                </td>
-            </tr>
-            {% endfor %}
+        <tbody id="filas-usuarios">
+            {% if streaming %}<!-- filas -->{% else %}{% include 'admin/usuarios_filas.html' %}{% endif %}
         </tbody>
     </table>
 </div>
-{% endblock %}''',
+{% endblock %}
+{% block scripts %}<script src="{% static 'js/filtros.js' %}" defer></script>{% endblock %}''',
+
+    'templates/admin/usuarios_filas.html': '''{% comment %}Filas de admin/usuarios_lista.html (se envían por bloques en streaming y solas como respuesta a los filtros){% endcomment %}
+{% for usuario in usuarios %}
+<tr>
+    <td>{{ usuario.username }}</td>
+    <td>{{ usuario.get_full_name|default:"-" }}</td>
+    <td>{{ usuario.email|default:"-" }}</td>
+    <td><span class="badge badge-info">{{ usuario.get_role_display }}</span></td>
+    <td>{% if usuario.is_active %}<span class="badge badge-success">Activo</span>{% else %}<span class="badge badge-danger">Inactivo</span>{% endif %}</td>
+    <td>
+        <a href="{% url 'admin_usuario_editar' usuario.id %}" class="btn btn-primary" style="padding: 0.25rem 0.5rem; font-size: 0.85rem;">Editar</a>
+    </td>
+</tr>
+{% empty %}
+<tr><td colspan="6" style="text-align: center;">No hay usuarios registrados</td></tr>
+{% endfor %}
+''',
 
     'templates/admin/usuario_form.html': '''{% extends 'base.html' %}
 {% block title %}{% if edit_mode %}Editar{% else %}Crear{% endif %} Usuario{% endblock %}
@@ -81,12 +489,14 @@ templates = {
 {% endblock %}''',
 
     'templates/admin/cursos_lista.html': '''{% extends 'base.html' %}
+{% load cache %}
 {% block title %}Gestión de Cursos{% endblock %}
 {% block content %}
 <h2>📚 Gestión de Cursos</h2>
 <div style="margin: 1.5rem 0;">
     <a href="{% url 'admin_curso_crear' %}" class="btn btn-success">➕ Crear Curso</a>
 </div>
+{% cache fragmentos.timeout admin_cursos_lista fragmentos.version_catalogo %}
 <div class="card">
     <table>
         <thead>
@@ -107,6 +517,7 @@ templates = {
         </tbody>
     </table>
 </div>
+{% endcache %}
 {% endblock %}''',
 
     'templates/admin/curso_form.html': '''{% extends 'base.html' %}
@@ -128,6 +539,10 @@ templates = {
             <label>Año Escolar (ej: 2024-2025):</label>
             <input type="text" name="año_escolar" value="{{ curso.año_escolar|default:'' }}" required style="width: 100%; padding: 0.5rem;">
         </div>
+        <div class="form-group" style="margin-bottom: 1rem;">
+            <label>Cupo (vacío = sin límite{% if edit_mode %}; matriculados: {{ curso.matriculados }}{% endif %}):</label>
+            <input type="number" name="cupo" min="0" value="{{ curso.cupo|default_if_none:'' }}" style="width: 100%; padding: 0.5rem;">
+        </div>
         <div class="form-group" style="margin-bottom: 1rem;">
             <label><input type="checkbox" name="activo" {% if edit_mode %}{% if curso.activo %}checked{% endif %}{% else %}checked{% endif %}> Activo</label>
         </div>
@@ -138,12 +553,14 @@ templates = {
 {% endblock %}''',
 
     'templates/admin/materias_lista.html': '''{% extends 'base.html' %}
+{% load cache %}
 {% block title %}Gestión de Materias{% endblock %}
 {% block content %}
 <h2>📖 Gestión de Materias</h2>
 <div style="margin: 1.5rem 0;">
     <a href="{% url 'admin_materia_crear' %}" class="btn btn-success">➕ Crear Materia</a>
 </div>
+{% cache fragmentos.timeout admin_materias_lista fragmentos.version_catalogo %}
 <div class="card">
     <table>
         <thead>
@@ -154,8 +571,8 @@ templates = {
             <tr>
                 <td><strong>{{ materia.nombre }}</strong></td>
                 <td>{{ materia.codigo }}</td>
-                <td>{{ materia.curso.nombre }}</td>
-                <td>{{ materia.docente.get_full_name|default:materia.docente.username|default:"-" }}</td>
+                <td>{{ materia.curso_nombre }}</td>
+                <td>{{ materia.docente_nombre|default:"-" }}</td>
                 <td>{% if materia.activa %}<span class="badge badge-success">Activa</span>{% else %}<span class="badge badge-danger">Inactiva</span>{% endif %}</td>
                 <td>
                     <a href="{% url 'admin_materia_editar' materia.id %}" class="btn btn-primary" style="padding: 0.25rem 0.5rem; font-size: 0.85rem;">Editar</a>
@@ -166,6 +583,7 @@ templates = {
         </tbody>
     </table>
 </div>
+{% endcache %}
 {% endblock %}''',
 
     'templates/admin/materia_form.html': '''{% extends 'base.html' %}
@@ -192,7 +610,7 @@ templates = {
             <select name="curso" required style="width: 100%; padding: 0.5rem;">
                 <option value="">Seleccionar curso...</option>
                 {% for curso in cursos %}
-                <option value="{{ curso.id }}" {% if materia.curso.id == curso.id %}selected{% endif %}>{{ curso.nombre }}</option>
+                <option value="{{ curso.id }}" {% if materia.curso_id == curso.id %}selected{% endif %}>{{ curso.nombre }}</option>
                 {% endfor %}
             </select>
         </div>
@@ -201,7 +619,7 @@ templates = {
             <select name="docente" style="width: 100%; padding: 0.5rem;">
                 <option value="">Sin asignar</option>
                 {% for docente in docentes %}
-                <option value="{{ docente.id }}" {% if materia.docente.id == docente.id %}selected{% endif %}>{{ docente.get_full_name|default:docente.username }}</option>
+                <option value="{{ docente.id }}" {% if materia.docente_id == docente.id %}selected{% endif %}>{{ docente.nombre }}</option>
                 {% endfor %}
             </select>
         </div>
@@ -209,6 +627,10 @@ templates = {
             <label>Créditos:</label>
             <input type="number" name="creditos" value="{{ materia.creditos|default:1 }}" required style="width: 100%; padding: 0.5rem;">
         </div>
+        <div class="form-group" style="margin-bottom: 1rem;">
+            <label>Cupo (vacío = sin límite{% if edit_mode %}; inscritos: {{ materia.inscritos }}{% endif %}):</label>
+            <input type="number" name="cupo" min="0" value="{{ materia.cupo|default_if_none:'' }}" style="width: 100%; padding: 0.5rem;">
+        </div>
         <div class="form-group" style="margin-bottom: 1rem;">
             <label><input type="checkbox" name="activa" {% if edit_mode %}{% if materia.activa %}checked{% endif %}{% else %}checked{% endif %}> Activa</label>
         </div>
@@ -223,9 +645,10 @@ templates = {
 {% block title %}Panel de Docente{% endblock %}
 {% block content %}
 <h2>🎓 Panel del Docente</h2>
+
 <div class="stats-grid">
     <div class="stat-card">
-        <div class="stat-value">{{ materias.count }}</div>
+        <div class="stat-value">{{ materias|length }}</div>
         <div class="stat-label">Materias Asignadas</div>
     </div>
     <div class="stat-card">
@@ -241,10 +664,48 @@ templates = {
         <div class="stat-label">Promedio General</div>
     </div>
 </div>
+
+<div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(280px, 1fr)); gap: 1.5rem; margin-bottom: 2rem;">
+    <div class="card" style="text-align: center;">
+        <h3 style="margin-bottom: 1rem;">👥 Estudiantes</h3>
+        <p style="color: #718096; margin-bottom: 1.5rem;">Inscribe estudiantes en tus materias</p>
+        <a href="{% url 'teacher_estudiantes_materia' %}" class="btn btn-primary" style="margin-right: 0.5rem;">Ver Estudiantes</a>
+        <a href="{% url 'teacher_inscribir_estudiante' %}" class="btn btn-success">➕ Inscribir</a>
+    </div>
+
+    <div class="card" style="text-align: center;">
+        <h3 style="margin-bottom: 1rem;">📝 Calificaciones</h3>
+        <p style="color: #718096; margin-bottom: 1.5rem;">Gestiona las notas de tus estudiantes</p>
+        <a href="{% url 'teacher_calificaciones_lista' %}" class="btn btn-primary" style="margin-right: 0.5rem;">Ver Calificaciones</a>
+        <a href="{% url 'teacher_calificacion_crear' %}" class="btn btn-success">➕ Registrar Nota</a>
+    </div>
+
+    <div class="card" style="text-align: center;">
+        <h3 style="margin-bottom: 1rem;">📅 Asistencia</h3>
+        <p style="color: #718096; margin-bottom: 1.5rem;">Registra la asistencia de tus clases</p>
+        <a href="{% url 'teacher_asistencias_lista' %}" class="btn btn-primary" style="margin-right: 0.5rem;">Ver Asistencias</a>
+        <a href="{% url 'teacher_asistencia_crear' %}" class="btn btn-success">➕ Tomar Asistencia</a>
+    </div>
+
+    <div class="card" style="text-align: center;">
+        <h3 style="margin-bottom: 1rem;">📊 Estadísticas</h3>
+        <p style="color: #718096; margin-bottom: 1.5rem;">Analiza el rendimiento académico</p>
+        <a href="{% url 'teacher_estadisticas' %}" class="btn btn-info">Ver Estadísticas</a>
+    </div>
+</div>
+
 <div class="card">
     <h3>📚 Mis Materias</h3>
     <table>
-        <thead><tr><th>Materia</th><th>Código</th><th>Curso</th><th>Créditos</th></tr></thead>
+        <thead>
+            <tr>
+                <th>Materia</th>
+                <th>Código</th>
+                <th>Curso</th>
+                <th>Créditos</th>
+                <th>Acciones</th>
+            </tr>
+        </thead>
         <tbody>
             {% for materia in materias %}
             <tr>
@@ -252,48 +713,122 @@ templates = {
                 <td>{{ materia.codigo }}</td>
                 <td>{{ materia.curso.nombre }}</td>
                 <td>{{ materia.creditos }}</td>
+                <td>
+                    <a href="{% url 'teacher_generar_reporte' %}?materia={{ materia.id }}" class="btn btn-success" style="padding: 0.375rem 0.75rem; font-size: 0.85rem;">📥 Exportar</a>
+                </td>
             </tr>
             {% empty %}
-            <tr><td colspan="4" style="text-align: center;">No tienes materias asignadas</td></tr>
+            <tr>
+                <td colspan="5" style="text-align: center; color: #7f8c8d;">No tienes materias asignadas</td>
+            </tr>
             {% endfor %}
         </tbody>
     </table>
 </div>
-{% endblock %}''',
 
-    'templates/teacher/calificaciones_lista.html': '''{% extends 'base.html' %}
-{% block title %}Gestión de Calificaciones{% endblock %}
-{% block content %}
-<h2>📝 Gestión de Calificaciones</h2>
-<div style="margin: 1.5rem 0;">
-    <a href="{% url 'teacher_calificacion_crear' %}" class="btn btn-success">➕ Registrar Calificación</a>
-</div>
 <div class="card">
+    <h3>📝 Calificaciones Recientes</h3>
     <table>
         <thead>
-            <tr><th>Estudiante</th><th>Materia</th><th>Periodo</th><th>Nota</th><th>Estado</th><th>Fecha</th><th>Acciones</th></tr>
+            <tr>
+                <th>Estudiante</th>
+                <th>Materia</th>
+                <th>Periodo</th>
+                <th>Nota</th>
+                <th>Fecha</th>
+            </tr>
         </thead>
         <tbody>
-            {% for cal in calificaciones %}
+            {% for cal in calificaciones_recientes %}
             <tr>
-                <td>{{ cal.estudiante.get_full_name|default:cal.estudiante.username }}</td>
+                <td><strong>{{ cal.estudiante.get_full_name|default:cal.estudiante.username }}</strong></td>
                 <td>{{ cal.materia.nombre }}</td>
                 <td>{{ cal.get_periodo_display }}</td>
-                <td><strong>{{ cal.nota }}</strong></td>
-                <td>{% if cal.aprobado %}<span class="badge badge-success">Aprobado</span>{% else %}<span class="badge badge-danger">Reprobado</span>{% endif %}</td>
-                <td>{{ cal.fecha_registro|date:"d/m/Y" }}</td>
                 <td>
-                    <a href="{% url 'teacher_calificacion_editar' cal.id %}" class="btn btn-primary" style="padding: 0.25rem 0.5rem; font-size: 0.85rem;">Editar</a>
+                    {% if cal.aprobado %}
+                    <span class="badge badge-success">{{ cal.nota }}</span>
+                    {% else %}
+                    <span class="badge badge-danger">{{ cal.nota }}</span>
+                    {% endif %}
                 </td>
+                <td>{{ cal.fecha_registro|date:"d/m/Y" }}</td>
             </tr>
             {% empty %}
-            <tr><td colspan="7" style="text-align: center;">No hay calificaciones registradas</td></tr>
+            <tr>
+                <td colspan="5" style="text-align: center; color: #7f8c8d;">No hay calificaciones registradas</td>
+            </tr>
             {% endfor %}
         </tbody>
     </table>
 </div>
 {% endblock %}''',
 
+    'templates/teacher/calificaciones_lista.html': '''{% extends 'base.html' %}
+{% load static %}
+{% block title %}Gestión de Calificaciones{% endblock %}
+{% block content %}
+<h2>📝 Gestión de Calificaciones</h2>
+<div style="margin: 1.5rem 0;">
+    <a href="{% url 'teacher_calificacion_crear' %}" class="btn btn-success">➕ Registrar Calificación</a>
+</div>
+<form method="get" class="card" data-filtros="filas-calificaciones">
+    <div style="display: flex; gap: 1rem; align-items: end;">
+        <div style="flex: 1;">
+            <label for="materia">Materia:</label>
+            <select name="materia" id="materia">
+                <option value="">Todas</option>
+                {% for materia in materias %}
+                <option value="{{ materia.id }}" {% if materia_filter == materia.id|stringformat:"s" %}selected{% endif %}>{{ materia.nombre }}</option>
+                {% endfor %}
+            </select>
+        </div>
+        <div style="flex: 1;">
+            <label for="periodo">Periodo:</label>
+            <select name="periodo" id="periodo">
+                <option value="">Todos</option>
+                {% for valor, etiqueta in periodos %}
+                <option value="{{ valor }}" {% if periodo_filter == valor %}selected{% endif %}>{{ etiqueta }}</option>
+                {% endfor %}
+            </select>
+        </div>
+        <div style="flex: 1;">
+            <label for="search">Estudiante:</label>
+            <input type="search" name="search" id="search" value="{{ search_query|default:'' }}" placeholder="Buscar por nombre o usuario">
+        </div>
+        <button type="submit" class="btn btn-primary">Filtrar</button>
+    </div>
+</form>
+<div class="card">
+    <table>
+        <thead>
+            <tr><th>Estudiante</th><th>Materia</th><th>Periodo</th><th>Nota</th><th>Estado</th><th>Fecha</th><th>Acciones</th></tr>
+        </thead>
+        <tbody id="filas-calificaciones">
+            {% if streaming %}<!-- filas -->{% else %}{% include 'teacher/calificaciones_filas.html' %}{% endif %}
+        </tbody>
+    </table>
+</div>
+{% endblock %}
+{% block scripts %}<script src="{% static 'js/filtros.js' %}" defer></script>{% endblock %}''',
+
+    'templates/teacher/calificaciones_filas.html': '''{% comment %}Filas de teacher/calificaciones_lista.html (se envían por bloques en streaming y solas como respuesta a los filtros){% endcomment %}
+{% for cal in calificaciones %}
+<tr>
+    <td>{{ cal.estudiante.get_full_name|default:cal.estudiante.username }}</td>
+    <td>{{ cal.materia.nombre }}</td>
+    <td>{{ cal.get_periodo_display }}</td>
+    <td><strong>{{ cal.nota }}</strong></td>
+    <td>{% if cal.aprobado %}<span class="badge badge-success">Aprobado</span>{% else %}<span class="badge badge-danger">Reprobado</span>{% endif %}</td>
+    <td>{{ cal.fecha_registro|date:"d/m/Y" }}</td>
+    <td>
+        <a href="{% url 'teacher_calificacion_editar' cal.id %}" class="btn btn-primary" style="padding: 0.25rem 0.5rem; font-size: 0.85rem;">Editar</a>
+    </td>
+</tr>
+{% empty %}
+<tr><td colspan="7" style="text-align: center;">No hay calificaciones registradas</td></tr>
+{% endfor %}
+''',
+
     'templates/teacher/calificacion_form.html': '''{% extends 'base.html' %}
 {% block title %}{% if edit_mode %}Editar{% else %}Registrar{% endif %} Calificación{% endblock %}
 {% block content %}
@@ -348,40 +883,73 @@ templates = {
 {% endblock %}''',
 
     'templates/teacher/asistencias_lista.html': '''{% extends 'base.html' %}
+{% load static %}
 {% block title %}Gestión de Asistencias{% endblock %}
 {% block content %}
 <h2>📅 Gestión de Asistencias</h2>
 <div style="margin: 1.5rem 0;">
     <a href="{% url 'teacher_asistencia_crear' %}" class="btn btn-success">➕ Registrar Asistencia</a>
 </div>
+<form method="get" class="card" data-filtros="filas-asistencias">
+    <div style="display: flex; gap: 1rem; align-items: end;">
+        <div style="flex: 1;">
+            <label for="materia">Materia:</label>
+            <select name="materia" id="materia">
+                <option value="">Todas</option>
+                {% for materia in materias %}
+                <option value="{{ materia.id }}" {% if materia_filter == materia.id|stringformat:"s" %}selected{% endif %}>{{ materia.nombre }}</option>
+                {% endfor %}
+            </select>
+        </div>
+        <div style="flex: 1;">
+            <label for="estado">Estado:</label>
+            <select name="estado" id="estado">
+                <option value="">Todos</option>
+                {% for valor, etiqueta in estados %}
+                <option value="{{ valor }}" {% if estado_filter == valor %}selected{% endif %}>{{ etiqueta }}</option>
+                {% endfor %}
+            </select>
+        </div>
+        <div style="flex: 1;">
+            <label for="fecha">Fecha:</label>
+            <input type="date" name="fecha" id="fecha" value="{{ fecha_filter|default:'' }}">
+        </div>
+        <button type="submit" class="btn btn-primary">Filtrar</button>
+    </div>
+</form>
 <div class="card">
     <table>
         <thead>
             <tr><th>Estudiante</th><th>Materia</th><th>Fecha</th><th>Estado</th><th>Acciones</th></tr>
         </thead>
-        <tbody>
-            {% for asist in asistencias %}
-            <tr>
-                <td>{{ asist.estudiante.get_full_name|default:asist.estudiante.username }}</td>
-                <td>{{ asist.materia.nombre }}</td>
-                <td>{{ asist.fecha|date:"d/m/Y" }}</td>
-                <td>
-                    {% if asist.estado == 'presente' %}<span class="badge badge-success">Presente</span>
-                    {% elif asist.estado == 'ausente' %}<span class="badge badge-danger">Ausente</span>
-                    {% elif asist.estado == 'tardanza' %}<span class="badge badge-warning">Tardanza</span>
-                    {% else %}<span class="badge badge-info">Excusado</span>{% endif %}
-                </td>
-                <td>
-                    <a href="{% url 'teacher_asistencia_editar' asist.id %}" class="btn btn-primary" style="padding: 0.25rem 0.5rem; font-size: 0.85rem;">Editar</a>
-                </td>
-            </tr>
-            {% empty %}
-            <tr><td colspan="5" style="text-align: center;">No hay asistencias registradas</td></tr>
-            {% endfor %}
+        <tbody id="filas-asistencias">
+            {% if streaming %}<!-- filas -->{% else %}{% include 'teacher/asistencias_filas.html' %}{% endif %}
         </tbody>
     </table>
 </div>
-{% endblock %}''',
+{% endblock %}
+{% block scripts %}<script src="{% static 'js/filtros.js' %}" defer></script>{% endblock %}''',
+
+    'templates/teacher/asistencias_filas.html': '''{% comment %}Filas de teacher/asistencias_lista.html (se envían por bloques en streaming y solas como respuesta a los filtros){% endcomment %}
+{% for asist in asistencias %}
+<tr>
+    <td>{{ asist.estudiante.get_full_name|default:asist.estudiante.username }}</td>
+    <td>{{ asist.materia.nombre }}</td>
+    <td>{{ asist.fecha|date:"d/m/Y" }}</td>
+    <td>
+        {% if asist.estado == 'presente' %}<span class="badge badge-success">Presente</span>
+        {% elif asist.estado == 'ausente' %}<span class="badge badge-danger">Ausente</span>
+        {% elif asist.estado == 'tardanza' %}<span class="badge badge-warning">Tardanza</span>
+        {% else %}<span class="badge badge-info">Excusado</span>{% endif %}
+    </td>
+    <td>
+        <a href="{% url 'teacher_asistencia_editar' asist.id %}" class="btn btn-primary" style="padding: 0.25rem 0.5rem; font-size: 0.85rem;">Editar</a>
+    </td>
+</tr>
+{% empty %}
+<tr><td colspan="5" style="text-align: center;">No hay asistencias registradas</td></tr>
+{% endfor %}
+''',
 
     'templates/teacher/asistencia_form.html': '''{% extends 'base.html' %}
 {% block title %}{% if edit_mode %}Editar{% else %}Registrar{% endif %} Asistencia{% endblock %}
@@ -464,6 +1032,10 @@ templates = {
             <div class="stat-value">{{ stat.porcentaje_asistencia }}%</div>
             <div class="stat-label">Asistencia</div>
         </div>
+        <div class="stat-card">
+            <div class="stat-value">{{ stat.ausentismo_cronico }}</div>
+            <div class="stat-label">Ausentismo Crónico</div>
+        </div>
     </div>
     <a href="{% url 'teacher_generar_reporte' %}?materia={{ stat.materia.id }}" class="btn btn-success">📥 Descargar Reporte Excel</a>
 </div>
@@ -475,6 +1047,7 @@ templates = {
     # Student templates
     'templates/student/dashboard.html': '''{% extends 'base.html' %}
 {% block title %}Mi Panel{% endblock %}
+
 {% block content %}
 <h2>📖 Mi Panel Estudiantil</h2>
 <div class="stats-grid">
@@ -483,18 +1056,42 @@ templates = {
         <div class="stat-label">Promedio General</div>
     </div>
     <div class="stat-card">
-        <div class="stat-value">{{ matriculas.count }}</div>
-        <div class="stat-label">Cursos Matriculados</div>
+        <div class="stat-value">{{ materias_inscritas|length }}</div>
+        <div class="stat-label">Materias Inscritas</div> 
     </div>
     <div class="stat-card">
         <div class="stat-value">{{ porcentaje_asistencia }}%</div>
         <div class="stat-label">Asistencia del Mes</div>
     </div>
     <div class="stat-card">
-        <div class="stat-value">{{ notificaciones.count }}</div>
+        <div class="stat-value">{{ notificaciones|length }}</div>
         <div class="stat-label">Notificaciones Nuevas</div>
     </div>
 </div>
+
+<hr>
+
+<div class="card">
+    <h3>📌 Mis Materias Inscritas</h3>
+    <table>
+        <thead><tr><th>Materia</th><th>Curso</th><th>Docente</th><th>Fecha Inscripción</th></tr></thead>
+        <tbody>
+            {% for inscripcion in materias_inscritas %}
+            <tr>
+                <td><strong>{{ inscripcion.materia.nombre }}</strong></td>
+                <td>{{ inscripcion.materia.curso.nombre }}</td>
+                <td>{{ inscripcion.materia.docente.get_full_name|default:"(Sin asignar)" }}</td>
+                <td>{{ inscripcion.fecha_inscripcion|date:"d/m/Y" }}</td>
+            </tr>
+            {% empty %}
+            <tr><td colspan="4" style="text-align: center;">No estás inscrito en ninguna materia directamente</td></tr>
+            {% endfor %}
+        </tbody>
+    </table>
+</div>
+
+<hr>
+
 {% if notificaciones %}
 <div class="card">
     <h3>🔔 Notificaciones</h3>
@@ -503,15 +1100,17 @@ templates = {
         <div class="notification-title">{{ notif.titulo }}</div>
         <div>{{ notif.mensaje }}</div>
         <small style="color: #7f8c8d;">{{ notif.creada_en|date:"d/m/Y H:i" }}</small>
-        <a href="{% url 'student_marcar_leida' notif.id %}" style="margin-left: 1rem; color: #3498db;">Marcar como leída</a>
+        <a href="{% url 'student_marcar_leida' notif.id %}" style="margin-left: 1rem; color: #3498db;">Marcar como leída</a> 
     </div>
     {% endfor %}
 </div>
+<hr>
 {% endif %}
+
 <div class="card">
     <div style="display: flex; justify-content: space-between; align-items: center;">
         <h3>📝 Calificaciones Recientes</h3>
-        <a href="{% url 'student_exportar' %}" class="btn btn-success">📥 Exportar a Excel</a>
+        <a href="{% url 'student_exportar' %}" class="btn btn-success">📥 Exportar a Excel</a> 
     </div>
     <table>
         <thead><tr><th>Materia</th><th>Periodo</th><th>Nota</th><th>Estado</th></tr></thead>
@@ -602,6 +1201,50 @@ templates = {
         <div class="stat-label">% Asistencia</div>
     </div>
 </div>
+{% if resumen_materias %}
+<div class="card">
+    <div style="display: flex; justify-content: space-between; align-items: center;">
+        <h3>📈 Resumen por Materia</h3>
+        {% if por_mes %}<a href="?" class="btn btn-primary">Ocultar desglose mensual</a>{% else %}<a href="?por_mes=1" class="btn btn-primary">Ver desglose mensual</a>{% endif %}
+    </div>
+    <table>
+        <thead><tr><th>Materia</th><th>% Ausencia</th><th>Racha Actual</th><th>Racha Máxima</th><th>Primera Ausencia</th><th>Ausencias/Semana</th><th>% Ausencia Últimas Semanas</th></tr></thead>
+        <tbody>
+            {% for datos in resumen_materias %}
+            <tr>
+                <td>{{ datos.materia_nombre }}</td>
+                <td>{% if datos.cronico %}<span class="badge badge-danger">{{ datos.porcentaje_ausencia }}%</span>{% else %}{{ datos.porcentaje_ausencia }}%{% endif %}</td>
+                <td>{{ datos.racha_actual }}</td>
+                <td>{{ datos.racha_maxima }}</td>
+                <td>{{ datos.primera_ausencia|date:"d/m/Y"|default:"-" }}</td>
+                <td>{{ datos.ausencias_por_semana }}</td>
+                <td>{% for semana in datos.semanas|slice:"-4:" %}<span title="Semana del {{ semana.semana|date:"d/m" }}">{{ semana.porcentaje_ausencia }}%</span>{% if not forloop.last %} · {% endif %}{% endfor %}</td>
+            </tr>
+            {% endfor %}
+        </tbody>
+    </table>
+</div>
+{% endif %}
+{% if resumen_meses %}
+<div class="card">
+    <h3>🗓️ Desglose Mensual</h3>
+    <table>
+        <thead><tr><th>Mes</th><th>Presente</th><th>Ausente</th><th>Tardanza</th><th>Excusado</th><th>% Asistencia</th></tr></thead>
+        <tbody>
+            {% for datos in resumen_meses %}
+            <tr>
+                <td>{{ datos.mes|date:"F Y" }}</td>
+                <td>{{ datos.presentes }}</td>
+                <td>{{ datos.ausentes }}</td>
+                <td>{{ datos.tardanzas }}</td>
+                <td>{{ datos.excusados }}</td>
+                <td>{{ datos.porcentaje_asistencia }}%</td>
+            </tr>
+            {% endfor %}
+        </tbody>
+    </table>
+</div>
+{% endif %}
 <div class="card">
     <table>
         <thead><tr><th>Materia</th><th>Fecha</th><th>Estado</th><th>Observaciones</th></tr></thead>
@@ -623,6 +1266,13 @@ templates = {
             {% endfor %}
         </tbody>
     </table>
+    {% if page_obj.paginator.num_pages > 1 %}
+    <div style="display: flex; justify-content: space-between; align-items: center; margin-top: 1rem;">
+        {% if page_obj.has_previous %}<a href="?page={{ page_obj.previous_page_number }}{% if por_mes %}&por_mes=1{% endif %}" class="btn btn-primary">« Anterior</a>{% else %}<span></span>{% endif %}
+        <span>Página {{ page_obj.number }} de {{ page_obj.paginator.num_pages }}</span>
+        {% if page_obj.has_next %}<a href="?page={{ page_obj.next_page_number }}{% if por_mes %}&por_mes=1{% endif %}" class="btn btn-primary">Siguiente »</a>{% else %}<span></span>{% endif %}
+    </div>
+    {% endif %}
 </div>
 {% endblock %}''',
 
@@ -649,6 +1299,19 @@ templates = {
 {% endblock %}''',
 
     # Confirmation templates
+    'templates/admin/usuario_confirmar_eliminar.html': '''{% extends 'base.html' %}
+{% block content %}
+<div class="card">
+    <h2>⚠️ Confirmar Desactivación</h2>
+    <p>¿Estás seguro de que deseas desactivar al usuario <strong>{{ usuario.get_full_name|default:usuario.username }}</strong>?</p>
+    <form method="post">
+        {% csrf_token %}
+        <button type="submit" class="btn btn-danger">Sí, Desactivar</button>
+        <a href="{% url 'admin_usuarios_lista' %}" class="btn btn-primary">Cancelar</a>
+    </form>
+</div>
+{% endblock %}''',
+
     'templates/admin/curso_confirmar_eliminar.html': '''{% extends 'base.html' %}
 {% block content %}
 <div class="card">
@@ -703,7 +1366,7 @@ templates = {
 }
 
 # Crear directorios
-for path in ['templates/admin', 'templates/teacher', 'templates/student']:
+for path in ['templates/admin', 'templates/teacher', 'templates/student', 'static/css']:
     os.makedirs(path, exist_ok=True)
 
 # Generar templates
@@ -0,0 +1,35 @@
+"""
+Configuración de Gunicorn (se carga automáticamente desde la raíz del proyecto).
+
+Prepara la carpeta compartida de prometheus_client para que /metrics agregue
+las métricas de todos los workers y define los hilos por worker.
+"""
+import os
+import shutil
+import tempfile
+
+# Con GUNICORN_THREADS > 1 los workers son gthread; con DB_POOL=True los hilos
+# de un worker comparten su pool de conexiones
+threads = int(os.environ.get('GUNICORN_THREADS', '1'))
+
+# La variable debe existir antes de que los workers importen prometheus_client
+os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR',
+    os.path.join(tempfile.gettempdir(), 'estudify_prometheus')
+)
+
+
+def on_starting(server):
+    """Limpia las métricas de ejecuciones anteriores."""
+    carpeta = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(carpeta, ignore_errors=True)
+    os.makedirs(carpeta, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Marca como muertos los archivos del worker que terminó (gauges en modo live)."""
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,43 @@
+/* Filtros de las listas largas (form[data-filtros]).
+ *
+ * Al cambiar un filtro se pide la misma URL con la cabecera X-Parcial: la
+ * vista responde solo con las filas de la tabla, que reemplazan el <tbody>
+ * indicado en data-filtros. Sin JavaScript, o si la petición falla, el
+ * formulario se envía normalmente y recarga la página completa. Una
+ * respuesta redirigida (la sesión expiró y fetch siguió la redirección al
+ * login) también cuenta como fallo: el envío normal lleva al login.
+ */
+document.querySelectorAll('form[data-filtros]').forEach(function (form) {
+    var tbody = document.getElementById(form.dataset.filtros);
+    var pendiente = null;
+
+    function filtrar() {
+        var url = location.pathname + '?' + new URLSearchParams(new FormData(form)).toString();
+        if (pendiente) {
+            pendiente.abort();
+        }
+        pendiente = new AbortController();
+        fetch(url, {headers: {'X-Parcial': 'filas'}, signal: pendiente.signal})
+            .then(function (respuesta) {
+                if (!respuesta.ok || respuesta.redirected) {
+                    throw new Error(respuesta.status);
+                }
+                return respuesta.text();
+            })
+            .then(function (filas) {
+                tbody.innerHTML = filas;
+                history.replaceState(null, '', url);
+            })
+            .catch(function (error) {
+                if (error.name !== 'AbortError') {
+                    form.submit();
+                }
+            });
+    }
+
+    form.addEventListener('submit', function (evento) {
+        evento.preventDefault();
+        filtrar();
+    });
+    form.addEventListener('change', filtrar);
+});